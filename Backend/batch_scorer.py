@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Vectorized task scoring
+Scores a whole backlog for many (time, energy, focus, available time) scenarios in one
+NumPy pass, using the same weights as FlowStateOptimizer.calculate_task_score
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from lazy_imports import is_available
+
+NUMPY_AVAILABLE = is_available('numpy')
+np = None  # imported by the first BatchScorer, so importing this module stays cheap
+
+_EPOCH = datetime(1970, 1, 1)  # naive, so offsets match naive datetime subtraction
+
+# (current_time, user_energy, user_focus, available_time)
+Scenario = Tuple[datetime, int, int, int]
+
+def _seconds(moment: datetime) -> float:
+    return (moment - _EPOCH).total_seconds()
+
+def hourly_scenarios(target_date: date, patterns: Dict[int, dict],
+                     available_time: int = 25) -> List[Scenario]:
+    """One scenario per hour from an hour -> {'energy', 'focus'} table (e.g. daily_patterns)"""
+    day_start = datetime.combine(target_date, datetime.min.time())
+    return [(day_start + timedelta(hours=hour), levels['energy'], levels['focus'], available_time)
+            for hour, levels in sorted(patterns.items())]
+
+class BatchScorer:
+    """Column arrays over a fixed set of tasks; rebuild it when the tasks change"""
+
+    def __init__(self, tasks):
+        global np
+        if np is None:
+            if not NUMPY_AVAILABLE:
+                raise ImportError("BatchScorer needs numpy (pip install numpy)")
+            import numpy as np
+        self.tasks = list(tasks)
+        n = len(self.tasks)
+        priority = np.fromiter((t.priority.value for t in self.tasks), float, n)
+        self.energy = np.fromiter((t.energy_required for t in self.tasks), float, n)
+        self.focus = np.fromiter((t.focus_required for t in self.tasks), float, n)
+        self.estimated = np.fromiter((t.estimated_time for t in self.tasks), float, n)
+        self.due = np.fromiter((_seconds(t.due_date) if t.due_date else np.nan for t in self.tasks),
+                               float, n)
+        self.has_due = ~np.isnan(self.due)
+
+        # Time-independent part: priority (30%) and time fit (5%)
+        time_bonus = np.where(self.estimated <= 25, 0.05, np.where(self.estimated <= 50, 0.03, 0.01))
+        self.static = priority / 4.0 * 0.3 + time_bonus
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def score(self, scenarios: Sequence[Scenario]) -> 'np.ndarray':
+        """(scenarios x tasks) score matrix; tasks that don't fit the available time get -inf"""
+        now = np.array([_seconds(s[0]) for s in scenarios], float)[:, None]
+        user_energy = np.array([s[1] for s in scenarios], float)[:, None]
+        user_focus = np.array([s[2] for s in scenarios], float)[:, None]
+        available = np.array([s[3] for s in scenarios], float)[:, None]
+
+        # Due date urgency (25%); floor division matches timedelta.days
+        days = np.floor((self.due - now) / 86400.0)
+        urgency = np.select([days <= 0, days <= 1, days <= 7], [1.0, 0.9, 0.7], 0.3) * 0.25
+        urgency = np.where(self.has_due, urgency, 0.1)
+
+        energy_match = 1 - np.abs(self.energy - user_energy) / 4.0
+        focus_match = 1 - np.abs(self.focus - user_focus) / 4.0
+        scores = np.minimum(self.static + urgency + energy_match * 0.2 + focus_match * 0.2, 1.0)
+        return np.where(self.estimated <= available, scores, -np.inf)
+
+    def suggest(self, scenarios: Sequence[Scenario], limit: int = 5) -> List[List[tuple]]:
+        """Top `limit` (task, score) pairs per scenario"""
+        if not self.tasks or not scenarios:
+            return [[] for _ in scenarios]
+        scores = self.score(scenarios)
+        k = min(limit, scores.shape[1])
+        kth = -np.partition(-scores, k - 1, axis=1)[:, k - 1]  # k-th best score per scenario
+        results = []
+        for row, threshold in zip(scores, kth):
+            # Everything tied with the k-th score competes; lower index wins, as in top_tasks
+            columns = np.flatnonzero(row >= threshold)
+            columns = columns[np.lexsort((columns, -row[columns]))][:k]
+            results.append([(self.tasks[c], float(row[c])) for c in columns if row[c] != -np.inf])
+        return results
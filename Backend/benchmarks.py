@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the headless study engine
+Run all with `python benchmarks.py`, or pick some: `python benchmarks.py import_time`
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def _timeit(func, repeat: int = 5) -> float:
+    """Best wall time of `repeat` runs, in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def _import_seconds(module: str) -> float:
+    """Cold import time of a module in a fresh interpreter"""
+    code = ("import time, sys; sys.path.insert(0, %r); t = time.perf_counter(); "
+            "import %s; print(time.perf_counter() - t)" % (HERE, module))
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, cwd=HERE)
+    if result.returncode != 0:
+        return float('nan')
+    return float(result.stdout.strip().splitlines()[-1])
+
+def bench_import_time():
+    """Cold import time of the headless core versus the Tk application"""
+    for module in ('study_core', 'flow_study_app'):
+        seconds = min(_import_seconds(module) for _ in range(3))
+        label = f"{seconds * 1000:8.1f} ms" if seconds == seconds else "  unavailable"
+        print(f"  import {module:<16} {label}")
+
+def bench_engine_ops(n_tasks: int = 200):
+    """Task creation, suggestion and statistics on a headless engine"""
+    from study_core import StudyEngine
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        engine = StudyEngine(data_dir=data_dir, enable_notifications=False)
+        now = datetime.now()
+        start = time.perf_counter()
+        for i in range(n_tasks):
+            engine.task_manager.create_task(
+                f"Task {i}", estimated_time=15 + i % 60,
+                due_date=now + timedelta(hours=i % 240)
+            )
+        create_time = time.perf_counter() - start
+        suggest_time = _timeit(lambda: engine.task_manager.suggest_next_task(4, 4, 50))
+        stats_time = _timeit(lambda: engine.task_manager.get_task_statistics())
+        engine.shutdown()
+
+    print(f"  create {n_tasks} tasks        {create_time * 1000:8.1f} ms")
+    print(f"  suggest_next_task       {suggest_time * 1000:8.3f} ms")
+    print(f"  get_task_statistics     {stats_time * 1000:8.3f} ms")
+
+def _sample_tasks(n: int):
+    from todo_manager import Task, Priority, TaskStatus, TaskCategory
+    now = datetime.now()
+    return [Task(id=f"task-{i}", title=f"Task {i}", description="Review chapter notes",
+                 priority=Priority(i % 4 + 1), status=TaskStatus.PENDING,
+                 category=TaskCategory.STUDY, estimated_time=25 + i % 50,
+                 due_date=now + timedelta(hours=i % 500), tags=["exam", "review"])
+            for i in range(n)]
+
+def _sample_events(n: int):
+    from calendar_manager import CalendarEvent, EventType, Priority
+    now = datetime.now()
+    return [CalendarEvent(id=f"event-{i}", title=f"Event {i}", description="Lecture",
+                          start_time=now + timedelta(hours=i), end_time=now + timedelta(hours=i, minutes=50),
+                          event_type=EventType.CLASS, priority=Priority.MEDIUM, tags=["cs"])
+            for i in range(n)]
+
+def _legacy_task_to_dict(task) -> dict:
+    """Baseline: the asdict()-based serialiser the codec replaced"""
+    from dataclasses import asdict
+    task_dict = asdict(task)
+    task_dict['priority'] = task.priority.value
+    task_dict['status'] = task.status.value
+    task_dict['category'] = task.category.value
+    task_dict['created_at'] = task.created_at.isoformat()
+    if task.due_date:
+        task_dict['due_date'] = task.due_date.isoformat()
+    if task.completed_at:
+        task_dict['completed_at'] = task.completed_at.isoformat()
+    return task_dict
+
+def _legacy_dict_to_task(task_dict: dict):
+    from todo_manager import Task, Priority, TaskStatus, TaskCategory
+    task_dict = task_dict.copy()
+    task_dict['priority'] = Priority(task_dict['priority'])
+    task_dict['status'] = TaskStatus(task_dict['status'])
+    task_dict['category'] = TaskCategory(task_dict['category'])
+    task_dict['created_at'] = datetime.fromisoformat(task_dict['created_at'])
+    if task_dict.get('due_date'):
+        task_dict['due_date'] = datetime.fromisoformat(task_dict['due_date'])
+    if task_dict.get('completed_at'):
+        task_dict['completed_at'] = datetime.fromisoformat(task_dict['completed_at'])
+    return Task(**task_dict)
+
+def _legacy_event_to_dict(event) -> dict:
+    from dataclasses import asdict
+    event_dict = asdict(event)
+    event_dict['event_type'] = event.event_type.value
+    event_dict['priority'] = event.priority.value
+    event_dict['recurrence'] = event.recurrence.value
+    event_dict['start_time'] = event.start_time.isoformat()
+    event_dict['end_time'] = event.end_time.isoformat()
+    event_dict['created_at'] = event.created_at.isoformat()
+    if event.recurrence_end:
+        event_dict['recurrence_end'] = event.recurrence_end.isoformat()
+    return event_dict
+
+def bench_records(n: int = 20000):
+    """Slotted record size and hand-written codecs versus asdict()-based codecs"""
+    import tracemalloc
+    from types import SimpleNamespace
+    from todo_manager import task_to_dict, task_from_dict
+    from calendar_manager import event_to_dict
+
+    tasks = _sample_tasks(n)
+    events = _sample_events(n)
+    task_dicts = [task_to_dict(t) for t in tasks]
+
+    # Memory: slotted instances versus the same field values held in an instance __dict__
+    Task = type(tasks[0])
+    fields = [{name: getattr(t, name) for name in Task.__slots__} for t in tasks]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    slotted = [Task(**f) for f in fields]
+    slotted_bytes = tracemalloc.get_traced_memory()[0] - before
+    before = tracemalloc.get_traced_memory()[0]
+    with_dict = [SimpleNamespace(**f) for f in fields]
+    dict_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del slotted, with_dict, fields
+    print(f"  {n} tasks: slotted {slotted_bytes / n:.0f} B/record, "
+          f"__dict__-backed {dict_bytes / n:.0f} B/record (shared field values excluded)")
+
+    rows = [
+        ("task to-dict", lambda: [_legacy_task_to_dict(t) for t in tasks], lambda: [task_to_dict(t) for t in tasks]),
+        ("task from-dict", lambda: [_legacy_dict_to_task(d) for d in task_dicts], lambda: [task_from_dict(d) for d in task_dicts]),
+        ("event to-dict", lambda: [_legacy_event_to_dict(e) for e in events], lambda: [event_to_dict(e) for e in events]),
+    ]
+    for label, legacy, codec in rows:
+        legacy_time = _timeit(legacy, 3)
+        codec_time = _timeit(codec, 3)
+        print(f"  {label:<16} asdict {legacy_time * 1000:8.1f} ms   codec {codec_time * 1000:8.1f} ms"
+              f"   x{legacy_time / codec_time:.1f}")
+
+def bench_json(n: int = 5000):
+    """Task file save/load through json_codec versus the previous indented stdlib format"""
+    import json
+    import json_codec
+    from todo_manager import task_to_dict, task_from_dict
+
+    tasks = _sample_tasks(n)
+    data = {'tasks': [task_to_dict(t) for t in tasks], 'last_updated': datetime.now().isoformat()}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, 'legacy.json')
+        codec_path = os.path.join(tmp, 'codec.json')
+
+        def legacy_save():
+            with open(legacy_path, 'w') as f:
+                json.dump(data, f, indent=2)
+
+        def legacy_load():
+            with open(legacy_path, 'r') as f:
+                return [task_from_dict(d) for d in json.load(f)['tasks']]
+
+        rows = [
+            ("save", legacy_save, lambda: json_codec.dump_file(codec_path, data)),
+            ("load", legacy_load, lambda: json_codec.load_records(codec_path, 'tasks', task_from_dict)),
+        ]
+        print(f"  backend: {json_codec.BACKEND}")
+        for label, legacy, codec in rows:
+            legacy_time = _timeit(legacy, 3)
+            codec_time = _timeit(codec, 3)
+            print(f"  {label:<5} {n} tasks: indent=2 {n / legacy_time:9.0f} rec/s   "
+                  f"codec {n / codec_time:9.0f} rec/s   x{legacy_time / codec_time:.1f}")
+        print(f"  file size: indent=2 {os.path.getsize(legacy_path) / 1024:.0f} KiB, "
+              f"codec {os.path.getsize(codec_path) / 1024:.0f} KiB")
+
+def bench_task_queries(n: int = 100000):
+    """Filtered and due-date queries through the task indexes versus full scans"""
+    from todo_manager import TaskManager, TaskStatus, Priority
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        tm = TaskManager(os.path.join(data_dir, "tasks.json"))
+    for task in _sample_tasks(n):
+        tm.tasks[task.id] = task
+        tm.index.add(task)
+    tasks = list(tm.tasks.values())
+    now = datetime.now()
+    future = now + timedelta(days=1)
+
+    rows = [
+        ("get_tasks(priority)", lambda: [t for t in tasks if t.priority == Priority.URGENT],
+         lambda: tm.get_tasks(priority=Priority.URGENT)),
+        ("get_upcoming_tasks(1)", lambda: [t for t in tasks if t.due_date and now <= t.due_date <= future
+                                           and t.status != TaskStatus.COMPLETED],
+         lambda: tm.get_upcoming_tasks(1)),
+        ("get_overdue_tasks", lambda: [t for t in tasks if t.due_date and t.due_date < now
+                                       and t.status != TaskStatus.COMPLETED],
+         tm.get_overdue_tasks),
+    ]
+    for label, scan, indexed in rows:
+        scan_time = _timeit(scan, 3)
+        index_time = _timeit(indexed, 3)
+        print(f"  {label:<22} scan {scan_time * 1000:8.2f} ms   index {index_time * 1000:8.3f} ms"
+              f"   x{scan_time / index_time:.0f}")
+
+def bench_suggest(n: int = 100000):
+    """suggest_next_task with the bounded heap versus score-everything-and-sort"""
+    from todo_manager import TaskManager, TaskStatus
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        tm = TaskManager(os.path.join(data_dir, "tasks.json"))
+    for task in _sample_tasks(n):
+        task.estimated_time = 15 + hash(task.id) % 60
+        tm.tasks[task.id] = task
+        tm.index.add(task)
+    optimizer = tm.optimizer
+    now = datetime.now()
+
+    def full_sort():
+        scored = [(t, optimizer.calculate_task_score(t, now, 4, 4)) for t in tm.tasks.values()
+                  if t.status == TaskStatus.PENDING and t.estimated_time <= 50]
+        scored.sort(key=lambda x: x[1], reverse=True)
+        return scored[:5]
+
+    sort_time = _timeit(full_sort, 3)
+    heap_time = _timeit(lambda: tm.suggest_next_task(4, 4, 50), 3)
+    print(f"  {n} tasks: full sort {sort_time * 1000:8.1f} ms   heap top-k {heap_time * 1000:8.1f} ms"
+          f"   x{sort_time / heap_time:.1f}")
+
+def bench_batch_scoring(n: int = 50000):
+    """Hourly suggestions for a day: one vectorized pass versus a top-k query per hour"""
+    from batch_scorer import BatchScorer, NUMPY_AVAILABLE, hourly_scenarios
+    from calendar_manager import FlowCalendarOptimizer
+    from todo_manager import FlowStateOptimizer
+
+    if not NUMPY_AVAILABLE:
+        print("  skipped: numpy is not installed")
+        return
+    tasks = _sample_tasks(n)
+    scenarios = hourly_scenarios(datetime.now().date(), FlowCalendarOptimizer().daily_patterns, 50)
+    optimizer = FlowStateOptimizer()
+
+    loop_time = _timeit(lambda: [optimizer.suggest_optimal_tasks(tasks, *s) for s in scenarios], 3)
+    build_time = _timeit(lambda: BatchScorer(tasks), 3)
+    scorer = BatchScorer(tasks)
+    batch_time = _timeit(lambda: scorer.suggest(scenarios), 3)
+    print(f"  {n} tasks x {len(scenarios)} hours: per-hour top-k {loop_time * 1000:8.1f} ms   "
+          f"batch {batch_time * 1000:8.1f} ms (+{build_time * 1000:.1f} ms build)"
+          f"   x{loop_time / batch_time:.1f}")
+
+def bench_free_time(n: int = 20000):
+    """Free-slot queries over months of events with the sweep-line free/busy engine"""
+    from calendar_manager import CalendarManager
+    from free_busy import WorkingHours
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        cm = CalendarManager(os.path.join(data_dir, "calendar.json"), enable_notifications=False)
+    for event in _sample_events(2 * n)[::2]:  # a 50 minute class every other hour
+        cm.events[event.id] = event
+        cm._index_time(event)
+    now = datetime.now().replace(minute=0, second=0, microsecond=0)
+    end = now + timedelta(days=180)
+    hours = WorkingHours.daily(8, 20, range(5))
+
+    first_time = _timeit(lambda: cm.find_free_slots(45, now, end, count=10, working_hours=hours), 3)
+    all_time = _timeit(lambda: cm.find_free_slots(45, now, end, working_hours=hours), 3)
+    print(f"  {n} events, 180 days: first 10 slots {first_time * 1000:8.2f} ms   "
+          f"all slots {all_time * 1000:8.1f} ms")
+
+def bench_study_blocks(days: int = 90):
+    """Study blocks for every day of a quarter: cold versus memoised"""
+    from calendar_manager import CalendarManager
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        cm = CalendarManager(os.path.join(data_dir, "calendar.json"), enable_notifications=False)
+    for event in _sample_events(24 * days)[::5]:
+        cm.events[event.id] = event
+        cm._index_time(event)
+    start = datetime.now().date()
+    end = start + timedelta(days=days - 1)
+    optimizer = cm.optimizer
+
+    def all_blocks():
+        for day, events in cm.get_events_between(start, end).items():
+            optimizer.get_optimal_study_blocks(day, events)
+
+    def cold():
+        optimizer.invalidate_blocks()
+        all_blocks()
+
+    cold_time = _timeit(cold, 3)
+    warm_time = _timeit(all_blocks, 3)
+    print(f"  {days} days: cold {cold_time * 1000:8.2f} ms   cached {warm_time * 1000:8.2f} ms"
+          f"   x{cold_time / warm_time:.1f}   {optimizer.block_cache.stats()}")
+
+def _legacy_calendar_statistics(cm) -> dict:
+    """Baseline: the scan-every-event statistics the rollups replaced"""
+    from calendar_manager import EventType
+    events = list(cm.events.values())
+    now = datetime.now()
+    type_counts = {}
+    for event in events:
+        type_counts[event.event_type.value] = type_counts.get(event.event_type.value, 0) + 1
+    study = [e for e in events if e.event_type == EventType.STUDY_SESSION]
+    week_start = now - timedelta(days=now.weekday())
+    return {
+        'total_events': len(events),
+        'completed_events': len([e for e in events if e.is_completed]),
+        'upcoming_events': len([e for e in events if e.start_time > now]),
+        'event_type_distribution': type_counts,
+        'total_study_hours': sum((e.end_time - e.start_time).total_seconds() / 3600 for e in study),
+        'this_week_study_hours': sum((e.end_time - e.start_time).total_seconds() / 3600 for e in study
+                                     if week_start <= e.start_time <= week_start + timedelta(days=7)),
+        'average_event_duration': sum((e.end_time - e.start_time).total_seconds() / 60 for e in events)
+                                  / len(events) if events else 0,
+    }
+
+def bench_calendar_stats(n: int = 50000):
+    """Dashboard statistics: full scan versus incremental rollups"""
+    from calendar_manager import CalendarManager
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        cm = CalendarManager(os.path.join(data_dir, "calendar.json"), enable_notifications=False)
+    for event in _sample_events(n):
+        cm.events[event.id] = event
+        cm._index_time(event)
+    today = datetime.now().date()
+
+    scan_time = _timeit(lambda: _legacy_calendar_statistics(cm), 3)
+    rollup_time = _timeit(cm.get_calendar_statistics, 3)
+    trend_time = _timeit(lambda: cm.get_weekly_trend(today - timedelta(weeks=51), today), 3)
+    print(f"  {n} events: scan {scan_time * 1000:8.2f} ms   rollups {rollup_time * 1000:8.3f} ms"
+          f"   x{scan_time / rollup_time:.0f}   52-week trend {trend_time * 1000:.3f} ms")
+
+BENCHMARKS = {
+    'import_time': bench_import_time,
+    'engine_ops': bench_engine_ops,
+    'records': bench_records,
+    'json': bench_json,
+    'task_queries': bench_task_queries,
+    'suggest': bench_suggest,
+    'batch_scoring': bench_batch_scoring,
+    'free_time': bench_free_time,
+    'study_blocks': bench_study_blocks,
+    'calendar_stats': bench_calendar_stats,
+}
+
+def main(names=None) -> int:
+    names = names or list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        print(f"Unknown benchmark(s): {', '.join(unknown)}; available: {', '.join(BENCHMARKS)}")
+        return 1
+    for name in names:
+        print(f"{name}: {BENCHMARKS[name].__doc__}")
+        BENCHMARKS[name]()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Tkinter month view for the calendar manager
+Kept apart from calendar_manager so the core can run without a display
+"""
+
+import calendar
+from datetime import date
+from typing import Iterable, List, Optional, Tuple
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+from calendar_manager import CalendarManager, EventType
+
+# One text line of a day cell: (dot colour, text); a None colour is the grey "+N more" line
+CellLine = Tuple[Optional[str], str]
+
+class DayCell:
+    """One square of the month grid, built once and then only reconfigured"""
+    
+    MAX_LINES = 4
+    
+    def __init__(self, parent, row: int, column: int):
+        self.frame = tk.Frame(parent, relief='solid', borderwidth=1,
+                              bg='white', width=120, height=100)
+        self.frame.grid(row=row, column=column, padx=1, pady=1, sticky='nsew')
+        self.frame.grid_propagate(False)
+        
+        self.day_label = tk.Label(self.frame, text="", font=('Arial', 10, 'bold'),
+                                  bg='white', anchor='nw')
+        self.day_label.place(x=2, y=2)
+        
+        self.lines = []  # (frame, dot, label) per event line
+        for _ in range(self.MAX_LINES):
+            line = tk.Frame(self.frame, bg='white')
+            dot = tk.Label(line, text="●", bg='white', font=('Arial', 8))
+            dot.pack(side='left')
+            label = tk.Label(line, text="", font=('Arial', 8), bg='white', anchor='w')
+            label.pack(side='left', fill='x', expand=True)
+            self.lines.append((line, dot, label))
+        
+        # What is on screen now, so updates can skip unchanged widgets
+        self.visible = True
+        self.day: Optional[int] = None
+        self.shown: List[Optional[CellLine]] = [None] * self.MAX_LINES
+    
+    def show(self, day: int, lines: List[CellLine]) -> bool:
+        """Display a day and its lines; returns whether any widget had to change"""
+        changed = False
+        if not self.visible:
+            self.frame.grid()
+            self.visible = True
+            changed = True
+        if day != self.day:
+            self.day_label.config(text=str(day))
+            self.day = day
+            changed = True
+        for i, (line, dot, label) in enumerate(self.lines):
+            wanted = lines[i] if i < len(lines) else None
+            current = self.shown[i]
+            if wanted == current:
+                continue
+            changed = True
+            self.shown[i] = wanted
+            if wanted is None:
+                line.place_forget()
+                continue
+            color, text = wanted
+            if current is None:
+                line.place(x=2, y=20 + 15 * i, width=115, height=15)
+            if current is None or current[0] != color:
+                dot.config(text="●" if color else "", fg=color or 'white')
+                label.config(fg='black' if color else 'gray')
+            if current is None or current[1] != text:
+                label.config(text=text)
+        return changed
+    
+    def hide(self) -> bool:
+        """Blank square (before the 1st or after the last of the month)"""
+        if not self.visible:
+            return False
+        self.frame.grid_remove()
+        self.visible = False
+        return True
+
+class CalendarGUI:
+    """Enhanced Calendar GUI with color-coded events"""
+    
+    def __init__(self, master, calendar_manager):
+        self.master = master
+        self.calendar_manager = calendar_manager
+        self.current_date = date.today()
+        self.cells: Optional[List[List[DayCell]]] = None  # 6 weeks x 7 days, built on first refresh
+        
+        self.setup_gui()
+        self.refresh_calendar()
+    
+    def setup_gui(self):
+        # Main frame
+        main_frame = ttk.Frame(self.master)
+        main_frame.pack(fill='both', expand=True, padx=10, pady=10)
+        
+        # Navigation frame
+        nav_frame = ttk.Frame(main_frame)
+        nav_frame.pack(fill='x', pady=(0, 10))
+        
+        ttk.Button(nav_frame, text="<", command=self.prev_month).pack(side='left')
+        self.month_label = ttk.Label(nav_frame, text="", font=('Arial', 16, 'bold'))
+        self.month_label.pack(side='left', padx=20)
+        ttk.Button(nav_frame, text=">", command=self.next_month).pack(side='left')
+        
+        # Add event frame
+        add_frame = ttk.LabelFrame(main_frame, text="Quick Add Event", padding=10)
+        add_frame.pack(fill='x', pady=(0, 10))
+        
+        # Event input fields
+        input_frame = ttk.Frame(add_frame)
+        input_frame.pack(fill='x')
+        
+        ttk.Label(input_frame, text="Title:").grid(row=0, column=0, sticky='w', padx=5)
+        self.title_var = tk.StringVar()
+        ttk.Entry(input_frame, textvariable=self.title_var, width=20).grid(row=0, column=1, padx=5)
+        
+        ttk.Label(input_frame, text="Date (MM/DD/YYYY):").grid(row=0, column=2, sticky='w', padx=5)
+        self.date_var = tk.StringVar(value=self.current_date.strftime("%m/%d/%Y"))
+        ttk.Entry(input_frame, textvariable=self.date_var, width=12).grid(row=0, column=3, padx=5)
+        
+        ttk.Label(input_frame, text="Time:").grid(row=1, column=0, sticky='w', padx=5)
+        self.time_var = tk.StringVar(value="09:00")
+        ttk.Entry(input_frame, textvariable=self.time_var, width=8).grid(row=1, column=1, padx=5)
+        
+        ttk.Label(input_frame, text="AM/PM:").grid(row=1, column=2, sticky='w', padx=5)
+        self.ampm_var = tk.StringVar(value="AM")
+        ttk.Combobox(input_frame, textvariable=self.ampm_var, values=["AM", "PM"], width=5).grid(row=1, column=3, padx=5)
+        
+        ttk.Label(input_frame, text="Type:").grid(row=0, column=4, sticky='w', padx=5)
+        self.type_var = tk.StringVar(value="STUDY_SESSION")
+        type_combo = ttk.Combobox(input_frame, textvariable=self.type_var, width=15)
+        type_combo['values'] = [t.value for t in EventType]
+        type_combo.grid(row=0, column=5, padx=5)
+        
+        ttk.Button(input_frame, text="Add Event", command=self.add_event).grid(row=1, column=5, padx=5, pady=5)
+        
+        # Calendar frame
+        cal_frame = ttk.Frame(main_frame)
+        cal_frame.pack(fill='both', expand=True)
+        
+        # Calendar grid
+        self.calendar_frame = ttk.Frame(cal_frame)
+        self.calendar_frame.pack(fill='both', expand=True)
+        
+        # Legend
+        legend_frame = ttk.LabelFrame(main_frame, text="Event Type Colors", padding=10)
+        legend_frame.pack(fill='x', pady=(10, 0))
+        
+        legend_inner = ttk.Frame(legend_frame)
+        legend_inner.pack(fill='x')
+        
+        colors = {
+            "Meeting": "#EF4444",
+            "Study": "#10B981", 
+            "Exam": "#F59E0B",
+            "Personal": "#3B82F6",
+            "Deadline": "#EF4444",
+            "Assignment": "#F59E0B",
+            "Class": "#8B5CF6",
+            "Break": "#6B7280"
+        }
+        
+        col = 0
+        for event_type, color in colors.items():
+            color_label = tk.Label(legend_inner, text="●", fg=color, font=('Arial', 16))
+            color_label.grid(row=0, column=col*2, sticky='w')
+            type_label = ttk.Label(legend_inner, text=event_type)
+            type_label.grid(row=0, column=col*2+1, sticky='w', padx=(2, 15))
+            col += 1
+            if col >= 4:
+                col = 0
+        
+    def prev_month(self):
+        if self.current_date.month == 1:
+            self.current_date = self.current_date.replace(year=self.current_date.year-1, month=12)
+        else:
+            self.current_date = self.current_date.replace(month=self.current_date.month-1)
+        self.refresh_calendar()
+    
+    def next_month(self):
+        if self.current_date.month == 12:
+            self.current_date = self.current_date.replace(year=self.current_date.year+1, month=1)
+        else:
+            self.current_date = self.current_date.replace(month=self.current_date.month+1)
+        self.refresh_calendar()
+    
+    def build_grid(self):
+        """Header and 6 x 7 day cells, created once; refreshes only reconfigure them"""
+        days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+        for col, day in enumerate(days):
+            header = ttk.Label(self.calendar_frame, text=day, font=('Arial', 12, 'bold'))
+            header.grid(row=0, column=col, padx=2, pady=2, sticky='nsew')
+        
+        self.cells = [[DayCell(self.calendar_frame, row, col) for col in range(7)] for row in range(1, 7)]
+        
+        # Configure grid weights
+        for i in range(7):
+            self.calendar_frame.grid_columnconfigure(i, weight=1)
+        for i in range(7):
+            self.calendar_frame.grid_rowconfigure(i, weight=1)
+    
+    def cell_lines(self, day_events) -> List[CellLine]:
+        """Lines for a day: up to 4 events, or 3 and a "+N more" line"""
+        lines = []
+        for i, event in enumerate(day_events[:DayCell.MAX_LINES]):
+            if i >= DayCell.MAX_LINES - 1 and len(day_events) > DayCell.MAX_LINES:
+                lines.append((None, f"+{len(day_events) - i} more"))
+                break
+            
+            # Event color dot and text
+            color = self.calendar_manager.event_colors.get(event.event_type, "#3B82F6")
+            time_str = event.start_time.strftime("%H:%M")
+            event_text = f"{time_str} {event.title}"
+            if len(event_text) > 15:
+                event_text = event_text[:12] + "..."
+            lines.append((color, event_text))
+        return lines
+    
+    def _cell_for(self, day: date) -> Optional[DayCell]:
+        """Cell showing `day` in the current month, if any"""
+        if (day.year, day.month) != (self.current_date.year, self.current_date.month):
+            return None
+        first_weekday = date(day.year, day.month, 1).weekday()
+        index = first_weekday + day.day - 1
+        return self.cells[index // 7][index % 7]
+    
+    def refresh_calendar(self):
+        """Bring the grid in line with the current month; only cells that differ are touched"""
+        if self.cells is None:
+            self.build_grid()
+        
+        # Update month label
+        self.month_label.config(text=self.current_date.strftime("%B %Y"))
+        
+        year, month = self.current_date.year, self.current_date.month
+        events_by_day = self.calendar_manager.get_events_for_month(year, month)
+        weeks = calendar.monthcalendar(year, month)
+        changed = 0
+        for row_num, cells in enumerate(self.cells):
+            week = weeks[row_num] if row_num < len(weeks) else [0] * 7
+            for cell, day in zip(cells, week):
+                if day == 0:
+                    changed += cell.hide()
+                else:
+                    lines = self.cell_lines(events_by_day.get(date(year, month, day), []))
+                    changed += cell.show(day, lines)
+        return changed
+    
+    def refresh_days(self, days: Iterable[date]) -> int:
+        """Re-render just the cells of the given dates (e.g. after adding an event)"""
+        if self.cells is None:
+            return self.refresh_calendar()
+        changed = 0
+        for day in set(days):
+            cell = self._cell_for(day)
+            if cell is not None:
+                lines = self.cell_lines(self.calendar_manager.get_events_for_date(day))
+                changed += cell.show(day.day, lines)
+        return changed
+    
+    def add_event(self):
+        """Add a new event using the calendar GUI"""
+        title = self.title_var.get().strip()
+        if not title:
+            messagebox.showwarning("Invalid Input", "Please enter an event title")
+            return
+        
+        try:
+            # Parse inputs
+            date_str = self.date_var.get().strip()
+            time_str = self.time_var.get().strip()
+            am_pm = self.ampm_var.get().strip()
+            event_type = EventType(self.type_var.get())
+            
+            # Create event using calendar manager
+            event = self.calendar_manager.create_event_with_time_input(
+                title=title,
+                date_str=date_str,
+                time_str=time_str,
+                duration_minutes=60,
+                event_type=event_type,
+                am_pm=am_pm
+            )
+            
+            if event:
+                # Clear inputs
+                self.title_var.set("")
+                self.time_var.set("09:00")
+                self.ampm_var.set("AM")
+                
+                # Re-render only the day the event landed on
+                self.refresh_days([event.start_time.date()])
+                messagebox.showinfo("Success", "Event added successfully!")
+            else:
+                messagebox.showerror("Error", "Failed to create event")
+                
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to add event: {str(e)}")
+
+# Example usage and testing
+if __name__ == "__main__":
+    root = tk.Tk()
+    root.title("Flow State Calendar")
+    root.geometry("900x700")
+    
+    # Initialize calendar manager
+    cm = CalendarManager()
+    
+    # Create calendar GUI
+    cal_gui = CalendarGUI(root, cm)
+    
+    root.mainloop()
@@ -1,22 +1,30 @@
 #!/usr/bin/env python3
 """
 Advanced calendar manager for study scheduling with flow state optimization
-Consolidated version including GUI functionality
+Headless core; the Tkinter month view lives in calendar_gui
 """
 
-import json
 import os
+import shutil
 from datetime import datetime, timedelta, date, time
-from typing import List, Dict, Optional, Tuple, Set
-from dataclasses import dataclass, asdict
+from typing import List, Dict, Iterator, Optional, Tuple, Set
 from enum import Enum
 import uuid
 import calendar
 import threading
-import tkinter as tk
-from tkinter import ttk, messagebox
-import time as time_module
-import winsound
+from contextlib import contextmanager
+from itertools import islice
+
+from records import record, enum_lookup
+from search_index import SearchIndex
+from event_index import EventIndex
+from event_stats import CalendarStats, week_end, week_key
+from free_busy import WorkingHours, free_intervals, merge_busy, slots
+from lru import LRUCache
+from recurrence import RecurrenceCache, occurrence_id, parse_occurrence_id
+from reminder_scheduler import ReminderScheduler
+from notifications import Notification, NotificationDispatcher, default_sinks
+import json_codec
 
 class EventType(Enum):
     STUDY_SESSION = "study_session"
@@ -40,7 +48,7 @@ class Priority(Enum):
     HIGH = 3
     CRITICAL = 4
 
-@dataclass
+@record
 class CalendarEvent:
     id: str
     title: str
@@ -54,6 +62,11 @@ class CalendarEvent:
     task_id: Optional[str] = None
     recurrence: RecurrenceType = RecurrenceType.NONE
     recurrence_end: Optional[datetime] = None
+    recurrence_interval: int = 1  # every N days/weeks/months
+    recurrence_count: Optional[int] = None  # total occurrences, like RRULE COUNT
+    recurrence_exceptions: List[datetime] = None  # occurrence starts removed or edited
+    recurrence_master: Optional[str] = None  # set on occurrences and edited occurrences
+    original_start: Optional[datetime] = None  # occurrence start before it was edited
     reminder_minutes: List[int] = None  # Minutes before event to remind
     color: str = "#3B82F6"
     is_completed: bool = False
@@ -65,10 +78,12 @@ class CalendarEvent:
             self.created_at = datetime.now()
         if self.tags is None:
             self.tags = []
+        if self.recurrence_exceptions is None:
+            self.recurrence_exceptions = []
         if self.reminder_minutes is None:
             self.reminder_minutes = [15]  # Default 15 minutes reminder
 
-@dataclass
+@record(frozen=True)
 class StudyBlock:
     """Represents an optimal study time block"""
     start_time: datetime
@@ -80,12 +95,76 @@ class StudyBlock:
     
     def __post_init__(self):
         if self.duration_minutes == 0:
-            self.duration_minutes = int((self.end_time - self.start_time).total_seconds() / 60)
+            object.__setattr__(self, 'duration_minutes',
+                               int((self.end_time - self.start_time).total_seconds() / 60))
+
+# 2: recurring series stored once (files without it may hold per-occurrence copies)
+CALENDAR_FORMAT = 2
+
+_EVENT_TYPES = enum_lookup(EventType)
+_PRIORITIES = enum_lookup(Priority)
+_RECURRENCES = enum_lookup(RecurrenceType)
+
+def event_to_dict(event: CalendarEvent) -> dict:
+    """Convert event to dictionary for JSON serialization (lists are shared, not copied)"""
+    return {
+        'id': event.id,
+        'title': event.title,
+        'description': event.description,
+        'start_time': event.start_time.isoformat(),
+        'end_time': event.end_time.isoformat(),
+        'event_type': event.event_type.value,
+        'priority': event.priority.value,
+        'location': event.location,
+        'tags': event.tags,
+        'task_id': event.task_id,
+        'recurrence': event.recurrence.value,
+        'recurrence_end': event.recurrence_end.isoformat() if event.recurrence_end else None,
+        'recurrence_interval': event.recurrence_interval,
+        'recurrence_count': event.recurrence_count,
+        'recurrence_exceptions': [start.isoformat() for start in event.recurrence_exceptions],
+        'recurrence_master': event.recurrence_master,
+        'original_start': event.original_start.isoformat() if event.original_start else None,
+        'reminder_minutes': event.reminder_minutes,
+        'color': event.color,
+        'is_completed': event.is_completed,
+        'notes': event.notes,
+        'created_at': event.created_at.isoformat(),
+    }
+
+def event_from_dict(data: dict) -> CalendarEvent:
+    """Convert dictionary to event object"""
+    recurrence_end = data.get('recurrence_end')
+    original_start = data.get('original_start')
+    return CalendarEvent(
+        id=data['id'],
+        title=data['title'],
+        description=data.get('description', ""),
+        start_time=datetime.fromisoformat(data['start_time']),
+        end_time=datetime.fromisoformat(data['end_time']),
+        event_type=_EVENT_TYPES[data['event_type']],
+        priority=_PRIORITIES[data['priority']],
+        location=data.get('location', ""),
+        tags=data.get('tags'),
+        task_id=data.get('task_id'),
+        recurrence=_RECURRENCES[data.get('recurrence', 'none')],
+        recurrence_end=datetime.fromisoformat(recurrence_end) if recurrence_end else None,
+        recurrence_interval=data.get('recurrence_interval', 1),
+        recurrence_count=data.get('recurrence_count'),
+        recurrence_exceptions=[datetime.fromisoformat(s) for s in data.get('recurrence_exceptions', ())],
+        recurrence_master=data.get('recurrence_master'),
+        original_start=datetime.fromisoformat(original_start) if original_start else None,
+        reminder_minutes=data.get('reminder_minutes'),
+        color=data.get('color', "#3B82F6"),
+        is_completed=data.get('is_completed', False),
+        notes=data.get('notes', ""),
+        created_at=datetime.fromisoformat(data['created_at']),
+    )
 
 class FlowCalendarOptimizer:
     """Optimizes calendar scheduling based on flow state principles"""
     
-    def __init__(self):
+    def __init__(self, block_cache_size: int = 256):
         # Default energy and focus patterns throughout the day
         self.daily_patterns = {
             6: {'energy': 3, 'focus': 4},   # Early morning
@@ -117,64 +196,74 @@ class FlowCalendarOptimizer:
             (2, 2): ['break', 'exercise', 'casual_review'],
             (1, 1): ['rest', 'meditation', 'light_activities']
         }
+        
+        # Learned curves (flow_patterns.FlowPatternModel) replace the table when set; the
+        # table is then only their starting point
+        self.pattern_model = None
+        
+        # Study blocks per (date, durations, busy intervals, that day's levels)
+        self.block_cache = LRUCache(block_cache_size)
+    
+    def day_profile(self, target_date: date) -> tuple:
+        """(energy, focus) for each hour of the date, learned if a pattern model is set"""
+        if self.pattern_model is not None:
+            return self.pattern_model.profile(target_date.weekday())
+        default = {'energy': 3, 'focus': 3}
+        return tuple((pattern['energy'], pattern['focus'])
+                     for pattern in (self.daily_patterns.get(hour, default) for hour in range(24)))
+    
+    def invalidate_blocks(self, start_date: Optional[date] = None, end_date: Optional[date] = None):
+        """Forget cached study blocks for the dates in [start_date, end_date] (all if None)"""
+        if start_date is None:
+            self.block_cache.clear()
+        else:
+            end_date = end_date or start_date
+            self.block_cache.discard_where(lambda key: start_date <= key[0] <= end_date)
     
     def get_optimal_study_blocks(self, target_date: date, 
                                existing_events: List[CalendarEvent],
                                min_block_duration: int = 25,
                                max_block_duration: int = 120) -> List[StudyBlock]:
-        """Find optimal study blocks for a given date"""
-        study_blocks = []
+        """Find optimal study blocks for a given date (memoised on the day's busy times)"""
+        start_time = datetime.combine(target_date, time(6))
+        end_time = datetime.combine(target_date, time(23))
+        
+        # Busy times from existing events, clipped to the day: events outside it drop out,
+        # and ones that started the day before still block the morning
+        busy_times = tuple(merge_busy(sorted(
+            (max(event.start_time, start_time), min(event.end_time, end_time))
+            for event in existing_events
+            if event.start_time < end_time and event.end_time > start_time
+        )))
+        profile = self.day_profile(target_date)
+        key = (target_date, min_block_duration, max_block_duration, busy_times, profile)
+        cached = self.block_cache.get(key)
+        if cached is not None:
+            return list(cached)
         
-        # Create time slots for the day (every 15 minutes from 6 AM to 11 PM)
-        start_time = datetime.combine(target_date, datetime.min.time().replace(hour=6))
-        end_time = datetime.combine(target_date, datetime.min.time().replace(hour=23))
-        
-        # Get busy times from existing events
-        busy_times = []
-        for event in existing_events:
-            if event.start_time.date() == target_date:
-                busy_times.append((event.start_time, event.end_time))
-        
-        # Sort busy times
-        busy_times.sort(key=lambda x: x[0])
-        
-        # Find free time slots
-        current_time = start_time
-        for busy_start, busy_end in busy_times:
-            if current_time < busy_start:
-                # Found a free slot
-                free_duration = int((busy_start - current_time).total_seconds() / 60)
-                if free_duration >= min_block_duration:
-                    # Create study blocks within this free time
-                    blocks = self._create_study_blocks_in_timespan(
-                        current_time, busy_start, min_block_duration, max_block_duration
-                    )
-                    study_blocks.extend(blocks)
-            current_time = max(current_time, busy_end)
-        
-        # Check for free time after last event
-        if current_time < end_time:
-            free_duration = int((end_time - current_time).total_seconds() / 60)
+        study_blocks = []
+        for free_start, free_end in free_intervals(busy_times, [(start_time, end_time)]):
+            free_duration = int((free_end - free_start).total_seconds() / 60)
             if free_duration >= min_block_duration:
-                blocks = self._create_study_blocks_in_timespan(
-                    current_time, end_time, min_block_duration, max_block_duration
-                )
-                study_blocks.extend(blocks)
+                # Create study blocks within this free time
+                study_blocks.extend(self._create_study_blocks_in_timespan(
+                    free_start, free_end, min_block_duration, max_block_duration, profile
+                ))
         
+        self.block_cache.put(key, tuple(study_blocks))
         return study_blocks
     
     def _create_study_blocks_in_timespan(self, start: datetime, end: datetime,
-                                       min_duration: int, max_duration: int) -> List[StudyBlock]:
-        """Create optimal study blocks within a time span"""
+                                       min_duration: int, max_duration: int,
+                                       profile: Optional[tuple] = None) -> List[StudyBlock]:
+        """Create optimal study blocks within a time span (on one day)"""
         blocks = []
         current = start
+        profile = profile or self.day_profile(start.date())
         
         while current < end:
             # Get energy and focus levels for current time
-            hour = current.hour
-            pattern = self.daily_patterns.get(hour, {'energy': 3, 'focus': 3})
-            energy = pattern['energy']
-            focus = pattern['focus']
+            energy, focus = profile[current.hour]
             
             # Determine optimal block duration based on energy/focus
             if energy >= 4 and focus >= 4:
@@ -266,9 +355,15 @@ class FlowCalendarOptimizer:
 class NotificationSystem:
     """Handles event notifications and alarms"""
     
-    def __init__(self):
+    def __init__(self, state_file: Optional[str] = None, headless: bool = False):
         self.notification_thread = None
         self.running = False
+        self.scheduler = ReminderScheduler(state_file)
+        # Sinks run on the dispatcher's worker, so a slow one never delays the schedule
+        self.dispatcher = NotificationDispatcher(default_sinks(headless))
+        self._wakeup = threading.Condition()
+        self._dirty = True  # the heap needs a full build (first run)
+        self._changed: Set[str] = set()  # stored event ids changed since the last re-arm
         
     def start_monitoring(self, calendar_manager):
         """Start monitoring for upcoming events"""
@@ -283,86 +378,97 @@ class NotificationSystem:
     
     def stop_monitoring(self):
         """Stop monitoring for events"""
-        self.running = False
+        with self._wakeup:
+            self.running = False
+            self._wakeup.notify_all()
+        self.dispatcher.stop()
+    
+    def event_changed(self, event_id: str):
+        """Note a stored event (or series) whose reminders must be re-armed"""
+        with self._wakeup:
+            self._changed.add(event_id)
+    
+    def reschedule(self):
+        """Changes were saved: re-arm their reminders on the monitor thread"""
+        with self._wakeup:
+            if self._changed:
+                self._wakeup.notify_all()
     
     def _monitor_events(self, calendar_manager):
-        """Monitor events and send notifications"""
+        """Sleep until the next reminder is due, fire it, repeat"""
+        scheduler = self.scheduler
         while self.running:
             try:
                 current_time = datetime.now()
-                upcoming_events = calendar_manager.get_upcoming_events(days=1)
+                with self._wakeup:
+                    rebuild = self._dirty or scheduler.needs_refill(current_time)
+                    changed, self._changed = self._changed, set()
+                    self._dirty = False
+                start, end = scheduler.lookahead(current_time)
+                if rebuild:
+                    scheduler.rebuild(calendar_manager.reminder_events(start, end), current_time)
+                elif changed:
+                    scheduler.rearm(changed, calendar_manager.reminder_events(start, end, changed),
+                                    current_time)
+                
+                for reminder in scheduler.pop_due(current_time):
+                    if reminder.minutes_before is None:
+                        self._send_start_notification(reminder.event)
+                    else:
+                        self._send_notification(reminder.event, reminder.minutes_before)
                 
-                for event in upcoming_events:
-                    for reminder_minutes in event.reminder_minutes:
-                        reminder_time = event.start_time - timedelta(minutes=reminder_minutes)
-                        
-                        # Check if we should send notification (within 1 minute)
-                        time_diff = abs((current_time - reminder_time).total_seconds())
-                        if time_diff <= 30:  # 30 second window
-                            self._send_notification(event, reminder_minutes)
-                    
-                    # Check for event start time (exact time notification)
-                    start_time_diff = abs((current_time - event.start_time).total_seconds())
-                    if start_time_diff <= 30:  # 30 second window
-                        self._play_alarm()
-                        self._send_start_notification(event)
-                        
+                wakeup = scheduler.next_wakeup()
+                timeout = max(0.0, (wakeup - datetime.now()).total_seconds()) if wakeup else None
             except Exception as e:
                 print(f"Error in notification monitoring: {e}")
+                timeout = 30
+                with self._wakeup:
+                    self._dirty = True  # the changes taken above were not applied
             
-            time_module.sleep(30)  # Check every 30 seconds
+            with self._wakeup:
+                if self.running and not self._changed:
+                    self._wakeup.wait(timeout)
     
     def _send_notification(self, event: CalendarEvent, minutes_before: int):
-        """Send notification for upcoming event"""
-        try:
-            title = "Upcoming Event Reminder"
-            message = f"{event.title}\n\nStarts in {minutes_before} minutes\nTime: {event.start_time.strftime('%H:%M')}"
-            
-            # Try to show system notification if tkinter is available
-            try:
-                root = tk.Tk()
-                root.withdraw()  # Hide main window
-                messagebox.showinfo(title, message)
-                root.destroy()
-            except:
-                print(f"REMINDER: {message}")
-        except Exception as e:
-            print(f"Error sending notification: {e}")
+        """Queue a reminder for an upcoming event"""
+        self.dispatcher.post(Notification(
+            kind='reminder',
+            title="Upcoming Event Reminder",
+            message=f"{event.title}\n\nStarts in {minutes_before} minutes\nTime: {event.start_time.strftime('%H:%M')}",
+            key=f"reminder|{event.id}|{event.start_time.isoformat()}|{minutes_before}",
+            event_id=event.id,
+            created_at=datetime.now()
+        ))
     
     def _send_start_notification(self, event: CalendarEvent):
-        """Send notification when event starts"""
-        try:
-            title = "Event Started"
-            message = f"{event.title} has started!\n\nTime: {event.start_time.strftime('%H:%M')}"
-            
-            try:
-                root = tk.Tk()
-                root.withdraw()
-                messagebox.showinfo(title, message)
-                root.destroy()
-            except:
-                print(f"EVENT STARTED: {message}")
-        except Exception as e:
-            print(f"Error sending start notification: {e}")
-    
-    def _play_alarm(self):
-        """Play alarm sound"""
-        try:
-            # Play Windows system sound for 0.5 seconds
-            winsound.Beep(1000, 500)  # 1000 Hz for 500ms
-        except Exception as e:
-            print(f"Could not play alarm: {e}")
-            # Fallback: print alert
-            print("\a" * 3)  # Terminal bell
+        """Queue the notification (and alarm) for an event that starts now"""
+        self.dispatcher.post(Notification(
+            kind='start',
+            title="Event Started",
+            message=f"{event.title} has started!\n\nTime: {event.start_time.strftime('%H:%M')}",
+            key=f"start|{event.id}|{event.start_time.isoformat()}",
+            event_id=event.id,
+            created_at=datetime.now()
+        ))
 
 class CalendarManager:
     """Advanced calendar management system"""
     
-    def __init__(self, data_file: str = "calendar.json"):
+    def __init__(self, data_file: str = "calendar.json", enable_notifications: bool = True,
+                 headless: bool = False):
         self.data_file = data_file
         self.events: Dict[str, CalendarEvent] = {}
+        self.index = EventIndex()
+        self.recurring: Dict[str, CalendarEvent] = {}  # master id -> master, expanded on demand
+        self.recurrence_cache = RecurrenceCache()
+        self.lock = threading.RLock()  # index and masters, shared with the reminder thread
+        self.stats = CalendarStats()  # rollups kept in step with the indexes
+        self.search_index = SearchIndex()
         self.optimizer = FlowCalendarOptimizer()
-        self.notification_system = NotificationSystem()
+        self.notification_system = NotificationSystem(os.path.splitext(data_file)[0] + '.reminders.json',
+                                                      headless)
+        self._batch_depth = 0  # inside batch(): saves are deferred to its end
+        self._batch_dirty = False
         
         # Event type color mappings
         self.event_colors = {
@@ -377,58 +483,180 @@ class CalendarManager:
         }
         
         self.load_events()
+        self.search_index.rebuild(self.events.values())
         # Start notification monitoring
-        self.notification_system.start_monitoring(self)
+        if enable_notifications:
+            self.notification_system.start_monitoring(self)
     
     def load_events(self):
-        """Load events from file"""
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, 'r') as f:
-                    data = json.load(f)
-                    for event_data in data.get('events', []):
-                        event = self._dict_to_event(event_data)
-                        self.events[event.id] = event
-            except Exception as e:
-                print(f"Error loading events: {e}")
+        """Load events from file, migrating a file from before stored series once"""
+        if not os.path.exists(self.data_file):
+            return
+        try:
+            data = json_codec.load_file(self.data_file)
+            records = data.get('events', [])
+            for item in records:
+                event = event_from_dict(item)
+                self.events[event.id] = event
+        except Exception as e:
+            print(f"Error loading events: {e}")
+            return
+        migrated = 0
+        if data.get('format', 1) < CALENDAR_FORMAT:
+            # Older versions wrote no recurrence_exceptions; their series came with copies
+            legacy = [self.events[item['id']] for item in records
+                      if item.get('recurrence', 'none') != 'none' and 'recurrence_exceptions' not in item]
+            migrated = self._migrate_legacy_series(legacy)
+        for event in self.events.values():
+            self._index_time(event)
+        if migrated:
+            backup = self.data_file + '.pre-series.bak'
+            if not os.path.exists(backup):
+                shutil.copy2(self.data_file, backup)
+            self.save_events()
+            print(f"Migrated {migrated} recurring series (backup: {backup})")
+    
+    # What older versions stored: the master plus up to 52 copies, 1, 7 or 30 days apart
+    _LEGACY_STEPS = {RecurrenceType.DAILY: timedelta(days=1), RecurrenceType.WEEKLY: timedelta(weeks=1),
+                     RecurrenceType.MONTHLY: timedelta(days=30)}
+    _LEGACY_COPIES = 52
+    
+    def _migrate_legacy_series(self, masters: List[CalendarEvent]) -> int:
+        """Turn masters with stored copies into generated series showing the same events
+        
+        Runs on loaded, not yet indexed events. Monthly series become every 30 days and
+        open-ended ones get a count, so the generator lands on the old dates. A copy the
+        generator would recreate as-is is dropped; one that was edited (completed, notes,
+        tags, ...) becomes an edited occurrence. A date whose copy was deleted or moved
+        becomes an exception, so nothing appears or disappears.
+        """
+        copies = {}
+        for event in self.events.values():
+            if event.recurrence == RecurrenceType.NONE and not event.recurrence_master:
+                copies.setdefault((event.title, event.event_type, event.start_time, event.end_time),
+                                  []).append(event)
+        for master in masters:
+            step = self._LEGACY_STEPS.get(master.recurrence)
+            if step is None:
+                continue
+            if master.recurrence == RecurrenceType.MONTHLY:
+                master.recurrence, master.recurrence_interval = RecurrenceType.DAILY, 30
+            if master.recurrence_end is None and master.recurrence_count is None:
+                master.recurrence_count = self._LEGACY_COPIES + 1  # COUNT includes the master
+            for n in range(1, self._LEGACY_COPIES + 1):
+                start = master.start_time + step * n
+                if master.recurrence_end and start > master.recurrence_end:
+                    break
+                matches = copies.get((master.title, master.event_type, start, master.end_time + step * n))
+                if not matches:
+                    master.recurrence_exceptions.append(start)
+                    continue
+                copy = matches.pop(0)
+                if self._same_as_occurrence(copy, master):
+                    del self.events[copy.id]
+                else:
+                    copy.recurrence_master, copy.original_start = master.id, start
+                    master.recurrence_exceptions.append(start)
+        return len(masters)
+    
+    @staticmethod
+    def _same_as_occurrence(event: CalendarEvent, master: CalendarEvent) -> bool:
+        """Whether the occurrence generated from master would carry everything event does"""
+        return (not event.is_completed
+                and (event.description, event.priority, event.location, event.tags, event.task_id,
+                     event.reminder_minutes, event.color, event.notes)
+                == (master.description, master.priority, master.location, master.tags, master.task_id,
+                    master.reminder_minutes, master.color, master.notes))
     
-    def save_events(self):
-        """Save events to file"""
+    def save_events(self, pretty: Optional[bool] = None):
+        """Save events to file (compact unless pretty); deferred inside batch()"""
+        if self._batch_depth:
+            self._batch_dirty = True
+            return
         try:
             data = {
-                'events': [self._event_to_dict(event) for event in self.events.values()],
+                'format': CALENDAR_FORMAT,
+                'events': [event_to_dict(event) for event in self.events.values()],
                 'last_updated': datetime.now().isoformat()
             }
-            with open(self.data_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            json_codec.dump_file(self.data_file, data, pretty)
         except Exception as e:
             print(f"Error saving events: {e}")
+        self.notification_system.reschedule()
+    
+    @contextmanager
+    def batch(self):
+        """Group changes so they are committed with a single save when the block ends
+        
+            with calendar_manager.batch():
+                for ...: calendar_manager.create_event(...)
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._batch_dirty:
+                self._batch_dirty = False
+                self.save_events()
+    
+    def _index_time(self, event: CalendarEvent):
+        """Date-index a plain event; recurring masters are expanded at query time instead"""
+        with self.lock:
+            if event.recurrence != RecurrenceType.NONE:
+                self.recurring[event.id] = event
+                self.recurrence_cache.invalidate(event.id)
+                self.optimizer.invalidate_blocks()
+                self.stats.add_series(event, self._series_starts(event))
+            else:
+                self.index.add(event)
+                self.optimizer.invalidate_blocks(event.start_time.date(), event.end_time.date())
+                self.stats.add_event(event)
+        self.notification_system.event_changed(event.id)
+    
+    def _unindex(self, event: CalendarEvent):
+        """Take an event out of the indexes before it changes or is removed"""
+        with self.lock:
+            if self.recurring.pop(event.id, None) is not None:
+                self.stats.add_series(event, self._series_starts(event), -1)
+                self.recurrence_cache.invalidate(event.id)
+                self.optimizer.invalidate_blocks()
+            else:
+                self.index.remove(event)
+                self.optimizer.invalidate_blocks(event.start_time.date(), event.end_time.date())
+                self.stats.add_event(event, -1)
+        self.search_index.remove(event.id)
+        self.notification_system.event_changed(event.id)
     
-    def _event_to_dict(self, event: CalendarEvent) -> dict:
-        """Convert event to dictionary for JSON serialization"""
-        event_dict = asdict(event)
-        event_dict['event_type'] = event.event_type.value
-        event_dict['priority'] = event.priority.value
-        event_dict['recurrence'] = event.recurrence.value
-        event_dict['start_time'] = event.start_time.isoformat()
-        event_dict['end_time'] = event.end_time.isoformat()
-        event_dict['created_at'] = event.created_at.isoformat()
-        if event.recurrence_end:
-            event_dict['recurrence_end'] = event.recurrence_end.isoformat()
-        return event_dict
-    
-    def _dict_to_event(self, event_dict: dict) -> CalendarEvent:
-        """Convert dictionary to event object"""
-        event_dict = event_dict.copy()
-        event_dict['event_type'] = EventType(event_dict['event_type'])
-        event_dict['priority'] = Priority(event_dict['priority'])
-        event_dict['recurrence'] = RecurrenceType(event_dict['recurrence'])
-        event_dict['start_time'] = datetime.fromisoformat(event_dict['start_time'])
-        event_dict['end_time'] = datetime.fromisoformat(event_dict['end_time'])
-        event_dict['created_at'] = datetime.fromisoformat(event_dict['created_at'])
-        if event_dict.get('recurrence_end'):
-            event_dict['recurrence_end'] = datetime.fromisoformat(event_dict['recurrence_end'])
-        return CalendarEvent(**event_dict)
+    def _series_starts(self, master: CalendarEvent) -> List[datetime]:
+        """Occurrence starts of a master that the statistics count (up to their horizon)"""
+        return self.recurrence_cache.starts_between(master, None, self.stats.horizon, False)
+    
+    def _advance_stats_horizon(self, now: datetime):
+        """Count series occurrences of the weeks that have begun since the horizon was set"""
+        horizon = week_end(now)
+        with self.lock:
+            old = self.stats.horizon
+            if horizon <= old:
+                return
+            self.stats.move_horizon(horizon)
+            for master in self.recurring.values():
+                self.stats.add_series(master, self.recurrence_cache.starts_between(master, old, horizon, False))
+    
+    def _reindex(self, event: CalendarEvent):
+        """Put a new or changed event back into the indexes"""
+        self._index_time(event)
+        self.search_index.add(event)
+    
+    def add_events(self, events: List[CalendarEvent]):
+        """Add prepared events (e.g. a study plan) with a single save"""
+        with self.lock:
+            for event in events:
+                if event.id in self.events:
+                    self._unindex(self.events[event.id])
+                self.events[event.id] = event
+                self._reindex(event)
+        self.save_events()
     
     def create_event(self, title: str, start_time: datetime, end_time: datetime,
                     event_type: EventType = EventType.STUDY_SESSION,
@@ -437,8 +665,10 @@ class CalendarManager:
                     tags: List[str] = None, task_id: str = None,
                     recurrence: RecurrenceType = RecurrenceType.NONE,
                     reminder_minutes: List[int] = None,
-                    color: str = None) -> CalendarEvent:
-        """Create a new calendar event"""
+                    color: str = None, recurrence_end: Optional[datetime] = None,
+                    recurrence_interval: int = 1,
+                    recurrence_count: Optional[int] = None) -> CalendarEvent:
+        """Create a new calendar event (a recurring event is stored once and expanded lazily)"""
         # Auto-assign color based on event type if not provided
         if color is None:
             color = self.event_colors.get(event_type, "#3B82F6")
@@ -455,16 +685,16 @@ class CalendarManager:
             tags=tags or [],
             task_id=task_id,
             recurrence=recurrence,
+            recurrence_end=recurrence_end,
+            recurrence_interval=recurrence_interval,
+            recurrence_count=recurrence_count,
             reminder_minutes=reminder_minutes or [15],
             color=color
         )
         
-        self.events[event.id] = event
-        
-        # Create recurring events if needed
-        if recurrence != RecurrenceType.NONE:
-            self._create_recurring_events(event)
-        
+        with self.lock:
+            self.events[event.id] = event
+            self._reindex(event)
         self.save_events()
         
         # Show success message
@@ -508,136 +738,218 @@ class CalendarManager:
             print(f"Error creating event: {e}")
             return None
     
-    def _create_recurring_events(self, base_event: CalendarEvent):
-        """Create recurring events based on recurrence pattern"""
-        if base_event.recurrence == RecurrenceType.NONE:
-            return
-        
-        current_start = base_event.start_time
-        current_end = base_event.end_time
-        
-        # Determine recurrence delta
-        if base_event.recurrence == RecurrenceType.DAILY:
-            delta = timedelta(days=1)
-        elif base_event.recurrence == RecurrenceType.WEEKLY:
-            delta = timedelta(weeks=1)
-        elif base_event.recurrence == RecurrenceType.MONTHLY:
-            delta = timedelta(days=30)  # Approximate
-        else:
-            return
+    def _occurrence(self, master: CalendarEvent, start: datetime) -> CalendarEvent:
+        """One generated occurrence of a recurring master (not stored)"""
+        return CalendarEvent(
+            id=occurrence_id(master.id, start),
+            title=master.title,
+            description=master.description,
+            start_time=start,
+            end_time=start + (master.end_time - master.start_time),
+            event_type=master.event_type,
+            priority=master.priority,
+            location=master.location,
+            tags=master.tags.copy(),
+            task_id=master.task_id,
+            reminder_minutes=master.reminder_minutes.copy(),
+            color=master.color,
+            notes=master.notes,
+            created_at=master.created_at,
+            recurrence_master=master.id,
+            original_start=start
+        )
+    
+    def _occurrences_between(self, start: Optional[datetime], end: datetime,
+                             inclusive_end: bool = True) -> List[CalendarEvent]:
+        """Generated occurrences of every recurring master starting in the range"""
+        occurrences = []
+        for master in self.recurring.values():
+            for occurrence_start in self.recurrence_cache.starts_between(master, start, end, inclusive_end):
+                occurrences.append(self._occurrence(master, occurrence_start))
+        return occurrences
+    
+    def _events_between(self, start: Optional[datetime], end: datetime,
+                        inclusive_end: bool = True) -> List[CalendarEvent]:
+        """Stored events and generated occurrences starting in the range, by start time"""
+        with self.lock:
+            events = [self.events[event_id] for event_id in self.index.between(start, end, inclusive_end)]
+            if self.recurring:
+                events += self._occurrences_between(start, end, inclusive_end)
+                events.sort(key=lambda e: (e.start_time, e.id))
+        return events
+    
+    def reminder_events(self, start: datetime, end: datetime,
+                        changed: Optional[Set[str]] = None) -> List[Tuple[str, CalendarEvent]]:
+        """(source id, event) pairs starting in [start, end] for the reminder thread
+        
+        The source is the stored event a reminder comes from: the event itself, or the
+        master of a generated occurrence. With `changed`, only those sources are looked up.
+        """
+        with self.lock:
+            if changed is None:
+                pairs = [(event_id, self.events[event_id]) for event_id in self.index.between(start, end)]
+                masters = list(self.recurring.values())
+            else:
+                pairs, masters = [], []
+                for event_id in changed:
+                    event = self.events.get(event_id)
+                    if event is None:
+                        continue  # deleted: its reminders just go
+                    if event.recurrence != RecurrenceType.NONE:
+                        masters.append(event)
+                    elif start <= event.start_time <= end:
+                        pairs.append((event_id, event))
+            for master in masters:
+                for occurrence_start in self.recurrence_cache.starts_between(master, start, end):
+                    pairs.append((master.id, self._occurrence(master, occurrence_start)))
+        return pairs
+    
+    def _occurrence_master(self, event_id: str) -> Optional[Tuple[CalendarEvent, datetime]]:
+        """(master, original start) if event_id names a generated occurrence"""
+        parsed = parse_occurrence_id(event_id)
+        if parsed is None:
+            return None
+        master = self.recurring.get(parsed[0])
+        if master is None or not self.recurrence_cache.is_occurrence(master, parsed[1]):
+            return None
+        return master, parsed[1]
+    
+    def _add_exception(self, master: CalendarEvent, start: datetime):
+        with self.lock:
+            self._unindex(master)
+            master.recurrence_exceptions.append(start)
+            self._reindex(master)
+    
+    def update_occurrence(self, master_id: str, original_start: datetime,
+                          **kwargs) -> Optional[CalendarEvent]:
+        """Edit one occurrence of a series; it becomes a stored event linked to the master"""
+        master = self.recurring.get(master_id)
+        if master is None or not self.recurrence_cache.is_occurrence(master, original_start):
+            return None
         
-        # Create recurring events (limit to avoid infinite loops)
-        max_occurrences = 52  # Max 1 year of weekly events
-        occurrence_count = 0
+        event = self._occurrence(master, original_start)
+        event.id = str(uuid.uuid4())
+        for key, value in kwargs.items():
+            if hasattr(event, key) and key not in ('id', 'recurrence', 'recurrence_master'):
+                setattr(event, key, value)
+        with self.lock:
+            self._add_exception(master, original_start)
+            self.events[event.id] = event
+            self._reindex(event)
         
-        while occurrence_count < max_occurrences:
-            current_start += delta
-            current_end += delta
-            
-            # Check if we've exceeded the recurrence end date
-            if (base_event.recurrence_end and 
-                current_start > base_event.recurrence_end):
-                break
-            
-            # Create recurring event
-            recurring_event = CalendarEvent(
-                id=str(uuid.uuid4()),
-                title=base_event.title,
-                description=base_event.description,
-                start_time=current_start,
-                end_time=current_end,
-                event_type=base_event.event_type,
-                priority=base_event.priority,
-                location=base_event.location,
-                tags=base_event.tags.copy(),
-                task_id=base_event.task_id,
-                recurrence=RecurrenceType.NONE,  # Don't recurse
-                reminder_minutes=base_event.reminder_minutes.copy(),
-                color=base_event.color
-            )
-            
-            self.events[recurring_event.id] = recurring_event
-            occurrence_count += 1
+        self.save_events()
+        return event
+    
+    def delete_occurrence(self, master_id: str, original_start: datetime) -> bool:
+        """Remove one occurrence of a series (an exception date on the master)"""
+        master = self.recurring.get(master_id)
+        if master is None or not self.recurrence_cache.is_occurrence(master, original_start):
+            return False
+        self._add_exception(master, original_start)
+        self.save_events()
+        return True
     
     def update_event(self, event_id: str, **kwargs) -> bool:
-        """Update an existing event"""
+        """Update an existing event (an occurrence id edits just that occurrence)"""
         if event_id not in self.events:
-            return False
+            occurrence = self._occurrence_master(event_id)
+            if occurrence is None:
+                return False
+            return self.update_occurrence(occurrence[0].id, occurrence[1], **kwargs) is not None
         
         event = self.events[event_id]
-        for key, value in kwargs.items():
-            if hasattr(event, key):
-                setattr(event, key, value)
+        with self.lock:
+            self._unindex(event)
+            for key, value in kwargs.items():
+                if hasattr(event, key):
+                    setattr(event, key, value)
+            self._reindex(event)
         
         self.save_events()
         return True
     
     def delete_event(self, event_id: str) -> bool:
-        """Delete an event"""
+        """Delete an event; a series goes with its edited occurrences, an occurrence id removes one"""
         if event_id in self.events:
-            del self.events[event_id]
+            with self.lock:
+                event = self.events.pop(event_id)
+                self._unindex(event)
+                if event.recurrence != RecurrenceType.NONE:
+                    for edited in [e for e in self.events.values() if e.recurrence_master == event_id]:
+                        self._unindex(self.events.pop(edited.id))
             self.save_events()
             return True
-        return False
+        occurrence = self._occurrence_master(event_id)
+        if occurrence is None:
+            return False
+        return self.delete_occurrence(occurrence[0].id, occurrence[1])
     
     def get_event(self, event_id: str) -> Optional[CalendarEvent]:
-        """Get a specific event"""
-        return self.events.get(event_id)
+        """Get a specific event or generated occurrence"""
+        event = self.events.get(event_id)
+        if event is None:
+            occurrence = self._occurrence_master(event_id)
+            if occurrence is not None:
+                event = self._occurrence(*occurrence)
+        return event
+    
+    def search_events(self, query: str = "", tags: List[str] = ()) -> List[CalendarEvent]:
+        """Events whose text matches every query word (prefix) and every tag, by start time"""
+        hits = self.search_index.search(query, tags)
+        return sorted((self.events[event_id] for event_id in hits if event_id in self.events),
+                      key=lambda e: e.start_time)
+    
+    def get_events_starting_between(self, start: datetime, end: datetime) -> List[CalendarEvent]:
+        """Events and occurrences with start <= start_time <= end, by start time"""
+        return self._events_between(start, end)
     
     def get_events_for_date(self, target_date: date) -> List[CalendarEvent]:
         """Get all events for a specific date"""
-        events = []
-        for event in self.events.values():
-            if event.start_time.date() == target_date:
-                events.append(event)
-        
-        # Sort by start time
-        events.sort(key=lambda e: e.start_time)
+        events = [self.events[event_id] for event_id in self.index.on_date(target_date)]
+        if self.recurring:
+            day_start = datetime.combine(target_date, time())
+            events += self._occurrences_between(day_start, day_start + timedelta(days=1), False)
+            events.sort(key=lambda e: (e.start_time, e.id))
         return events
     
+    def get_events_between(self, start_date: date, end_date: date) -> Dict[date, List[CalendarEvent]]:
+        """Events per day from start_date to end_date inclusive (one range scan of the index)"""
+        days = {day: [] for day in EventIndex.day_range(start_date, end_date)}
+        for day, event_ids in self.index.dates_between(start_date, end_date):
+            days[day] = [self.events[event_id] for event_id in event_ids]
+        if self.recurring:
+            range_start = datetime.combine(start_date, time())
+            range_end = datetime.combine(end_date + timedelta(days=1), time())
+            touched = set()
+            for occurrence in self._occurrences_between(range_start, range_end, False):
+                day = occurrence.start_time.date()
+                days[day].append(occurrence)
+                touched.add(day)
+            for day in touched:
+                days[day].sort(key=lambda e: (e.start_time, e.id))
+        return days
+    
     def get_events_for_week(self, start_date: date) -> Dict[date, List[CalendarEvent]]:
         """Get events for a week starting from start_date"""
-        week_events = {}
-        
-        for i in range(7):
-            current_date = start_date + timedelta(days=i)
-            week_events[current_date] = self.get_events_for_date(current_date)
-        
-        return week_events
+        return self.get_events_between(start_date, start_date + timedelta(days=6))
     
     def get_events_for_month(self, year: int, month: int) -> Dict[date, List[CalendarEvent]]:
         """Get events for a specific month"""
-        month_events = {}
-        
-        # Get all days in the month
         _, last_day = calendar.monthrange(year, month)
-        
-        for day in range(1, last_day + 1):
-            current_date = date(year, month, day)
-            month_events[current_date] = self.get_events_for_date(current_date)
-        
-        return month_events
+        return self.get_events_between(date(year, month, 1), date(year, month, last_day))
     
     def get_upcoming_events(self, days: int = 7) -> List[CalendarEvent]:
         """Get upcoming events in the next N days"""
         now = datetime.now()
-        future = now + timedelta(days=days)
-        
-        upcoming = []
-        for event in self.events.values():
-            if now <= event.start_time <= future:
-                upcoming.append(event)
-        
-        # Sort by start time
-        upcoming.sort(key=lambda e: e.start_time)
-        return upcoming
+        return self._events_between(now, now + timedelta(days=days))
     
     def get_overdue_events(self) -> List[CalendarEvent]:
         """Get overdue events that haven't been completed"""
         now = datetime.now()
         overdue = []
         
-        for event in self.events.values():
+        # Anything that ended before now also started before now
+        for event in self._events_between(None, now, inclusive_end=False):
             if (event.end_time < now and 
                 not event.is_completed and 
                 event.event_type in [EventType.ASSIGNMENT_DUE, EventType.DEADLINE]):
@@ -645,30 +957,58 @@ class CalendarManager:
         
         return overdue
     
+    def _lookback(self) -> timedelta:
+        """How long before a range an event can start and still overlap it"""
+        longest = self.index.longest
+        for master in self.recurring.values():
+            longest = max(longest, master.end_time - master.start_time)
+        return longest
+    
+    def iter_busy(self, start: datetime, end: datetime,
+                  chunk: timedelta = timedelta(days=7)) -> Iterator[Tuple[datetime, datetime]]:
+        """Busy (start, end) of every event overlapping [start, end), clipped to it, by start
+        
+        The index is read a chunk at a time so a lazy consumer only pays for what it uses.
+        """
+        chunk_start = start - self._lookback()
+        while chunk_start < end:
+            chunk_end = min(end, max(chunk_start, start) + chunk)
+            for event in self._events_between(chunk_start, chunk_end, inclusive_end=False):
+                if event.end_time > start:
+                    yield max(event.start_time, start), min(event.end_time, end)
+            chunk_start = chunk_end
+    
+    def get_free_intervals(self, start: datetime, end: datetime,
+                           working_hours: Optional[WorkingHours] = None) -> Iterator[Tuple[datetime, datetime]]:
+        """Free intervals in [start, end), inside working_hours if given (lazy)"""
+        windows = working_hours.windows(start, end) if working_hours else [(start, end)]
+        return free_intervals(merge_busy(self.iter_busy(start, end)), windows)
+    
+    def find_free_slots(self, duration_minutes: int, start: datetime, end: datetime,
+                        count: Optional[int] = None, working_hours: Optional[WorkingHours] = None,
+                        step_minutes: Optional[int] = None) -> List[Tuple[datetime, datetime]]:
+        """First `count` free slots of duration_minutes (all if None) between start and end
+        
+        One slot per free interval, at its start, unless step_minutes asks for a slot every
+        step within it.
+        """
+        step = timedelta(minutes=step_minutes) if step_minutes else None
+        found = slots(self.get_free_intervals(start, end, working_hours),
+                      timedelta(minutes=duration_minutes), step)
+        return list(islice(found, count))
+    
     def find_free_time(self, duration_minutes: int, start_date: date,
                       end_date: date, earliest_hour: int = 8,
-                      latest_hour: int = 20) -> List[Tuple[datetime, datetime]]:
-        """Find free time slots of specified duration"""
-        free_slots = []
-        current_date = start_date
-        
-        while current_date <= end_date:
-            # Get events for this date
-            day_events = self.get_events_for_date(current_date)
-            
-            # Find free slots using optimizer
-            study_blocks = self.optimizer.get_optimal_study_blocks(
-                current_date, day_events, duration_minutes
-            )
-            
-            for block in study_blocks:
-                if block.duration_minutes >= duration_minutes:
-                    slot_end = block.start_time + timedelta(minutes=duration_minutes)
-                    free_slots.append((block.start_time, slot_end))
-            
-            current_date += timedelta(days=1)
-        
-        return free_slots
+                      latest_hour: int = 20, limit: Optional[int] = None) -> List[Tuple[datetime, datetime]]:
+        """Free back-to-back slots of the given duration between earliest_hour and latest_hour"""
+        return self.find_free_slots(
+            duration_minutes,
+            datetime.combine(start_date, time()),
+            datetime.combine(end_date + timedelta(days=1), time()),
+            count=limit,
+            working_hours=WorkingHours.daily(earliest_hour, latest_hour),
+            step_minutes=duration_minutes
+        )
     
     def suggest_study_schedule(self, target_date: date, 
                              study_hours: int = 4) -> List[CalendarEvent]:
@@ -711,306 +1051,142 @@ class CalendarManager:
         return selected_blocks
     
     def get_calendar_statistics(self) -> dict:
-        """Get calendar usage statistics"""
-        all_events = list(self.events.values())
-        now = datetime.now()
-        
-        # Basic counts
-        total_events = len(all_events)
-        completed_events = len([e for e in all_events if e.is_completed])
-        upcoming_events = len([e for e in all_events if e.start_time > now])
-        
-        # Event type distribution
-        type_counts = {}
-        for event in all_events:
-            event_type = event.event_type.value
-            type_counts[event_type] = type_counts.get(event_type, 0) + 1
-        
-        # Study time statistics
-        study_events = [e for e in all_events if e.event_type == EventType.STUDY_SESSION]
-        total_study_time = sum(
-            (e.end_time - e.start_time).total_seconds() / 3600 
-            for e in study_events
-        )
-        
-        # This week's study time
-        week_start = now - timedelta(days=now.weekday())
-        week_end = week_start + timedelta(days=7)
-        this_week_study = sum(
-            (e.end_time - e.start_time).total_seconds() / 3600
-            for e in study_events
-            if week_start <= e.start_time <= week_end
-        )
+        """Get calendar usage statistics, read from the incremental rollups
         
+        Recurring series count each occurrence up to the end of the current ISO week, and
+        upcoming_events uses the same horizon: every stored event still ahead, plus series
+        occurrences from now until the end of this week.
+        """
+        now = datetime.now()
+        self._advance_stats_horizon(now)
+        stats = self.stats
+        total_events = stats.totals.count
+        completed_events = stats.totals.completed
+        this_week = week_key(now)
+        
+        # Later weeks are a running total; the rest of this week is one index range plus
+        # the cached occurrences of each series
+        with self.lock:
+            upcoming_events = stats.after_horizon + sum(
+                1 for event_id in self.index.between(now, stats.horizon, False)
+                if self.events[event_id].start_time > now)
+            for master in self.recurring.values():
+                upcoming_events += sum(
+                    1 for start in self.recurrence_cache.starts_between(master, now, stats.horizon, False)
+                    if start > now)
+        
+        study = stats.by_type.get(EventType.STUDY_SESSION)
         return {
             'total_events': total_events,
             'completed_events': completed_events,
             'upcoming_events': upcoming_events,
             'completion_rate': (completed_events / total_events * 100) if total_events > 0 else 0,
-            'event_type_distribution': type_counts,
-            'total_study_hours': round(total_study_time, 2),
-            'this_week_study_hours': round(this_week_study, 2),
-            'average_event_duration': round(
-                sum((e.end_time - e.start_time).total_seconds() / 60 for e in all_events) / len(all_events)
-            ) if all_events else 0
+            'event_type_distribution': {event_type.value: rollup.count
+                                        for event_type, rollup in stats.by_type.items()},
+            'total_study_hours': round(study.hours, 2) if study else 0.0,
+            'this_week_study_hours': round(stats.week(this_week, EventType.STUDY_SESSION).hours, 2),
+            'average_event_duration': round(stats.totals.seconds / 60 / total_events) if total_events else 0
+        }
+    
+    def get_weekly_trend(self, start_date: date, end_date: date,
+                         event_type: Optional[EventType] = None) -> List[dict]:
+        """Per ISO week in the range: event count, hours and completions (optionally one type)"""
+        self._advance_stats_horizon(datetime.now())
+        return self.stats.trend(start_date, end_date, event_type)
+    
+    def get_diagnostics(self) -> dict:
+        """Cache and notification counters for troubleshooting"""
+        return {
+            'study_block_cache': self.optimizer.block_cache.stats(),
+            'notifications': dict(self.notification_system.dispatcher.stats),
         }
     
-    def export_calendar(self, filename: str, start_date: date, end_date: date):
-        """Export calendar events to ICS format"""
+    def export_calendar(self, filename: str, start_date: Optional[date] = None,
+                        end_date: Optional[date] = None, progress=None) -> bool:
+        """Stream events to an ICS file (RFC 5545), optionally only those in a date range
+        
+        Recurring series are written once with their RRULE, so a series is included if any
+        of its occurrences may fall in the range.
+        """
+        import event_io
+        
+        def in_range(event: CalendarEvent) -> bool:
+            if event.recurrence != RecurrenceType.NONE:
+                last = event.recurrence_end.date() if event.recurrence_end else date.max
+                return ((end_date is None or event.start_time.date() <= end_date)
+                        and (start_date is None or last >= start_date))
+            day = event.start_time.date()
+            return (start_date is None or day >= start_date) and (end_date is None or day <= end_date)
+        
+        overridden: Dict[str, Set[datetime]] = {}
+        for event in self.events.values():
+            if event.recurrence_master and event.original_start:
+                overridden.setdefault(event.recurrence_master, set()).add(event.original_start)
         try:
-            with open(filename, 'w') as f:
-                f.write("BEGIN:VCALENDAR\n")
-                f.write("VERSION:2.0\n")
-                f.write("PRODID:-//Flow Study App//Calendar//EN\n")
-                
-                for event in self.events.values():
-                    if start_date <= event.start_time.date() <= end_date:
-                        f.write("BEGIN:VEVENT\n")
-                        f.write(f"UID:{event.id}\n")
-                        f.write(f"DTSTART:{event.start_time.strftime('%Y%m%dT%H%M%S')}\n")
-                        f.write(f"DTEND:{event.end_time.strftime('%Y%m%dT%H%M%S')}\n")
-                        f.write(f"SUMMARY:{event.title}\n")
-                        f.write(f"DESCRIPTION:{event.description}\n")
-                        if event.location:
-                            f.write(f"LOCATION:{event.location}\n")
-                        f.write("END:VEVENT\n")
-                
-                f.write("END:VCALENDAR\n")
-            
+            with open(filename, 'w', newline='', encoding='utf-8') as f:
+                count = event_io.write_events(f, (e for e in self.events.values() if in_range(e)),
+                                              overridden, progress)
+            if progress:
+                progress(count)
             return True
         except Exception as e:
             print(f"Error exporting calendar: {e}")
             return False
-
-class CalendarGUI:
-    """Enhanced Calendar GUI with color-coded events"""
-    
-    def __init__(self, master, calendar_manager):
-        self.master = master
-        self.calendar_manager = calendar_manager
-        self.current_date = date.today()
-        
-        self.setup_gui()
-        self.refresh_calendar()
-    
-    def setup_gui(self):
-        # Main frame
-        main_frame = ttk.Frame(self.master)
-        main_frame.pack(fill='both', expand=True, padx=10, pady=10)
-        
-        # Navigation frame
-        nav_frame = ttk.Frame(main_frame)
-        nav_frame.pack(fill='x', pady=(0, 10))
-        
-        ttk.Button(nav_frame, text="<", command=self.prev_month).pack(side='left')
-        self.month_label = ttk.Label(nav_frame, text="", font=('Arial', 16, 'bold'))
-        self.month_label.pack(side='left', padx=20)
-        ttk.Button(nav_frame, text=">", command=self.next_month).pack(side='left')
-        
-        # Add event frame
-        add_frame = ttk.LabelFrame(main_frame, text="Quick Add Event", padding=10)
-        add_frame.pack(fill='x', pady=(0, 10))
-        
-        # Event input fields
-        input_frame = ttk.Frame(add_frame)
-        input_frame.pack(fill='x')
-        
-        ttk.Label(input_frame, text="Title:").grid(row=0, column=0, sticky='w', padx=5)
-        self.title_var = tk.StringVar()
-        ttk.Entry(input_frame, textvariable=self.title_var, width=20).grid(row=0, column=1, padx=5)
-        
-        ttk.Label(input_frame, text="Date (MM/DD/YYYY):").grid(row=0, column=2, sticky='w', padx=5)
-        self.date_var = tk.StringVar(value=self.current_date.strftime("%m/%d/%Y"))
-        ttk.Entry(input_frame, textvariable=self.date_var, width=12).grid(row=0, column=3, padx=5)
-        
-        ttk.Label(input_frame, text="Time:").grid(row=1, column=0, sticky='w', padx=5)
-        self.time_var = tk.StringVar(value="09:00")
-        ttk.Entry(input_frame, textvariable=self.time_var, width=8).grid(row=1, column=1, padx=5)
-        
-        ttk.Label(input_frame, text="AM/PM:").grid(row=1, column=2, sticky='w', padx=5)
-        self.ampm_var = tk.StringVar(value="AM")
-        ttk.Combobox(input_frame, textvariable=self.ampm_var, values=["AM", "PM"], width=5).grid(row=1, column=3, padx=5)
-        
-        ttk.Label(input_frame, text="Type:").grid(row=0, column=4, sticky='w', padx=5)
-        self.type_var = tk.StringVar(value="STUDY_SESSION")
-        type_combo = ttk.Combobox(input_frame, textvariable=self.type_var, width=15)
-        type_combo['values'] = [t.value for t in EventType]
-        type_combo.grid(row=0, column=5, padx=5)
-        
-        ttk.Button(input_frame, text="Add Event", command=self.add_event).grid(row=1, column=5, padx=5, pady=5)
-        
-        # Calendar frame
-        cal_frame = ttk.Frame(main_frame)
-        cal_frame.pack(fill='both', expand=True)
-        
-        # Calendar grid
-        self.calendar_frame = ttk.Frame(cal_frame)
-        self.calendar_frame.pack(fill='both', expand=True)
-        
-        # Legend
-        legend_frame = ttk.LabelFrame(main_frame, text="Event Type Colors", padding=10)
-        legend_frame.pack(fill='x', pady=(10, 0))
-        
-        legend_inner = ttk.Frame(legend_frame)
-        legend_inner.pack(fill='x')
-        
-        colors = {
-            "Meeting": "#EF4444",
-            "Study": "#10B981", 
-            "Exam": "#F59E0B",
-            "Personal": "#3B82F6",
-            "Deadline": "#EF4444",
-            "Assignment": "#F59E0B",
-            "Class": "#8B5CF6",
-            "Break": "#6B7280"
-        }
-        
-        col = 0
-        for event_type, color in colors.items():
-            color_label = tk.Label(legend_inner, text="●", fg=color, font=('Arial', 16))
-            color_label.grid(row=0, column=col*2, sticky='w')
-            type_label = ttk.Label(legend_inner, text=event_type)
-            type_label.grid(row=0, column=col*2+1, sticky='w', padx=(2, 15))
-            col += 1
-            if col >= 4:
-                col = 0
-        
-    def prev_month(self):
-        if self.current_date.month == 1:
-            self.current_date = self.current_date.replace(year=self.current_date.year-1, month=12)
-        else:
-            self.current_date = self.current_date.replace(month=self.current_date.month-1)
-        self.refresh_calendar()
     
-    def next_month(self):
-        if self.current_date.month == 12:
-            self.current_date = self.current_date.replace(year=self.current_date.year+1, month=1)
-        else:
-            self.current_date = self.current_date.replace(month=self.current_date.month+1)
-        self.refresh_calendar()
-    
-    def refresh_calendar(self):
-        # Clear existing widgets
-        for widget in self.calendar_frame.winfo_children():
-            widget.destroy()
-        
-        # Update month label
-        self.month_label.config(text=self.current_date.strftime("%B %Y"))
-        
-        # Create calendar grid
-        cal = calendar.monthcalendar(self.current_date.year, self.current_date.month)
-        
-        # Days header
-        days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
-        for col, day in enumerate(days):
-            header = ttk.Label(self.calendar_frame, text=day, font=('Arial', 12, 'bold'))
-            header.grid(row=0, column=col, padx=2, pady=2, sticky='nsew')
-        
-        # Calendar days
-        for row_num, week in enumerate(cal, 1):
-            for col_num, day in enumerate(week):
-                if day == 0:
-                    continue
-                
-                # Create day frame
-                day_frame = tk.Frame(self.calendar_frame, relief='solid', borderwidth=1, 
-                                   bg='white', width=120, height=100)
-                day_frame.grid(row=row_num, column=col_num, padx=1, pady=1, sticky='nsew')
-                day_frame.grid_propagate(False)
-                
-                # Day number
-                day_label = tk.Label(day_frame, text=str(day), font=('Arial', 10, 'bold'), 
-                                   bg='white', anchor='nw')
-                day_label.place(x=2, y=2)
-                
-                # Get events for this day
-                current_day = date(self.current_date.year, self.current_date.month, day)
-                day_events = self.calendar_manager.get_events_for_date(current_day)
-                
-                # Display events (max 4 visible)
-                y_offset = 20
-                for i, event in enumerate(day_events[:4]):
-                    if i >= 3 and len(day_events) > 4:
-                        more_label = tk.Label(day_frame, text=f"+{len(day_events)-3} more", 
-                                            font=('Arial', 8), bg='white', fg='gray')
-                        more_label.place(x=2, y=y_offset)
-                        break
-                    
-                    # Event color dot and text
-                    color = self.calendar_manager.event_colors.get(event.event_type, "#3B82F6")
-                    
-                    event_frame = tk.Frame(day_frame, bg='white')
-                    event_frame.place(x=2, y=y_offset, width=115, height=15)
-                    
-                    dot = tk.Label(event_frame, text="●", fg=color, bg='white', font=('Arial', 8))
-                    dot.pack(side='left')
-                    
-                    time_str = event.start_time.strftime("%H:%M")
-                    event_text = f"{time_str} {event.title}"
-                    if len(event_text) > 15:
-                        event_text = event_text[:12] + "..."
-                    
-                    event_label = tk.Label(event_frame, text=event_text, 
-                                         font=('Arial', 8), bg='white', anchor='w')
-                    event_label.pack(side='left', fill='x', expand=True)
-                    
-                    y_offset += 15
-        
-        # Configure grid weights
-        for i in range(7):
-            self.calendar_frame.grid_columnconfigure(i, weight=1)
-        for i in range(len(cal) + 1):
-            self.calendar_frame.grid_rowconfigure(i, weight=1)
-    
-    def add_event(self):
-        """Add a new event using the calendar GUI"""
-        title = self.title_var.get().strip()
-        if not title:
-            messagebox.showwarning("Invalid Input", "Please enter an event title")
-            return
-        
-        try:
-            # Parse inputs
-            date_str = self.date_var.get().strip()
-            time_str = self.time_var.get().strip()
-            am_pm = self.ampm_var.get().strip()
-            event_type = EventType(self.type_var.get())
-            
-            # Create event using calendar manager
-            event = self.calendar_manager.create_event_with_time_input(
-                title=title,
-                date_str=date_str,
-                time_str=time_str,
-                duration_minutes=60,
-                event_type=event_type,
-                am_pm=am_pm
-            )
-            
-            if event:
-                # Clear inputs
-                self.title_var.set("")
-                self.time_var.set("09:00")
-                self.ampm_var.set("AM")
-                
-                # Refresh calendar
-                self.refresh_calendar()
-                messagebox.showinfo("Success", "Event added successfully!")
-            else:
-                messagebox.showerror("Error", "Failed to create event")
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to add event: {str(e)}")
+    def import_calendar(self, filename: str, replace_existing: bool = True, progress=None) -> int:
+        """Stream VEVENTs in from an ICS file, upserting by UID, with one save at the end
+        
+        Events whose id already exists are replaced, or skipped if replace_existing is False;
+        cancelled ones are deleted (a series with its edited occurrences). Overrides
+        (RECURRENCE-ID) become edited occurrences of their series; malformed VEVENTs are
+        skipped. Returns the number of events imported.
+        """
+        import event_io
+        count = removed = 0
+        stats = {}
+        overrides = []  # (master id, original start), applied once every master is in
+        with self.batch():
+            try:
+                for event, cancelled in event_io.iter_events(filename, stats, self.event_colors):
+                    if event.recurrence_master:
+                        overrides.append((event.recurrence_master, event.original_start))
+                    existing = self.events.get(event.id)
+                    if existing is not None and not replace_existing:
+                        continue
+                    if cancelled:
+                        if existing is not None and self.delete_event(event.id):
+                            removed += 1
+                        continue
+                    with self.lock:
+                        if existing is not None:
+                            self._unindex(existing)
+                            del self.events[event.id]
+                        self.events[event.id] = event
+                        self._reindex(event)
+                    count += 1
+                    if progress and count % 1000 == 0:
+                        progress(count)
+                for master_id, start in overrides:
+                    master = self.recurring.get(master_id)
+                    if master is not None and start not in master.recurrence_exceptions:
+                        self._add_exception(master, start)
+            except Exception as e:
+                print(f"Error importing calendar: {e}")
+            if count or removed or overrides:
+                self.save_events()
+        if stats.get('approximated_rules'):
+            print(f"{stats['approximated_rules']} recurrence rule(s) could only be approximated")
+        if stats.get('skipped'):
+            print(f"Skipped {stats['skipped']} event(s) without a start time")
+        if stats.get('invalid'):
+            print(f"Skipped {stats['invalid']} malformed event(s)")
+        if progress:
+            progress(count)
+        return count
 
-# Example usage and testing
-if __name__ == "__main__":
-    root = tk.Tk()
-    root.title("Flow State Calendar")
-    root.geometry("900x700")
-    
-    # Initialize calendar manager
-    cm = CalendarManager()
-    
-    # Create calendar GUI
-    cal_gui = CalendarGUI(root, cm)
-    
-    root.mainloop()
+def __getattr__(name):
+    # CalendarGUI used to live here; import it lazily so Tk stays optional
+    if name == 'CalendarGUI':
+        from calendar_gui import CalendarGUI
+        return CalendarGUI
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -8,12 +8,18 @@ import numpy as np
 from datetime import datetime
 import os
 from typing import List, Tuple, Optional
-import json
 
-class FocusAnalyzer:
+from study_core import FocusTracker
+import json_codec
+
+class FocusAnalyzer(FocusTracker):
     """Analyzes camera frames to detect focus and attention levels"""
     
     def __init__(self):
+        # Focus tracking variables (history window, thresholds, callbacks);
+        # unfocused threshold increased for less sensitivity
+        super().__init__(attention_threshold=0.7, unfocused_threshold=60, history_size=30)
+        
         # Load face detection classifier
         try:
             cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
@@ -42,15 +48,6 @@ class FocusAnalyzer:
             self.face_cascade = None
             self.eye_cascade = None
         
-        # Focus tracking variables
-        self.focus_history = []
-        self.attention_threshold = 0.7
-        
-        # Focus monitoring for timer control
-        self.unfocused_frames = 0
-        self.unfocused_threshold = 60  # frames before considering user unfocused (increased for less sensitivity)
-        self.focus_callbacks = []  # callbacks for focus state changes
-        
         # Debugging flags
         self.debug_enabled = True
         
@@ -115,45 +112,13 @@ class FocusAnalyzer:
         
         return min(focus_score, 1.0)
     
-    def add_focus_callback(self, callback):
-        """Add callback for focus state changes"""
-        self.focus_callbacks.append(callback)
-    
-    def check_focus_status(self, is_focused: bool):
-        """Check focus status and trigger callbacks if needed"""
-        if not is_focused:
-            self.unfocused_frames += 1
-            # Print debug info to help troubleshoot
-            if self.unfocused_frames % 10 == 0:  # Print every 10 unfocused frames
-                print(f"User unfocused for {self.unfocused_frames} frames (threshold: {self.unfocused_threshold})")
-                
-            if self.unfocused_frames >= self.unfocused_threshold:
-                # User has been unfocused for too long
-                print("Focus lost threshold reached - triggering callbacks")
-                for callback in self.focus_callbacks:
-                    try:
-                        callback('focus_lost')
-                    except Exception as e:
-                        print(f"Error in focus callback: {e}")
-                self.unfocused_frames = 0  # Reset counter
-        else:
-            if self.unfocused_frames > 0:
-                print(f"User refocused after {self.unfocused_frames} unfocused frames")
-            self.unfocused_frames = 0  # Reset if user is focused
-    
     def analyze_frame(self, frame: np.ndarray) -> dict:
         """Analyze a frame for focus indicators"""
         faces, eyes = self.detect_face_and_eyes(frame)
         focus_score = self.calculate_focus_score(faces, eyes, frame.shape)
         
-        # Update focus history
-        self.focus_history.append(focus_score)
-        if len(self.focus_history) > 30:  # Keep last 30 frames for faster response
-            self.focus_history.pop(0)
-        
-        # Calculate average focus over recent frames
-        avg_focus = np.mean(self.focus_history) if self.focus_history else 0
-        is_focused = avg_focus > self.attention_threshold
+        # Update focus history and average focus over recent frames
+        avg_focus, is_focused = self.update(focus_score)
         
         # Debug output
         if self.debug_enabled and len(self.focus_history) % 30 == 0:  # Every 30 frames
@@ -273,8 +238,7 @@ class SessionRecorder:
         if self.session_data and self.video_filepath:
             data_filename = self.video_filepath.replace('.avi', '_analysis.json')
             try:
-                with open(data_filename, 'w') as f:
-                    json.dump(self.session_data, f, indent=2)
+                json_codec.dump_file(data_filename, self.session_data)
             except Exception as e:
                 print(f"Error saving session data: {e}")
         
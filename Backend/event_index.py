@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Date index for calendar events
+Events bucketed by start date, each bucket kept in start-time order, with a sorted list of
+the dates that have events so day, week, month and upcoming queries are range scans
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+class EventIndex:
+    """Maintained date buckets; call add() after and remove() before any change to start_time"""
+
+    def __init__(self):
+        self.days: Dict[date, List[Tuple[datetime, str]]] = {}  # date -> sorted (start, id)
+        self.dates: List[date] = []  # sorted keys of days
+        self.longest = timedelta(0)  # longest duration added: how far back an overlap can start
+
+    def add(self, event):
+        day = event.start_time.date()
+        bucket = self.days.get(day)
+        if bucket is None:
+            bucket = self.days[day] = []
+            insort(self.dates, day)
+        insort(bucket, (event.start_time, event.id))
+        if event.end_time - event.start_time > self.longest:
+            self.longest = event.end_time - event.start_time
+
+    def remove(self, event):
+        """Drop an event using its current (pre-change) start time"""
+        day = event.start_time.date()
+        bucket = self.days.get(day)
+        if bucket is None:
+            return
+        key = (event.start_time, event.id)
+        i = bisect_left(bucket, key)
+        if i < len(bucket) and bucket[i] == key:
+            del bucket[i]
+        if not bucket:
+            del self.days[day]
+            j = bisect_left(self.dates, day)
+            if j < len(self.dates) and self.dates[j] == day:
+                del self.dates[j]
+
+    def clear(self):
+        self.days.clear()
+        self.dates.clear()
+        self.longest = timedelta(0)
+
+    def on_date(self, day: date) -> List[str]:
+        """Ids of events starting on `day`, in start order"""
+        return [event_id for _, event_id in self.days.get(day, ())]
+
+    def dates_between(self, start_date: date, end_date: date) -> Iterator[Tuple[date, List[str]]]:
+        """(date, ids) for each date with events in [start_date, end_date]"""
+        lo = bisect_left(self.dates, start_date)
+        hi = bisect_right(self.dates, end_date)
+        for day in self.dates[lo:hi]:
+            yield day, [event_id for _, event_id in self.days[day]]
+
+    def between(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                inclusive_end: bool = True) -> Iterator[str]:
+        """Ids of events with start <= start_time <= end (or < end), in start order"""
+        lo = bisect_left(self.dates, start.date()) if start else 0
+        hi = bisect_right(self.dates, end.date()) if end else len(self.dates)
+        for day in self.dates[lo:hi]:
+            bucket = self.days[day]
+            first = bisect_left(bucket, (start,)) if start and day == start.date() else 0
+            if end and day == end.date():
+                # '\uffff' sorts after any event id, so events starting exactly at `end` are kept
+                last = (bisect_right(bucket, (end, '\uffff')) if inclusive_end
+                        else bisect_left(bucket, (end,)))
+            else:
+                last = len(bucket)
+            for _, event_id in bucket[first:last]:
+                yield event_id
+
+    @staticmethod
+    def day_range(start_date: date, end_date: date) -> Iterator[date]:
+        day = start_date
+        while day <= end_date:
+            yield day
+            day += timedelta(days=1)
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Streaming iCalendar import and export for calendar events
+VEVENTs are written and parsed one at a time. Recurring masters map to RRULE/EXDATE, edited
+occurrences to RECURRENCE-ID overrides of their master's UID, reminders to VALARMs.
+"""
+
+import uuid
+from datetime import datetime, time, timedelta, timezone
+from typing import Callable, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+import ics
+from calendar_manager import CalendarEvent, EventType, RecurrenceType, event_from_dict
+
+ProgressCallback = Callable[[int], None]
+
+# Our 1-4 priorities onto iCalendar's 1 (highest) - 9 (lowest), as for tasks
+_ICS_PRIORITY = {4: 1, 3: 3, 2: 5, 1: 9}
+_FREQUENCIES = {RecurrenceType.DAILY: 'DAILY', RecurrenceType.WEEKLY: 'WEEKLY',
+                RecurrenceType.MONTHLY: 'MONTHLY'}
+_FREQUENCY_VALUES = {name: recurrence.value for recurrence, name in _FREQUENCIES.items()}
+_EVENT_TYPE_VALUES = {event_type.value for event_type in EventType}
+_WEEKDAYS = ['MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU']
+_OVERRIDE_NAMESPACE = uuid.UUID('6f1c2a53-3b0e-4f7e-9c55-2f8e1f0d6a41')
+
+def _report(progress: Optional[ProgressCallback], count: int, every: int):
+    if progress and count % every == 0:
+        progress(count)
+
+# Export
+
+def format_rrule(event: CalendarEvent) -> str:
+    parts = [f"FREQ={_FREQUENCIES[event.recurrence]}"]
+    if event.recurrence_interval and event.recurrence_interval > 1:
+        parts.append(f"INTERVAL={event.recurrence_interval}")
+    if event.recurrence_count:
+        parts.append(f"COUNT={event.recurrence_count}")
+    elif event.recurrence_end:
+        parts.append(f"UNTIL={ics.format_datetime(event.recurrence_end)}")
+    return ';'.join(parts)
+
+def _vevent_properties(event: CalendarEvent, stamp: str, overridden: Set[datetime]):
+    yield 'UID', event.recurrence_master or event.id
+    yield 'DTSTAMP', stamp
+    yield 'CREATED', ics.format_datetime(event.created_at)
+    if event.recurrence_master:
+        yield 'RECURRENCE-ID', ics.format_datetime(event.original_start or event.start_time)
+        yield 'X-FLOW-ID', event.id
+    yield 'DTSTART', ics.format_datetime(event.start_time)
+    yield 'DTEND', ics.format_datetime(event.end_time)
+    yield 'SUMMARY', ics.escape(event.title)
+    if event.description:
+        yield 'DESCRIPTION', ics.escape(event.description)
+    if event.location:
+        yield 'LOCATION', ics.escape(event.location)
+    if event.tags:
+        yield 'CATEGORIES', ','.join(ics.escape(tag) for tag in event.tags)
+    yield 'PRIORITY', str(_ICS_PRIORITY.get(event.priority.value, 5))
+    if event.recurrence in _FREQUENCIES:
+        yield 'RRULE', format_rrule(event)
+        # Edited occurrences are overrides, not exclusions
+        excluded = [start for start in event.recurrence_exceptions if start not in overridden]
+        if excluded:
+            yield 'EXDATE', ','.join(ics.format_datetime(start) for start in sorted(excluded))
+    # Fields without an iCalendar equivalent
+    yield 'X-FLOW-TYPE', event.event_type.value
+    yield 'X-FLOW-COLOR', event.color
+    if event.task_id:
+        yield 'X-FLOW-TASK', event.task_id
+    if event.is_completed:
+        yield 'X-FLOW-COMPLETED', 'TRUE'
+    if event.notes:
+        yield 'X-FLOW-NOTES', ics.escape(event.notes)
+
+def _valarms(event: CalendarEvent):
+    for minutes in sorted(set(event.reminder_minutes or ())):
+        yield 'VALARM', [('ACTION', 'DISPLAY'), ('DESCRIPTION', ics.escape(event.title)),
+                         ('TRIGGER', ics.format_duration(-timedelta(minutes=minutes)))]
+
+def write_events(f, events: Iterable[CalendarEvent], overridden: Dict[str, Set[datetime]],
+                 progress: Optional[ProgressCallback] = None, progress_every: int = 1000) -> int:
+    """Write a VCALENDAR of events; overridden maps master id -> starts that have overrides"""
+    stamp = datetime.now(timezone.utc).strftime(ics.DATETIME_FORMAT) + 'Z'
+    ics.write_header(f)
+    count = 0
+    for event in events:
+        ics.write_component(f, 'VEVENT', _vevent_properties(event, stamp, overridden.get(event.id, ())),
+                            _valarms(event))
+        count += 1
+        _report(progress, count, progress_every)
+    ics.write_footer(f)
+    return count
+
+# Import
+
+def parse_rrule(value: str, start: datetime, stats: Optional[dict] = None) -> dict:
+    """RRULE value -> recurrence fields of an event starting at `start`
+
+    YEARLY becomes every 12 months. BY* parts other than ones restating the start (e.g.
+    BYDAY=MO on a Monday) can't be expressed and are dropped, counted in stats.
+    """
+    parts = dict(part.split('=', 1) for part in value.upper().split(';') if '=' in part)
+    frequency = parts.get('FREQ')
+    interval = int(parts.get('INTERVAL') or 1)
+    if frequency == 'YEARLY':
+        frequency, interval = 'MONTHLY', interval * 12
+    fields = {'recurrence': _FREQUENCY_VALUES.get(frequency, 'none'), 'recurrence_interval': interval}
+    if 'COUNT' in parts:
+        fields['recurrence_count'] = int(parts['COUNT'])
+    elif 'UNTIL' in parts:
+        until = ics.parse_datetime(parts['UNTIL'])
+        if 'T' not in parts['UNTIL']:
+            until = datetime.combine(until.date(), time.max)  # a DATE includes the whole day
+        fields['recurrence_end'] = until.isoformat()
+
+    restated = {'BYDAY': _WEEKDAYS[start.weekday()], 'BYMONTHDAY': str(start.day),
+                'BYMONTH': str(start.month) if interval % 12 == 0 else None,
+                'BYHOUR': str(start.hour), 'BYMINUTE': str(start.minute), 'BYSECOND': str(start.second)}
+    dropped = [key for key in parts if key.startswith('BY') and parts[key] != restated.get(key)]
+    if stats is not None and (dropped or fields['recurrence'] == 'none'):
+        stats['approximated_rules'] = stats.get('approximated_rules', 0) + 1
+    return fields
+
+def _alarm_minutes(properties) -> Optional[int]:
+    """Minutes before the start for a relative VALARM trigger, else None"""
+    for name, params, value in properties:
+        if name != 'TRIGGER' or params.get('VALUE', '').upper() == 'DATE-TIME':
+            continue
+        if params.get('RELATED', 'START').upper() != 'START':
+            return None
+        try:
+            minutes = -int(ics.parse_duration(value).total_seconds() // 60)
+        except ValueError:
+            return None
+        return minutes if minutes >= 0 else None
+    return None
+
+def _vevent_to_dict(properties, stats: Optional[dict] = None) -> Optional[dict]:
+    """Event dict (event_to_dict form) for one VEVENT; None for one without a start"""
+    data = {
+        'description': '', 'event_type': EventType.PERSONAL.value, 'priority': 2,
+        'tags': [], 'reminder_minutes': [], 'recurrence_exceptions': [],
+    }
+    start = end = duration = rrule = recurrence_id = None
+    all_day = False
+    for name, params, value in properties:
+        if name == 'UID':
+            data['uid'] = value
+        elif name == 'X-FLOW-ID':
+            data['id'] = value
+        elif name == 'DTSTART':
+            start = ics.parse_datetime(value, params.get('TZID'))
+            all_day = params.get('VALUE', '').upper() == 'DATE' or 'T' not in value
+        elif name == 'DTEND':
+            end = ics.parse_datetime(value, params.get('TZID'))
+        elif name == 'DURATION':
+            duration = ics.parse_duration(value)
+        elif name == 'RECURRENCE-ID':
+            recurrence_id = ics.parse_datetime(value, params.get('TZID'))
+        elif name == 'SUMMARY':
+            data['title'] = ics.unescape(value)
+        elif name == 'DESCRIPTION':
+            data['description'] = ics.unescape(value)
+        elif name == 'LOCATION':
+            data['location'] = ics.unescape(value)
+        elif name == 'CATEGORIES':
+            data['tags'].extend(ics.unescape(tag) for tag in ics.split_list(value))
+        elif name == 'PRIORITY':
+            try:
+                level = int(value or 0)  # 0 means undefined
+            except ValueError:
+                level = 0
+            data['priority'] = 2 if level == 0 else 4 if level <= 2 else 3 if level <= 4 else 2 if level <= 6 else 1
+        elif name == 'STATUS':
+            data['cancelled'] = value.upper() == 'CANCELLED'
+        elif name == 'RRULE':
+            rrule = value
+        elif name == 'EXDATE':
+            data['recurrence_exceptions'].extend(
+                ics.parse_datetime(item, params.get('TZID')).isoformat() for item in value.split(',') if item)
+        elif name == 'CREATED':
+            data['created_at'] = ics.parse_datetime(value).isoformat()
+        elif name == 'X-FLOW-TYPE':
+            if value in _EVENT_TYPE_VALUES:
+                data['event_type'] = value
+        elif name == 'X-FLOW-COLOR':
+            data['color'] = value
+        elif name == 'X-FLOW-TASK':
+            data['task_id'] = value
+        elif name == 'X-FLOW-COMPLETED':
+            data['is_completed'] = value.upper() == 'TRUE'
+        elif name == 'X-FLOW-NOTES':
+            data['notes'] = ics.unescape(value)
+        elif name == 'VALARM':
+            minutes = _alarm_minutes(value)
+            if minutes is not None:
+                data['reminder_minutes'].append(minutes)
+    if start is None:
+        return None
+
+    # RFC 5545: no DTEND/DURATION means one day for a DATE start, else zero length
+    if end is None:
+        end = start + (duration if duration is not None else timedelta(days=1) if all_day else timedelta(0))
+    data['start_time'] = start.isoformat()
+    data['end_time'] = max(end, start).isoformat()
+    if rrule and recurrence_id is None:
+        data.update(parse_rrule(rrule, start, stats))
+    if recurrence_id is not None:
+        data['original_start'] = recurrence_id.isoformat()
+        data['recurrence_master'] = data.get('uid')
+    data.setdefault('title', '(untitled)')
+    data.setdefault('created_at', datetime.now().isoformat())
+    return data
+
+def _event_id(data: dict) -> str:
+    """Our id: X-FLOW-ID, else the UID (a stable derived id for an override of a series)"""
+    if data.get('id'):
+        return data['id']
+    uid = data.get('uid') or str(uuid.uuid4())
+    if data.get('recurrence_master'):
+        return str(uuid.uuid5(_OVERRIDE_NAMESPACE, f"{uid}|{data['original_start']}"))
+    return uid
+
+def iter_events(filename: str, stats: Optional[dict] = None,
+                colors: Optional[Dict[EventType, str]] = None) -> Iterator[Tuple[CalendarEvent, bool]]:
+    """Stream (event, cancelled) pairs out of an .ics file, one VEVENT in memory at a time
+
+    Events without an X-FLOW-COLOR take their type's colour from `colors`. A VEVENT with a
+    malformed value is skipped (counted in stats['invalid']) rather than ending the stream.
+    """
+    with open(filename, 'r', newline='', encoding='utf-8') as f:
+        for properties in ics.iter_components(f, 'VEVENT', nested=True):
+            try:
+                data = _vevent_to_dict(properties, stats)
+                if data is None:
+                    if stats is not None:
+                        stats['skipped'] = stats.get('skipped', 0) + 1
+                    continue
+                data['id'] = _event_id(data)
+                if 'color' not in data and colors:
+                    color = colors.get(EventType(data['event_type']))
+                    if color:
+                        data['color'] = color
+                event = event_from_dict(data)
+            except (ValueError, KeyError):
+                if stats is not None:
+                    stats['invalid'] = stats.get('invalid', 0) + 1
+                continue
+            yield event, data.get('cancelled', False)
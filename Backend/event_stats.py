@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Incremental calendar statistics
+Counts, durations and completions per event type and per (ISO week, type), adjusted as
+events are indexed and unindexed. Recurring series contribute their occurrences up to a
+horizon (the end of the current ISO week) that moves forward as weeks go by.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from records import record
+
+WeekKey = Tuple[int, int]  # (ISO year, ISO week)
+
+@record
+class EventRollup:
+    """Aggregated event figures for one bucket"""
+    count: int = 0
+    seconds: int = 0  # whole seconds, so adding and removing never drifts
+    completed: int = 0
+
+    def add(self, sign: int, seconds: int, completed: bool):
+        self.count += sign
+        self.seconds += sign * seconds
+        if completed:
+            self.completed += sign
+
+    @property
+    def hours(self) -> float:
+        return self.seconds / 3600
+
+    def to_dict(self) -> dict:
+        return {'count': self.count, 'hours': round(self.hours, 2), 'completed': self.completed}
+
+def week_key(moment: date) -> WeekKey:
+    iso = moment.isocalendar()
+    return iso[0], iso[1]
+
+def week_end(moment: datetime) -> datetime:
+    """Midnight starting the Monday after `moment`'s ISO week"""
+    monday = moment.date() - timedelta(days=moment.weekday())
+    return datetime.combine(monday + timedelta(days=7), datetime.min.time())
+
+class CalendarStats:
+    """Rollups by type and by ISO week and type; every figure is read without a scan"""
+
+    def __init__(self, horizon: Optional[datetime] = None):
+        self.totals = EventRollup()
+        self.by_type: Dict[object, EventRollup] = {}  # EventType -> rollup
+        self.by_week: Dict[WeekKey, Dict[object, EventRollup]] = {}  # week -> EventType -> rollup
+        self.horizon = horizon or week_end(datetime.now())  # series counted before this
+        self.after_horizon = 0  # stored events starting at or after the horizon
+
+    def add_span(self, start: datetime, end: datetime, event_type, completed: bool = False,
+                 sign: int = 1):
+        """Count (sign=1) or uncount (sign=-1) one event or occurrence"""
+        seconds = int((end - start).total_seconds())
+        if start >= self.horizon:
+            self.after_horizon += sign  # only stored events: series stop at the horizon
+        self.totals.add(sign, seconds, completed)
+        self._adjust(self.by_type, event_type, sign, seconds, completed)
+        week = self.by_week.get(week_key(start))
+        if week is None:
+            week = self.by_week[week_key(start)] = {}
+        self._adjust(week, event_type, sign, seconds, completed)
+        if not week:
+            del self.by_week[week_key(start)]
+
+    @staticmethod
+    def _adjust(rollups: dict, key, sign: int, seconds: int, completed: bool):
+        rollup = rollups.get(key)
+        if rollup is None:
+            rollup = rollups[key] = EventRollup()
+        rollup.add(sign, seconds, completed)
+        if rollup.count == 0:
+            del rollups[key]
+
+    def add_event(self, event, sign: int = 1):
+        self.add_span(event.start_time, event.end_time, event.event_type, event.is_completed, sign)
+
+    def add_series(self, master, starts: Iterable[datetime], sign: int = 1):
+        """Count generated occurrences of a master (never completed, like the occurrences)"""
+        duration = master.end_time - master.start_time
+        for start in starts:
+            self.add_span(start, start + duration, master.event_type, False, sign)
+
+    def move_horizon(self, horizon: datetime):
+        """Advance the horizon; the weeks it passes leave after_horizon
+
+        Call before adding the series occurrences of those weeks.
+        """
+        day = self.horizon.date()
+        while day < horizon.date():
+            self.after_horizon -= self.week(week_key(day)).count
+            day += timedelta(days=7)
+        self.horizon = horizon
+
+    # Reads
+
+    def week(self, key: WeekKey, event_type=None) -> EventRollup:
+        """One ISO week, for one type or summed over all types"""
+        rollups = self.by_week.get(key, {})
+        if event_type is not None:
+            return rollups.get(event_type) or EventRollup()
+        total = EventRollup()
+        for rollup in rollups.values():
+            total.count += rollup.count
+            total.seconds += rollup.seconds
+            total.completed += rollup.completed
+        return total
+
+    def trend(self, start_date: date, end_date: date, event_type=None) -> List[dict]:
+        """Per ISO week from start_date to end_date: count, hours and completions"""
+        rows = []
+        day = start_date - timedelta(days=start_date.weekday())
+        while day <= end_date:
+            key = week_key(day)
+            rows.append(dict(year=key[0], week=key[1], **self.week(key, event_type).to_dict()))
+            day += timedelta(days=7)
+        return rows
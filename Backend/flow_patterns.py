@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Learned energy and focus patterns
+Running per-hour and per-weekday-hour sums of the energy and focus observed in focus
+sessions, shrunk towards a default table while evidence is thin. Each finished session is
+folded in once; nothing is ever retrained.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from records import record
+
+DEFAULT_LEVELS = (3, 3)  # (energy, focus) for hours the prior table doesn't cover
+
+@record
+class PatternCell:
+    """Weighted sums for one bucket; weight is in hours of focus time observed"""
+    weight: float = 0.0
+    energy_sum: float = 0.0
+    focus_sum: float = 0.0
+
+    def add(self, weight: float, energy: float, focus: float):
+        self.weight += weight
+        self.energy_sum += weight * energy
+        self.focus_sum += weight * focus
+
+def _shrink(cell: PatternCell, prior: Tuple[float, float], prior_weight: float) -> Tuple[float, float]:
+    """Weighted mean of the cell, pulled towards `prior` as if it were prior_weight of evidence"""
+    total = cell.weight + prior_weight
+    return ((cell.energy_sum + prior[0] * prior_weight) / total,
+            (cell.focus_sum + prior[1] * prior_weight) / total)
+
+def _level(value: float) -> int:
+    return max(1, min(5, int(value + 0.5)))
+
+class FlowPatternModel:
+    """Hourly and weekday energy/focus curves learned incrementally from study sessions
+
+    An hour's estimate starts from the prior table (e.g. FlowCalendarOptimizer.daily_patterns)
+    and a weekday's hour starts from the overall hour, so a new user gets the defaults and
+    a weekday with little history borrows from the rest of the week.
+    """
+
+    def __init__(self, prior: Optional[Dict[int, Dict[str, int]]] = None,
+                 prior_weight: float = 2.0, work_minutes: int = 25):
+        self.prior = {hour: (levels['energy'], levels['focus']) for hour, levels in (prior or {}).items()}
+        self.prior_weight = prior_weight  # hours of observation the prior is worth
+        self.work_minutes = work_minutes  # a full focus session, for the energy estimate
+        self.hours: List[PatternCell] = [PatternCell() for _ in range(24)]
+        self.weekday_hours: List[List[PatternCell]] = [[PatternCell() for _ in range(24)] for _ in range(7)]
+        self.sessions = 0
+        self.version = 0  # bumped on every update
+        self._profiles: Dict[int, tuple] = {}  # weekday -> 24 (energy, focus) levels
+
+    @classmethod
+    def from_sessions(cls, sessions: Iterable[dict], prior: Optional[Dict[int, Dict[str, int]]] = None,
+                      work_minutes: int = 25) -> 'FlowPatternModel':
+        """Build the model from stored sessions (one pass at load time)"""
+        model = cls(prior, work_minutes=work_minutes)
+        for session in sessions:
+            model.add_session(session)
+        return model
+
+    def observation(self, session: dict) -> Optional[Tuple[float, float]]:
+        """(energy, focus) on a 1-5 scale for a finished focus session, or None
+
+        Focus is the mean camera focus score when one was recorded, else the quality rating.
+        Energy is the quality rating scaled down by how much of a full session was completed;
+        unrated sessions count as a middling 3.
+        """
+        if session.get('session_type', 'focus') != 'focus':
+            return None
+        minutes = int(session.get('duration') or 0)
+        if minutes <= 0:
+            return None
+        quality = int(session.get('quality_rating') or 0) or 3
+        focus_score = session.get('focus_score')
+        focus = 1 + 4 * max(0.0, min(1.0, focus_score)) if focus_score is not None else quality
+        completion = min(1.0, minutes / self.work_minutes)
+        energy = 1 + (quality - 1) * completion
+        return energy, focus
+
+    def add_session(self, session: dict) -> bool:
+        """Fold one session (stored dict form) into the curves; False if it carried no signal"""
+        observed = self.observation(session)
+        start = session.get('start_time')
+        if observed is None or not start:
+            return False
+        if isinstance(start, str):
+            start = datetime.fromisoformat(start)
+        self.observe(start, int(session['duration']), *observed)
+        self.sessions += 1
+        return True
+
+    def observe(self, start: datetime, minutes: int, energy: float, focus: float):
+        """Credit each hour the session covered, weighted by the minutes spent in it"""
+        cursor = start
+        remaining = minutes
+        while remaining > 0:
+            in_this_hour = min(remaining, 60 - cursor.minute)
+            weight = in_this_hour / 60.0
+            self.hours[cursor.hour].add(weight, energy, focus)
+            self.weekday_hours[cursor.weekday()][cursor.hour].add(weight, energy, focus)
+            remaining -= in_this_hour
+            cursor = (cursor + timedelta(minutes=in_this_hour)).replace(second=0, microsecond=0)
+        self.version += 1
+        self._profiles.clear()
+
+    def estimate(self, weekday: int, hour: int) -> Tuple[float, float]:
+        """Expected (energy, focus) for an hour of a weekday (0 = Monday), unrounded"""
+        overall = _shrink(self.hours[hour], self.prior.get(hour, DEFAULT_LEVELS), self.prior_weight)
+        return _shrink(self.weekday_hours[weekday][hour], overall, self.prior_weight)
+
+    def levels(self, moment: datetime) -> Tuple[int, int]:
+        """(energy, focus) as 1-5 levels for a point in time"""
+        return self.profile(moment.weekday())[moment.hour]
+
+    def profile(self, weekday: int) -> tuple:
+        """(energy, focus) levels for each hour of a weekday, cached until the next update"""
+        profile = self._profiles.get(weekday)
+        if profile is None:
+            profile = self._profiles[weekday] = tuple(
+                tuple(_level(value) for value in self.estimate(weekday, hour)) for hour in range(24))
+        return profile
+
+    def hour_curve(self) -> List[dict]:
+        """Per hour of day: learned energy and focus (all weekdays) and the hours observed"""
+        curve = []
+        for hour, cell in enumerate(self.hours):
+            energy, focus = _shrink(cell, self.prior.get(hour, DEFAULT_LEVELS), self.prior_weight)
+            curve.append({'hour': hour, 'energy': round(energy, 2), 'focus': round(focus, 2),
+                          'observed_hours': round(cell.weight, 2)})
+        return curve
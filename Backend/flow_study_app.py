@@ -12,185 +12,39 @@ from datetime import datetime, timedelta
 import threading
 import time
 from typing import Dict, List, Optional
-from dataclasses import dataclass, asdict
-from enum import Enum
+
+from startup_profiler import profiler
+from lazy_imports import lazy_import
+
+# Headless core (timer, sessions, persistence); re-exported for older imports
+from study_core import StudySession, FlowStateTimer, DataManager, StudyEngine
+from notifications import CallbackSink
 
 # Import our custom modules
 try:
-    from camera_utils import CameraManager, FocusAnalyzer, create_focus_report
     from todo_manager import TaskManager, Priority, TaskStatus, TaskCategory
-    from calendar_manager import CalendarManager, EventType, Priority as CalPriority, CalendarGUI
+    from calendar_manager import CalendarManager, EventType, Priority as CalPriority
+    from task_list_view import VirtualTaskList
 except ImportError as e:
     print(f"Warning: Could not import modules: {e}")
     print("Some features may not be available.")
 
-# Try to import PIL for image handling
-try:
-    from PIL import Image, ImageTk
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
-    print("Warning: PIL not available. Camera display may not work properly.")
-
-# Try to import cv2
-try:
-    import cv2
-    CV2_AVAILABLE = True
-except ImportError:
-    CV2_AVAILABLE = False
+# Heavy optional dependencies are only located here; they are imported on
+# first use so they stay off the path to the first window paint
+cv2 = lazy_import('cv2')
+CV2_AVAILABLE = cv2 is not None
+if not CV2_AVAILABLE:
     print("Warning: OpenCV not available. Camera features will be disabled.")
 
-@dataclass
-class StudySession:
-    id: str
-    task_id: Optional[str]
-    start_time: datetime
-    end_time: Optional[datetime]
-    duration: int  # in minutes
-    session_type: str  # 'focus' or 'break'
-    quality_rating: int  # 1-5
-    notes: str = ""
-    snapshots: List[str] = None
-
-    def __post_init__(self):
-        if self.snapshots is None:
-            self.snapshots = []
-
-class FlowStateTimer:
-    """Pomodoro timer with flow state optimization"""
-    
-    def __init__(self, work_duration=25, break_duration=5):
-        self.work_duration = work_duration * 60  # Convert to seconds
-        self.break_duration = break_duration * 60
-        self.current_duration = self.work_duration
-        self.time_left = self.current_duration
-        self.is_running = False
-        self.is_break = False
-        self.completed_cycles = 0
-        self.timer_thread = None
-        self.callbacks = []
-
-    def add_callback(self, callback):
-        """Add callback function to be called on timer events"""
-        self.callbacks.append(callback)
-
-    def start(self):
-        """Start the timer"""
-        if not self.is_running:
-            self.is_running = True
-            self.timer_thread = threading.Thread(target=self._run_timer)
-            self.timer_thread.daemon = True
-            self.timer_thread.start()
-
-    def pause(self):
-        """Pause the timer"""
-        self.is_running = False
-
-    def reset(self):
-        """Reset the timer"""
-        self.is_running = False
-        self.time_left = self.current_duration
-
-    def switch_mode(self):
-        """Switch between work and break mode"""
-        self.is_break = not self.is_break
-        self.current_duration = self.break_duration if self.is_break else self.work_duration
-        self.time_left = self.current_duration
-        self.is_running = False
-
-    def _run_timer(self):
-        """Internal timer loop"""
-        while self.is_running and self.time_left > 0:
-            time.sleep(1)
-            if self.is_running:
-                self.time_left -= 1
-                for callback in self.callbacks:
-                    try:
-                        callback('tick', self.time_left)
-                    except Exception as e:
-                        print(f"Error in timer callback: {e}")
-
-        if self.time_left <= 0:
-            if not self.is_break:
-                self.completed_cycles += 1
-            
-            for callback in self.callbacks:
-                try:
-                    callback('complete', self.is_break)
-                except Exception as e:
-                    print(f"Error in timer callback: {e}")
-            
-            # Auto-switch mode
-            self.switch_mode()
-
-    def get_formatted_time(self):
-        """Get formatted time string"""
-        minutes = self.time_left // 60
-        seconds = self.time_left % 60
-        return f"{minutes:02d}:{seconds:02d}"
-
-    def get_progress(self):
-        """Get progress percentage"""
-        elapsed = self.current_duration - self.time_left
-        return (elapsed / self.current_duration) * 100
-
-class DataManager:
-    """Manages data persistence"""
-    
-    def __init__(self, data_file="study_data.json"):
-        self.data_file = data_file
-        self.data = {
-            'sessions': [],
-            'settings': {}
-        }
-        self.load_data()
-
-    def load_data(self):
-        """Load data from file"""
-        try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r') as f:
-                    loaded_data = json.load(f)
-                    self.data.update(loaded_data)
-        except Exception as e:
-            print(f"Error loading data: {e}")
-
-    def save_data(self):
-        """Save data to file"""
-        try:
-            # Convert datetime objects to strings for JSON serialization
-            serializable_data = {}
-            for key, value in self.data.items():
-                if isinstance(value, list):
-                    serializable_data[key] = []
-                    for item in value:
-                        if isinstance(item, dict):
-                            serialized_item = {}
-                            for k, v in item.items():
-                                if isinstance(v, datetime):
-                                    serialized_item[k] = v.isoformat()
-                                else:
-                                    serialized_item[k] = v
-                            serializable_data[key].append(serialized_item)
-                        else:
-                            serializable_data[key].append(item)
-                else:
-                    serializable_data[key] = value
+Image = lazy_import('PIL.Image')
+ImageTk = lazy_import('PIL.ImageTk')
+PIL_AVAILABLE = Image is not None and ImageTk is not None
+if not PIL_AVAILABLE:
+    print("Warning: PIL not available. Camera display may not work properly.")
 
-            with open(self.data_file, 'w') as f:
-                json.dump(serializable_data, f, indent=2)
-        except Exception as e:
-            print(f"Error saving data: {e}")
+camera_utils = lazy_import('camera_utils') if CV2_AVAILABLE else None
 
-    def add_session(self, session: StudySession):
-        """Add a new session"""
-        session_dict = asdict(session)
-        session_dict['start_time'] = session.start_time.isoformat()
-        if session.end_time:
-            session_dict['end_time'] = session.end_time.isoformat()
-        
-        self.data['sessions'].append(session_dict)
-        self.save_data()
+profiler.mark('imports')
 
 class FlowStudyApp:
     """Main application class"""
@@ -201,31 +55,23 @@ class FlowStudyApp:
         self.root.geometry("1200x800")
         self.root.configure(bg='#f0f4f8')
         
-        # Initialize components
-        self.timer = FlowStateTimer()
-        self.data_manager = DataManager()
-        
-        # Initialize managers if available
+        # Initialize headless engine (timer, sessions, tasks, calendar)
+        self.engine = StudyEngine()
+        self.timer = self.engine.timer
+        self.data_manager = self.engine.data_manager
+        self.task_manager = self.engine.task_manager
+        self.calendar_manager = self.engine.calendar_manager
+        # Calendar reminders arrive on the dispatcher thread; show them from the Tk loop
+        self.calendar_manager.notification_system.dispatcher.add_sink(
+            CallbackSink(lambda n: self.root.after(0, messagebox.showinfo, n.title, n.message)))
+        profiler.mark('engine_ready')
+        
+        # Camera is opened after first paint (see on_first_paint)
         self.camera_manager = None
-        self.task_manager = None
-        self.calendar_manager = None
-        
-        try:
-            if CV2_AVAILABLE:
-                self.camera_manager = CameraManager()  # Camera auto-starts now
-                # Add focus callback for automatic timer control
-                self.camera_manager.add_focus_callback(self.on_focus_event)
-            self.task_manager = TaskManager()
-            self.calendar_manager = CalendarManager()
-        except Exception as e:
-            print(f"Warning: Could not initialize managers: {e}")
         
         # Timer callbacks
         self.timer.add_callback(self.on_timer_event)
         
-        # Current session
-        self.current_session = None
-        
         # Post-completion alarm system (1 minute after timer ends)
         self.post_completion_alarm_thread = None
         self.post_completion_alarm_running = False
@@ -235,10 +81,10 @@ class FlowStudyApp:
         
         # Setup UI
         self.setup_ui()
+        profiler.mark('ui_built')
         
-        # Start camera frame updates if available
-        if self.camera_manager:
-            self.update_camera_frame()
+        # Runs once the main loop is idle, i.e. after the window is drawn
+        self.root.after_idle(self.on_first_paint)
 
     def setup_ui(self):
         """Setup the user interface"""
@@ -246,19 +92,65 @@ class FlowStudyApp:
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(fill='both', expand=True, padx=10, pady=10)
         
-        # Create tabs
-        self.create_timer_tab()
-        self.create_tasks_tab()
-        self.create_calendar_tab()
-        if self.camera_manager:
-            self.create_camera_tab()
-        self.create_metrics_tab()
+        # Tabs start as empty frames and are built on first selection;
+        # only the timer tab is needed for the first paint
+        self.tab_builders = {}  # frame path -> (title, builder, frame)
+        self.timer_tab = self.add_tab("Focus Timer", self.create_timer_tab)
+        self.add_tab("Study Tasks", self.create_tasks_tab)
+        self.add_tab("Study Calendar", self.create_calendar_tab)
+        self.metrics_tab = self.add_tab("Flow Metrics", self.create_metrics_tab)
+        
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
+        self.build_tab(self.timer_tab)
+
+    def add_tab(self, text, builder, before=None):
+        """Add a placeholder tab whose content is built on first selection"""
+        frame = ttk.Frame(self.notebook)
+        if before is None:
+            self.notebook.add(frame, text=text)
+        else:
+            self.notebook.insert(before, frame, text=text)
+        self.tab_builders[str(frame)] = (text, builder, frame)
+        return frame
+
+    def build_tab(self, frame):
+        """Build a deferred tab if it has not been built yet"""
+        entry = self.tab_builders.pop(str(frame), None)
+        if entry:
+            text, builder, tab_frame = entry
+            builder(tab_frame)
+            profiler.mark(f"tab: {text}")
+
+    def on_tab_changed(self, event=None):
+        """Build the newly selected tab on demand"""
+        self.build_tab(self.notebook.select())
+
+    def on_first_paint(self):
+        """Record first paint, then start the deferred camera setup"""
+        self.root.update_idletasks()
+        profiler.mark('first_paint')
+        if profiler.enabled:
+            print(profiler.report())
+        if CV2_AVAILABLE:
+            self.root.after(10, self.init_camera)
+
+    def init_camera(self):
+        """Create the camera manager (first OpenCV import) and its tab"""
+        try:
+            self.camera_manager = camera_utils.CameraManager()  # Camera auto-starts
+            # Add focus callback for automatic timer control
+            self.camera_manager.add_focus_callback(self.on_focus_event)
+        except Exception as e:
+            print(f"Warning: Could not initialize camera: {e}")
+            self.camera_manager = None
+            return
+        
+        profiler.mark('camera_ready')
+        self.add_tab("Focus Tracker", self.create_camera_tab, before=self.metrics_tab)
+        self.update_camera_frame()
 
-    def create_timer_tab(self):
+    def create_timer_tab(self, timer_frame):
         """Create the timer tab"""
-        timer_frame = ttk.Frame(self.notebook)
-        self.notebook.add(timer_frame, text="Focus Timer")
-        
         # Main timer display
         timer_display_frame = ttk.LabelFrame(timer_frame, text="Pomodoro Timer", padding=20)
         timer_display_frame.pack(pady=20, padx=20, fill='x')
@@ -332,11 +224,8 @@ class FlowStudyApp:
         )
         self.cycles_label.pack()
 
-    def create_tasks_tab(self):
+    def create_tasks_tab(self, tasks_frame):
         """Create the tasks tab"""
-        tasks_frame = ttk.Frame(self.notebook)
-        self.notebook.add(tasks_frame, text="Study Tasks")
-        
         if not self.task_manager:
             no_tasks_label = tk.Label(tasks_frame, text="Task manager not available", 
                                     font=('Arial', 16), fg='red')
@@ -387,20 +276,27 @@ class FlowStudyApp:
         tasks_list_frame = ttk.LabelFrame(tasks_frame, text="Tasks", padding=10)
         tasks_list_frame.pack(pady=10, padx=20, fill='both', expand=True)
         
-        # Treeview for tasks
-        columns = ('Title', 'Priority', 'Status', 'Est. Time', 'Category')
-        self.tasks_tree = ttk.Treeview(tasks_list_frame, columns=columns, show='headings', height=15)
-        
-        for col in columns:
-            self.tasks_tree.heading(col, text=col)
-            self.tasks_tree.column(col, width=120)
-        
-        # Scrollbar for tasks
-        tasks_scrollbar = ttk.Scrollbar(tasks_list_frame, orient='vertical', command=self.tasks_tree.yview)
-        self.tasks_tree.configure(yscrollcommand=tasks_scrollbar.set)
-        
-        self.tasks_tree.pack(side='left', fill='both', expand=True)
-        tasks_scrollbar.pack(side='right', fill='y')
+        # Search box and status filter; both are answered by the task manager's indexes
+        search_frame = ttk.Frame(tasks_list_frame)
+        search_frame.pack(side='top', fill='x', pady=(0, 5))
+        ttk.Label(search_frame, text="Search:").pack(side='left', padx=5)
+        self.task_search_var = tk.StringVar()
+        self.task_search_var.trace_add('write', lambda *args: self.task_list.set_filter(
+            query=self.task_search_var.get()))
+        ttk.Entry(search_frame, textvariable=self.task_search_var, width=40).pack(side='left', fill='x', expand=True)
+        ttk.Label(search_frame, text="Show:").pack(side='left', padx=5)
+        status_filters = {"All": None, "Pending": TaskStatus.PENDING, "In Progress": TaskStatus.IN_PROGRESS,
+                          "Completed": TaskStatus.COMPLETED, "Cancelled": TaskStatus.CANCELLED}
+        self.task_status_var = tk.StringVar(value="All")
+        self.task_status_var.trace_add('write', lambda *args: self.task_list.set_filter(
+            status=status_filters.get(self.task_status_var.get())))
+        ttk.Combobox(search_frame, textvariable=self.task_status_var, values=list(status_filters),
+                     width=12, state='readonly').pack(side='left')
+        
+        # Only the visible rows live in the Treeview; click a heading to sort
+        self.task_list = VirtualTaskList(tasks_list_frame, self.task_manager, height=15)
+        self.tasks_tree = self.task_list.tree
+        self.task_list.pack()
         
         # Task control buttons
         task_buttons_frame = ttk.Frame(tasks_frame)
@@ -413,11 +309,8 @@ class FlowStudyApp:
         # Load initial tasks
         self.refresh_tasks()
 
-    def create_calendar_tab(self):
+    def create_calendar_tab(self, calendar_frame):
         """Create the calendar tab with full calendar GUI and add event functionality"""
-        calendar_frame = ttk.Frame(self.notebook)
-        self.notebook.add(calendar_frame, text="Study Calendar")
-        
         if not self.calendar_manager:
             no_calendar_label = tk.Label(calendar_frame, text="Calendar manager not available", 
                                        font=('Arial', 16), fg='red')
@@ -426,6 +319,7 @@ class FlowStudyApp:
         
         # Create the full calendar GUI with enhanced features
         try:
+            from calendar_gui import CalendarGUI
             self.calendar_gui = CalendarGUI(calendar_frame, self.calendar_manager)
             print("✓ Calendar GUI created successfully with add event functionality")
             
@@ -579,11 +473,8 @@ class FlowStudyApp:
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load today's events: {str(e)}")
 
-    def create_camera_tab(self):
+    def create_camera_tab(self, camera_frame):
         """Create the camera tab - Camera is auto-started"""
-        camera_frame = ttk.Frame(self.notebook)
-        self.notebook.add(camera_frame, text="Focus Tracker")
-        
         # Camera status display
         status_frame = ttk.LabelFrame(camera_frame, text="Camera Status", padding=10)
         status_frame.pack(pady=10, padx=20, fill='x')
@@ -637,11 +528,8 @@ class FlowStudyApp:
                 self.camera_status_label.config(text="Camera Failed to Start", fg="red")
                 messagebox.showerror("Error", "Failed to restart camera")
 
-    def create_metrics_tab(self):
+    def create_metrics_tab(self, metrics_frame):
         """Create the metrics tab"""
-        metrics_frame = ttk.Frame(self.notebook)
-        self.notebook.add(metrics_frame, text="Flow Metrics")
-        
         # Metrics display
         metrics_display_frame = ttk.LabelFrame(metrics_frame, text="Flow State Metrics", padding=20)
         metrics_display_frame.pack(pady=20, padx=20, fill='both', expand=True)
@@ -663,6 +551,10 @@ class FlowStudyApp:
                                         font=('Arial', 14), bg='#f0f4f8')
         self.avg_quality_label.pack(pady=10)
         
+        self.this_week_label = tk.Label(metrics_display_frame, text="This Week: 0h 0m", 
+                                      font=('Arial', 14), bg='#f0f4f8')
+        self.this_week_label.pack(pady=10)
+        
         # Camera status in metrics
         if self.camera_manager:
             self.camera_metrics_label = tk.Label(metrics_display_frame, 
@@ -712,40 +604,21 @@ class FlowStudyApp:
         # Stop any running post-completion alarm
         self.stop_post_completion_alarm()
         
-        session_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        self.current_session = StudySession(
-            id=session_id,
-            task_id=None,
-            start_time=datetime.now(),
-            end_time=None,
-            duration=0,
-            session_type='focus' if not self.timer.is_break else 'break',
-            quality_rating=0
-        )
+        session = self.engine.start_session()
         
         # Start camera recording if available
         if self.camera_manager and self.camera_manager.is_active:
-            self.camera_manager.start_session_recording(session_id)
+            self.camera_manager.start_session_recording(session.id)
 
     def end_current_session(self):
         """End the current study session"""
-        if self.current_session:
-            self.current_session.end_time = datetime.now()
-            duration_seconds = (self.current_session.end_time - self.current_session.start_time).total_seconds()
-            self.current_session.duration = int(duration_seconds / 60)
-            
-            # Simple quality rating (could be enhanced with user input)
-            self.current_session.quality_rating = 4 if self.current_session.session_type == 'focus' else 3
-            
-            # Save session
-            self.data_manager.add_session(self.current_session)
-            
+        session = self.engine.end_session()
+        if session:
             # Stop camera recording if available
             if self.camera_manager:
                 self.camera_manager.stop_session_recording()
             
-            print(f"Session completed: {self.current_session.duration} minutes")
-            self.current_session = None
+            print(f"Session completed: {session.duration} minutes")
 
     def on_timer_event(self, event_type, data):
         """Handle timer events"""
@@ -811,49 +684,38 @@ class FlowStudyApp:
             messagebox.showerror("Error", f"Failed to add task: {str(e)}")
 
     def refresh_tasks(self):
-        """Refresh the tasks list"""
+        """Refresh the tasks list (only visible rows that changed are redrawn)"""
         if not self.task_manager:
             return
-            
-        # Clear existing items
-        for item in self.tasks_tree.get_children():
-            self.tasks_tree.delete(item)
         
-        # Add tasks
         try:
-            tasks = self.task_manager.get_tasks()
-            for task in tasks:
-                self.tasks_tree.insert('', 'end', values=(
-                    task.title,
-                    task.priority.name,
-                    task.status.value.replace('_', ' ').title(),
-                    f"{task.estimated_time} min",
-                    task.category.value.replace('_', ' ').title()
-                ))
+            self.task_list.refresh()
         except Exception as e:
             print(f"Error refreshing tasks: {e}")
 
     def complete_task(self):
         """Mark selected task as completed"""
-        selection = self.tasks_tree.selection()
+        selection = self.task_list.selected_ids()
         if not selection:
             messagebox.showwarning("No Selection", "Please select a task to complete")
             return
         
-        # Get task details (simplified - would need proper task ID tracking)
+        for task_id in selection:
+            self.task_manager.complete_task(task_id)
         messagebox.showinfo("Task Completed", "Task marked as completed!")
         self.refresh_tasks()
 
     def delete_task(self):
         """Delete selected task"""
-        selection = self.tasks_tree.selection()
+        selection = self.task_list.selected_ids()
         if not selection:
             messagebox.showwarning("No Selection", "Please select a task to delete")
             return
         
         if messagebox.askyesno("Confirm Delete", "Are you sure you want to delete this task?"):
-            # Delete task (simplified implementation)
-            self.tasks_tree.delete(selection[0])
+            for task_id in selection:
+                self.task_manager.delete_task(task_id)
+            self.refresh_tasks()
             messagebox.showinfo("Task Deleted", "Task deleted successfully!")
 
     def take_snapshot(self):
@@ -872,68 +734,73 @@ class FlowStudyApp:
             messagebox.showwarning("Camera Not Active", "Camera not available for snapshots")
 
     def update_camera_frame(self):
-        """Update camera frame display"""
+        """Analyze the current camera frame and update the display"""
         if self.camera_manager and self.camera_manager.is_active:
             try:
                 analysis = self.camera_manager.analyze_current_frame()
                 if analysis:
-                    frame = analysis['frame']
-                    focus_data = analysis['focus']
-                    
-                    # Update focus information
-                    self.focus_score_label.config(text=f"Focus Score: {focus_data['focus_score']:.2f}")
-                    status = "FOCUSED" if focus_data['is_focused'] else "DISTRACTED"
-                    color = "green" if focus_data['is_focused'] else "red"
-                    self.focus_status_label.config(text=f"Status: {status}", fg=color)
-                    
-                    # Update camera display if PIL is available
-                    if PIL_AVAILABLE and CV2_AVAILABLE:
-                        try:
-                            # Resize frame for display
-                            height, width = frame.shape[:2]
-                            display_width = 400  # Reasonable size for display
-                            display_height = int(height * display_width / width)
-                            frame_resized = cv2.resize(frame, (display_width, display_height))
-                            
-                            # Draw face detection overlay
-                            overlay_frame = self.camera_manager.focus_analyzer.draw_analysis_overlay(frame_resized, {
-                                'faces': [[int(x*display_width/width), int(y*display_height/height), 
-                                         int(w*display_width/width), int(h*display_height/height)] 
-                                        for x, y, w, h in focus_data['faces']],
-                                'eyes': [[int(x*display_width/width), int(y*display_height/height), 
-                                        int(w*display_width/width), int(h*display_height/height)] 
-                                       for x, y, w, h in focus_data['eyes']],
-                                'is_focused': focus_data['is_focused'],
-                                'focus_score': focus_data['focus_score']
-                            })
-                            
-                            # Convert to PhotoImage
-                            image = Image.fromarray(overlay_frame)
-                            photo = ImageTk.PhotoImage(image)
-                            
-                            self.camera_label.config(image=photo, text="")
-                            self.camera_label.image = photo
-                        except Exception as display_error:
-                            print(f"Error updating camera display: {display_error}")
-                            # Show basic status without image
-                            self.camera_label.config(image="", text=f"Camera Active\n{status}")
-                    else:
-                        # Show status text if image display not available
-                        self.camera_label.config(image="", text=f"Camera Active\n{status}\nScore: {focus_data['focus_score']:.2f}")
+                    # Focus tracking runs regardless; the display only once its tab is built
+                    if hasattr(self, 'camera_label'):
+                        self.show_camera_analysis(analysis['frame'], analysis['focus'])
                     
                     # Add frame to recording if session is active
                     if self.current_session:
-                        self.camera_manager.add_frame_to_recording(focus_data)
+                        self.camera_manager.add_frame_to_recording(analysis['focus'])
+                        self.engine.add_focus_sample(analysis['focus']['focus_score'])
                         
             except Exception as e:
                 print(f"Error updating camera frame: {e}")
                 # Show error status
-                self.focus_score_label.config(text="Focus Score: Error")
-                self.focus_status_label.config(text="Status: Camera Error", fg="red")
+                if hasattr(self, 'camera_label'):
+                    self.focus_score_label.config(text="Focus Score: Error")
+                    self.focus_status_label.config(text="Status: Camera Error", fg="red")
         
         # Schedule next update
         self.root.after(100, self.update_camera_frame)
 
+    def show_camera_analysis(self, frame, focus_data):
+        """Update focus labels and the camera preview"""
+        # Update focus information
+        self.focus_score_label.config(text=f"Focus Score: {focus_data['focus_score']:.2f}")
+        status = "FOCUSED" if focus_data['is_focused'] else "DISTRACTED"
+        color = "green" if focus_data['is_focused'] else "red"
+        self.focus_status_label.config(text=f"Status: {status}", fg=color)
+        
+        # Update camera display if PIL is available
+        if PIL_AVAILABLE and CV2_AVAILABLE:
+            try:
+                # Resize frame for display
+                height, width = frame.shape[:2]
+                display_width = 400  # Reasonable size for display
+                display_height = int(height * display_width / width)
+                frame_resized = cv2.resize(frame, (display_width, display_height))
+                
+                # Draw face detection overlay
+                overlay_frame = self.camera_manager.focus_analyzer.draw_analysis_overlay(frame_resized, {
+                    'faces': [[int(x*display_width/width), int(y*display_height/height), 
+                             int(w*display_width/width), int(h*display_height/height)] 
+                            for x, y, w, h in focus_data['faces']],
+                    'eyes': [[int(x*display_width/width), int(y*display_height/height), 
+                            int(w*display_width/width), int(h*display_height/height)] 
+                           for x, y, w, h in focus_data['eyes']],
+                    'is_focused': focus_data['is_focused'],
+                    'focus_score': focus_data['focus_score']
+                })
+                
+                # Convert to PhotoImage
+                image = Image.fromarray(overlay_frame)
+                photo = ImageTk.PhotoImage(image)
+                
+                self.camera_label.config(image=photo, text="")
+                self.camera_label.image = photo
+            except Exception as display_error:
+                print(f"Error updating camera display: {display_error}")
+                # Show basic status without image
+                self.camera_label.config(image="", text=f"Camera Active\n{status}")
+        else:
+            # Show status text if image display not available
+            self.camera_label.config(image="", text=f"Camera Active\n{status}\nScore: {focus_data['focus_score']:.2f}")
+
     def on_focus_event(self, event_type):
         """Handle focus events from camera"""
         if event_type == 'focus_lost':
@@ -1023,11 +890,22 @@ class FlowStudyApp:
     def update_metrics(self):
         """Update flow state metrics"""
         try:
-            # Update timer metrics
-            total_focus_minutes = self.timer.completed_cycles * 25
-            hours = total_focus_minutes // 60
-            minutes = total_focus_minutes % 60
-            self.total_focus_label.config(text=f"Total Focus Time: {hours}h {minutes}m")
+            # Session metrics come from rollups maintained on every add_session
+            summary = self.data_manager.metrics.summary()
+            total_focus_minutes = summary['total_focus_minutes']
+            self.total_focus_label.config(
+                text=f"Total Focus Time: {total_focus_minutes // 60}h {total_focus_minutes % 60}m")
+            week_minutes = summary['this_week']['focus_minutes']
+            self.this_week_label.config(text=f"This Week: {week_minutes // 60}h {week_minutes % 60}m")
+            
+            streak = summary['current_streak']
+            self.current_streak_label.config(
+                text=f"Current Streak: {streak} day{'s' if streak != 1 else ''} (best {summary['longest_streak']})")
+            
+            trend = summary['quality_trend']
+            trend_text = f" ({'+' if trend >= 0 else ''}{trend:.1f} recent)" if summary['focus_sessions'] else ""
+            self.avg_quality_label.config(
+                text=f"Average Session Quality: {summary['average_quality']:.1f}/5{trend_text}")
             
             # Update task metrics if available
             if self.task_manager:
@@ -1041,13 +919,14 @@ class FlowStudyApp:
                 camera_status = "Camera: Active (Auto-Started)" if self.camera_manager.is_active else "Camera: Not Active"
                 self.camera_metrics_label.config(text=camera_status)
             
-            # Placeholder metrics
-            self.current_streak_label.config(text="Current Streak: 1 day")
-            self.avg_quality_label.config(text="Average Session Quality: 4.2/5")
-            
         except Exception as e:
             print(f"Error updating metrics: {e}")
 
+    @property
+    def current_session(self) -> Optional[StudySession]:
+        """Session currently tracked by the engine"""
+        return self.engine.current_session
+
     def run(self):
         """Run the application"""
         try:
@@ -1064,9 +943,10 @@ class FlowStudyApp:
             self.root.mainloop()
         finally:
             # Cleanup
+            self.engine.shutdown()
             if self.camera_manager:
                 self.camera_manager.stop_camera()
-            if CV2_AVAILABLE:
+            if self.camera_manager and CV2_AVAILABLE:
                 cv2.destroyAllWindows()
 
 def main():
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Free/busy sweep
+Busy intervals arrive sorted by start and are merged in a single pass; the merged stream is
+swept against the working-hours windows to produce free intervals, lazily, so "first N free
+slots" queries stop as soon as they have enough however long the range is
+"""
+
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+Interval = Tuple[datetime, datetime]
+
+def _as_time(value: Union[int, time]) -> time:
+    return time(value) if isinstance(value, int) else value
+
+class WorkingHours:
+    """Weekly mask of the hours that may be scheduled: weekday (0 = Monday) -> [(from, to)]
+
+    A span whose end is not after its start runs past midnight (e.g. 22:00-02:00), and
+    time(0)-time(0) is the whole day.
+    """
+
+    def __init__(self, spans: Optional[Dict[int, List[Tuple[Union[int, time], Union[int, time]]]]] = None):
+        self.spans: Dict[int, List[Tuple[time, time]]] = {
+            weekday: sorted((_as_time(start), _as_time(end)) for start, end in day_spans)
+            for weekday, day_spans in (spans or {}).items()
+        }
+
+    @classmethod
+    def daily(cls, start: Union[int, time] = 8, end: Union[int, time] = 20,
+              weekdays: Iterable[int] = range(7)) -> 'WorkingHours':
+        """The same span on each of `weekdays` (every day by default)"""
+        return cls({weekday: [(start, end)] for weekday in weekdays})
+
+    def _day_windows(self, day: date) -> Iterator[Interval]:
+        for start, end in self.spans.get(day.weekday(), ()):
+            window_start = datetime.combine(day, start)
+            window_end = datetime.combine(day, end)
+            if window_end <= window_start:
+                window_end += timedelta(days=1)
+            yield window_start, window_end
+
+    def windows(self, start: datetime, end: datetime) -> Iterator[Interval]:
+        """Working windows clipped to [start, end), in order, touching ones joined"""
+        pending = None
+        day = start.date() - timedelta(days=1)  # yesterday's span may run past midnight
+        while datetime.combine(day, time()) < end:
+            for window_start, window_end in self._day_windows(day):
+                window_start, window_end = max(window_start, start), min(window_end, end)
+                if window_start >= window_end:
+                    continue
+                if pending is not None and window_start <= pending[1]:
+                    pending = (pending[0], max(pending[1], window_end))
+                    continue
+                if pending is not None:
+                    yield pending
+                pending = (window_start, window_end)
+            day += timedelta(days=1)
+        if pending is not None:
+            yield pending
+
+def merge_busy(intervals: Iterable[Interval]) -> Iterator[Interval]:
+    """Merge start-ordered busy intervals; overlapping and touching ones become one"""
+    current = None
+    for start, end in intervals:
+        if end <= start:
+            continue
+        if current is not None and start <= current[1]:
+            if end > current[1]:
+                current = (current[0], end)
+            continue
+        if current is not None:
+            yield current
+        current = (start, end)
+    if current is not None:
+        yield current
+
+def free_intervals(busy: Iterable[Interval], windows: Iterable[Interval]) -> Iterator[Interval]:
+    """Parts of the windows not covered by busy; both inputs sorted and non-overlapping"""
+    busy = iter(busy)
+    pending = next(busy, None)
+    for window_start, window_end in windows:
+        cursor = window_start
+        while pending is not None and pending[0] < window_end:
+            busy_start, busy_end = pending
+            if busy_start > cursor:
+                yield cursor, busy_start
+            cursor = max(cursor, busy_end)
+            if busy_end > window_end:
+                break  # still busy in the next window
+            pending = next(busy, None)
+        if cursor < window_end:
+            yield cursor, window_end
+
+def slots(free: Iterable[Interval], duration: timedelta,
+          step: Optional[timedelta] = None) -> Iterator[Interval]:
+    """Slots of `duration` in the free intervals: one at the start of each, or every `step`"""
+    for start, end in free:
+        slot_start = start
+        while slot_start + duration <= end:
+            yield slot_start, slot_start + duration
+            if step is None:
+                break
+            slot_start += step
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Minimal iCalendar (RFC 5545) text handling
+Value escaping, 75-octet line folding and streaming component parsing, so large files
+are read and written one component at a time
+"""
+
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:
+    ZoneInfo = None
+
+DATETIME_FORMAT = '%Y%m%dT%H%M%S'
+_DURATION = re.compile(r'^([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$')
+
+def escape(value: str) -> str:
+    """Escape a TEXT value"""
+    return (value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+def unescape(value: str) -> str:
+    """Undo escape() (unknown escapes keep the escaped character)"""
+    if '\\' not in value:
+        return value
+    out = []
+    chars = iter(value)
+    for ch in chars:
+        if ch == '\\':
+            nxt = next(chars, '')
+            out.append('\n' if nxt in ('n', 'N') else nxt)
+        else:
+            out.append(ch)
+    return ''.join(out)
+
+def fold(line: str) -> str:
+    """Fold a content line at 75 octets without splitting UTF-8 sequences"""
+    data = line.encode('utf-8')
+    if len(data) <= 75:
+        return line + '\r\n'
+    parts = []
+    limit = 75
+    while data:
+        cut = min(limit, len(data))
+        while cut < len(data) and (data[cut] & 0xC0) == 0x80:
+            cut -= 1  # don't start the next part inside a multi-byte character
+        parts.append(data[:cut].decode('utf-8'))
+        data = data[cut:]
+        limit = 74  # continuation lines start with a space
+    return '\r\n '.join(parts) + '\r\n'
+
+def format_datetime(value: datetime) -> str:
+    return value.strftime(DATETIME_FORMAT)
+
+def _zone(tzid: Optional[str]):
+    if not tzid or ZoneInfo is None:
+        return None
+    try:
+        return ZoneInfo(tzid)
+    except Exception:
+        return None  # unknown zone: take the time as local
+
+def parse_datetime(value: str, tzid: Optional[str] = None) -> datetime:
+    """DATE-TIME or DATE value as a naive local time
+
+    UTC values ('Z') and values with a known TZID are converted to the local zone;
+    floating times and DATE values are taken as they are.
+    """
+    value = value.strip()
+    try:
+        # Fixed-width digits; slicing is far cheaper than strptime on big imports
+        day = datetime(int(value[0:4]), int(value[4:6]), int(value[6:8]))
+        if 'T' not in value:
+            return day
+        moment = day.replace(hour=int(value[9:11]), minute=int(value[11:13]), second=int(value[13:15]))
+    except ValueError:
+        raise ValueError(f"invalid date/time: {value!r}") from None
+    zone = timezone.utc if value.endswith('Z') else _zone(tzid)
+    if zone is not None:
+        moment = moment.replace(tzinfo=zone).astimezone().replace(tzinfo=None)
+    return moment
+
+def format_duration(value: timedelta) -> str:
+    """timedelta -> DURATION value such as 'PT1H30M' or '-P1D'"""
+    seconds = int(value.total_seconds())
+    sign = '-' if seconds < 0 else ''
+    days, rest = divmod(abs(seconds), 86400)
+    hours, rest = divmod(rest, 3600)
+    minutes, seconds = divmod(rest, 60)
+    text = f"{sign}P{days}D" if days else f"{sign}P"
+    if hours or minutes or seconds or not days:
+        text += 'T' + (f"{hours}H" if hours else '') + (f"{minutes}M" if minutes else '')
+        text += f"{seconds}S" if seconds or not (hours or minutes) else ''
+    return text
+
+def parse_duration(value: str) -> timedelta:
+    match = _DURATION.match(value.strip().upper())
+    if not match:
+        raise ValueError(f"invalid duration: {value!r}")
+    sign, weeks, days, hours, minutes, seconds = match.groups()
+    delta = timedelta(weeks=int(weeks or 0), days=int(days or 0), hours=int(hours or 0),
+                      minutes=int(minutes or 0), seconds=int(seconds or 0))
+    return -delta if sign == '-' else delta
+
+def split_list(value: str) -> Iterator[str]:
+    """Split a comma-separated property value on unescaped commas (items stay escaped)"""
+    part, escaped = [], False
+    for ch in value:
+        if escaped:
+            part.append('\\' + ch)
+            escaped = False
+        elif ch == '\\':
+            escaped = True
+        elif ch == ',':
+            yield ''.join(part)
+            part = []
+        else:
+            part.append(ch)
+    if part:
+        yield ''.join(part)
+
+def unfold(lines: Iterable[str]) -> Iterator[str]:
+    """Join folded continuation lines, yielding one logical content line at a time"""
+    current: Optional[str] = None
+    for raw in lines:
+        line = raw.rstrip('\r\n')
+        if line[:1] in (' ', '\t') and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current:
+        yield current
+
+def split_line(line: str) -> Tuple[str, Dict[str, str], str]:
+    """'NAME;PARAM=x:value' -> (NAME, {PARAM: x}, value)"""
+    # The value starts at the first ':' outside a quoted parameter value
+    in_quotes = False
+    for i, ch in enumerate(line):
+        if ch == '"':
+            in_quotes = not in_quotes
+        elif ch == ':' and not in_quotes:
+            head, value = line[:i], line[i + 1:]
+            break
+    else:
+        head, value = line, ''
+    name, *params = head.split(';')
+    parameters = {}
+    for param in params:
+        key, _, param_value = param.partition('=')
+        parameters[key.upper()] = param_value.strip('"')
+    return name.upper(), parameters, value
+
+def iter_components(stream: TextIO, component: str,
+                    nested: bool = False) -> Iterator[List[Tuple[str, Dict[str, str], object]]]:
+    """Yield the properties of each top-level `component` (e.g. VEVENT) as they are read
+
+    Nested components (such as VALARM) are skipped, or with `nested` appended as one
+    (NAME, {}, [their properties]) entry each; memory use is one component.
+    """
+    begin, end = f'BEGIN:{component}', f'END:{component}'
+    properties: Optional[list] = None
+    child: Optional[list] = None
+    depth = 0
+    for line in unfold(stream):
+        upper = line.upper()
+        if properties is None:
+            if upper == begin:
+                properties = []
+            continue
+        if upper == end and depth == 0:
+            yield properties
+            properties = None
+        elif upper.startswith('BEGIN:'):
+            depth += 1
+            if nested and depth == 1:
+                child = []
+                properties.append((line[6:].upper(), {}, child))
+        elif upper.startswith('END:'):
+            depth -= 1
+            if depth == 0:
+                child = None
+        elif depth == 0:
+            properties.append(split_line(line))
+        elif depth == 1 and child is not None:
+            child.append(split_line(line))
+
+def write_component(stream: TextIO, component: str, properties: Iterable[Tuple[str, str]],
+                    children: Iterable[Tuple[str, Iterable[Tuple[str, str]]]] = ()):
+    """Write one component and any (name, properties) sub-components such as VALARM
+
+    Values must already be escaped/formatted; a name may carry parameters ('DTSTART;VALUE=DATE').
+    """
+    stream.write(f'BEGIN:{component}\r\n')
+    for name, value in properties:
+        stream.write(fold(f'{name}:{value}'))
+    for child, child_properties in children:
+        write_component(stream, child, child_properties)
+    stream.write(f'END:{component}\r\n')
+
+def write_header(stream: TextIO):
+    stream.write('BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Flow Study App//Calendar//EN\r\n')
+
+def write_footer(stream: TextIO):
+    stream.write('END:VCALENDAR\r\n')
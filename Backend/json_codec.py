@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+JSON codec layer used by every persistence path
+Picks the fastest installed backend (orjson, msgspec, stdlib json), writes compact
+output by default and pretty-prints only when asked
+"""
+
+import json
+import os
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Callable, List, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+BACKEND = 'orjson' if orjson else 'msgspec' if msgspec else 'json'
+
+# Pretty-printing is opt-in per call, or globally for people who hand-edit data files
+PRETTY_DEFAULT = os.environ.get('FLOW_JSON_PRETTY', '') == '1'
+
+def _default(obj):
+    """Encode the non-JSON types our records and session dicts carry"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if hasattr(obj, 'tolist'):
+        # numpy scalars and arrays from the camera analysis
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _encode_orjson(obj, pretty: bool) -> bytes:
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    if pretty:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(obj, default=_default, option=option)
+
+def _encode_msgspec(obj, pretty: bool) -> bytes:
+    data = _msgspec_encoder.encode(obj)
+    return msgspec.json.format(data, indent=2) if pretty else data
+
+def _encode_stdlib(obj, pretty: bool) -> bytes:
+    if pretty:
+        text = json.dumps(obj, default=_default, indent=2)
+    else:
+        text = json.dumps(obj, default=_default, separators=(',', ':'))
+    return text.encode('utf-8')
+
+if orjson:
+    _encode = _encode_orjson
+    _decode = orjson.loads
+elif msgspec:
+    _msgspec_encoder = msgspec.json.Encoder(enc_hook=_default)
+    _msgspec_decoder = msgspec.json.Decoder()
+    _encode = _encode_msgspec
+    _decode = _msgspec_decoder.decode
+else:
+    _encode = _encode_stdlib
+    _decode = json.loads
+
+def dumps(obj: Any, pretty: Optional[bool] = None) -> bytes:
+    """Encode to UTF-8 JSON bytes"""
+    return _encode(obj, PRETTY_DEFAULT if pretty is None else pretty)
+
+def loads(data) -> Any:
+    """Decode JSON from bytes or str"""
+    return _decode(data)
+
+def dump_file(path: str, obj: Any, pretty: Optional[bool] = None):
+    """Write obj to path as JSON"""
+    with open(path, 'wb') as f:
+        f.write(dumps(obj, pretty))
+
+def load_file(path: str) -> Any:
+    """Read JSON from path"""
+    with open(path, 'rb') as f:
+        return _decode(f.read())
+
+def load_records(path: str, key: str, from_dict: Callable[[dict], Any]) -> List[Any]:
+    """Decode the list under `key` straight into typed records"""
+    data = load_file(path)
+    return [from_dict(item) for item in data.get(key, [])]
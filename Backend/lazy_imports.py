@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Lazy module loading helpers
+Optional heavy dependencies (OpenCV, Pillow, NumPy, the camera module) are located
+without being imported, and only executed on first attribute access
+"""
+
+import importlib
+import importlib.util
+import time
+from typing import Dict, Optional
+
+# module name -> seconds spent importing it on first use
+load_times: Dict[str, float] = {}
+
+def is_available(name: str) -> bool:
+    """Check whether a module can be imported, without importing it"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+class LazyModule:
+    """Module proxy that imports the real module on first attribute access"""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            start = time.perf_counter()
+            self._module = importlib.import_module(self._name)
+            load_times[self._name] = time.perf_counter() - start
+        return self._module
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+def lazy_import(name: str) -> Optional[LazyModule]:
+    """Return a lazy proxy for `name`, or None if the module is not installed"""
+    if not is_available(name):
+        return None
+    return LazyModule(name)
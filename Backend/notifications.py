@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Notification dispatch
+Producers post notifications to a bounded queue and return at once; a worker thread hands
+each one to the registered sinks (in-app, desktop, log, WebSocket, alarm sound).
+Duplicates inside a time window are dropped and a full queue sheds its oldest entry.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Callable, Deque, Dict, List, Optional
+
+import json_codec
+from records import record
+
+try:
+    from plyer import notification as plyer_notification
+except ImportError:
+    plyer_notification = None
+
+try:
+    import winsound
+except ImportError:
+    winsound = None
+
+try:
+    from websockets.sync.server import serve as websocket_serve
+except ImportError:
+    websocket_serve = None
+
+@record(frozen=True)
+class Notification:
+    kind: str  # 'reminder', 'start', ...
+    title: str
+    message: str
+    key: str = ""  # de-duplication key; empty means never de-duplicated
+    event_id: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+    def to_dict(self) -> dict:
+        return {
+            'kind': self.kind,
+            'title': self.title,
+            'message': self.message,
+            'event_id': self.event_id,
+            'created_at': (self.created_at or datetime.now()).isoformat(),
+        }
+
+class NotificationSink:
+    """Delivers notifications somewhere; kinds limits which ones it receives (None = all)"""
+
+    name = "sink"
+
+    def __init__(self, kinds: Optional[List[str]] = None):
+        self.kinds = set(kinds) if kinds else None
+
+    def accepts(self, notification: Notification) -> bool:
+        return self.kinds is None or notification.kind in self.kinds
+
+    def send(self, notification: Notification):
+        raise NotImplementedError
+
+class LogSink(NotificationSink):
+    """Print to the console (always available, e.g. for the headless daemon)"""
+
+    name = "log"
+    LABELS = {'reminder': "REMINDER", 'start': "EVENT STARTED"}
+
+    def send(self, notification: Notification):
+        label = self.LABELS.get(notification.kind, notification.kind.upper())
+        print(f"{label}: {notification.message}")
+
+class CallbackSink(NotificationSink):
+    """Hand notifications to a callable, e.g. a GUI that shows them on its own thread"""
+
+    def __init__(self, callback: Callable[[Notification], None], name: str = "in_app",
+                 kinds: Optional[List[str]] = None):
+        super().__init__(kinds)
+        self.callback = callback
+        self.name = name
+
+    def send(self, notification: Notification):
+        self.callback(notification)
+
+class WebSocketSink(NotificationSink):
+    """Send each notification as JSON text through `broadcast` (e.g. a WebSocket server's)"""
+
+    name = "websocket"
+
+    def __init__(self, broadcast: Callable[[str], None], kinds: Optional[List[str]] = None):
+        super().__init__(kinds)
+        self.broadcast = broadcast
+
+    def send(self, notification: Notification):
+        self.broadcast(json_codec.dumps({'type': 'notification', **notification.to_dict()},
+                                        pretty=False).decode('utf-8'))
+
+class WebSocketBroadcaster:
+    """Small WebSocket server whose broadcast() sends a text frame to every connected client"""
+
+    def __init__(self, host: str = "localhost", port: int = 8765):
+        self.host = host
+        self.port = port
+        self.clients = set()
+        self._lock = threading.Lock()
+        self._server = None
+
+    def start(self) -> bool:
+        """Serve on a background thread; False if the websockets package is missing"""
+        if websocket_serve is None:
+            print("WebSocket notifications need the 'websockets' package")
+            return False
+        self._server = websocket_serve(self._handle, self.host, self.port)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return True
+
+    def _handle(self, connection):
+        with self._lock:
+            self.clients.add(connection)
+        try:
+            for _ in connection:  # incoming messages are ignored; wait for the close
+                pass
+        finally:
+            with self._lock:
+                self.clients.discard(connection)
+
+    def broadcast(self, text: str):
+        with self._lock:
+            clients = list(self.clients)
+        for connection in clients:
+            try:
+                connection.send(text)
+            except Exception:
+                with self._lock:
+                    self.clients.discard(connection)
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
+
+class DesktopSink(NotificationSink):
+    """Native desktop notifications via plyer, notify-send or osascript when present"""
+
+    name = "desktop"
+
+    def __init__(self, kinds: Optional[List[str]] = None):
+        super().__init__(kinds)
+        # notify-send needs a graphical session to talk to
+        has_display = bool(os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+        self.notify_send = shutil.which('notify-send') if has_display else None
+        self.osascript = shutil.which('osascript') if sys.platform == 'darwin' else None
+
+    @property
+    def available(self) -> bool:
+        return bool(plyer_notification or self.notify_send or self.osascript)
+
+    def send(self, notification: Notification):
+        if plyer_notification is not None:
+            plyer_notification.notify(title=notification.title, message=notification.message,
+                                      app_name="Flow Study App", timeout=10)
+        elif self.notify_send:
+            subprocess.run([self.notify_send, notification.title, notification.message],
+                           timeout=5, check=False)
+        elif self.osascript:
+            script = 'display notification {} with title {}'.format(
+                json_codec.dumps(notification.message, pretty=False).decode('utf-8'),
+                json_codec.dumps(notification.title, pretty=False).decode('utf-8'))
+            subprocess.run([self.osascript, '-e', script], timeout=5, check=False)
+
+class AlarmSink(NotificationSink):
+    """Short alarm sound (terminal bell where winsound is missing)
+
+    Beep blocks while it plays, so it runs on its own thread rather than holding up the
+    dispatcher's worker and every other sink.
+    """
+
+    name = "alarm"
+
+    def __init__(self, kinds: Optional[List[str]] = None):
+        super().__init__(kinds or ['start'])
+
+    def send(self, notification: Notification):
+        if winsound is not None:
+            # 1000 Hz for 500ms
+            threading.Thread(target=winsound.Beep, args=(1000, 500), daemon=True).start()
+        else:
+            print("\a" * 3)  # Terminal bell
+
+class NotificationDispatcher:
+    """Bounded, de-duplicating queue drained by one background worker"""
+
+    def __init__(self, sinks: Optional[List[NotificationSink]] = None, max_queue: int = 100,
+                 dedup_window: timedelta = timedelta(minutes=5)):
+        self.sinks: List[NotificationSink] = list(sinks or [])
+        self.max_queue = max_queue
+        self.dedup_window = dedup_window
+        self.queue: Deque[Notification] = deque()
+        self.recent: Dict[str, datetime] = {}  # key -> when last accepted
+        self.stats = {'posted': 0, 'delivered': 0, 'duplicates': 0, 'dropped': 0, 'errors': 0}
+        self._lock = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self._running = False
+        self._busy = False  # worker is inside deliver()
+
+    def add_sink(self, sink: NotificationSink):
+        with self._lock:
+            self.sinks.append(sink)
+
+    def remove_sink(self, name: str):
+        with self._lock:
+            self.sinks = [sink for sink in self.sinks if sink.name != name]
+
+    def post(self, notification: Notification) -> bool:
+        """Queue a notification without blocking; False if it was a duplicate"""
+        now = datetime.now()
+        with self._lock:
+            if notification.key:
+                last = self.recent.get(notification.key)
+                if last is not None and now - last < self.dedup_window:
+                    self.stats['duplicates'] += 1
+                    return False
+                self.recent[notification.key] = now
+                if len(self.recent) > 4 * self.max_queue:
+                    cutoff = now - self.dedup_window
+                    self.recent = {k: t for k, t in self.recent.items() if t >= cutoff}
+            if len(self.queue) >= self.max_queue:
+                self.queue.popleft()  # backpressure: shed the oldest
+                self.stats['dropped'] += 1
+            self.queue.append(notification)
+            self.stats['posted'] += 1
+            self._ensure_worker()
+            self._lock.notify()
+        return True
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._running = True
+            self._worker = threading.Thread(target=self._drain, daemon=True)
+            self._worker.start()
+
+    def _drain(self):
+        while True:
+            with self._lock:
+                while self._running and not self.queue:
+                    self._lock.wait()
+                if not self.queue:
+                    return
+                notification = self.queue.popleft()
+                sinks = list(self.sinks)
+                self._busy = True
+            try:
+                self.deliver(notification, sinks)
+            finally:
+                with self._lock:
+                    self._busy = False
+
+    def deliver(self, notification: Notification, sinks: Optional[List[NotificationSink]] = None):
+        """Send to every accepting sink now; one failing sink doesn't stop the others"""
+        for sink in sinks if sinks is not None else self.sinks:
+            if not sink.accepts(notification):
+                continue
+            try:
+                sink.send(notification)
+                outcome = 'delivered'
+            except Exception as e:
+                outcome = 'errors'
+                print(f"Error in {sink.name} notification sink: {e}")
+            with self._lock:
+                self.stats[outcome] += 1
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything queued has been delivered (for shutdown and tests)"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if not self.queue and not self._busy:
+                    return True
+            time.sleep(0.01)
+        return False
+
+    def stop(self):
+        """Deliver what is queued, then end the worker"""
+        with self._lock:
+            self._running = False
+            self._lock.notify_all()
+        if self._worker is not None:
+            self._worker.join(timeout=5)
+
+def default_sinks(headless: bool = False) -> List[NotificationSink]:
+    """Log sink, plus the alarm and desktop notifications (when available) if not headless"""
+    sinks: List[NotificationSink] = [LogSink()]
+    if not headless:
+        sinks.append(AlarmSink())
+        desktop = DesktopSink()
+        if desktop.available:
+            sinks.append(desktop)
+    return sinks
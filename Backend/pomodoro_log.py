@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Append-only Pomodoro history
+One JSON line per finished pomodoro (task, start, end, quality), with per-task counts and
+minutes kept as running totals so nothing is rescanned after load
+"""
+
+import os
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+import json_codec
+from records import record
+
+@record(frozen=True)
+class PomodoroRecord:
+    task_id: str
+    start_time: datetime
+    end_time: datetime
+    quality: int  # 1-5 self rating
+
+    @property
+    def minutes(self) -> float:
+        return (self.end_time - self.start_time).total_seconds() / 60
+
+    def to_dict(self) -> dict:
+        return {
+            'task_id': self.task_id,
+            'start_time': self.start_time.isoformat(),
+            'end_time': self.end_time.isoformat(),
+            'quality': self.quality,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'PomodoroRecord':
+        return cls(task_id=data['task_id'],
+                   start_time=datetime.fromisoformat(data['start_time']),
+                   end_time=datetime.fromisoformat(data['end_time']),
+                   quality=int(data.get('quality', 5)))
+
+class PomodoroLog:
+    """Time series of finished pomodoros in a JSON Lines file"""
+
+    def __init__(self, log_file: Optional[str] = None):
+        self.log_file = log_file
+        self.counts: Dict[str, int] = {}
+        self.minutes: Dict[str, float] = {}
+        self.quality_sum: Dict[str, int] = {}
+        self.load()
+
+    def _account(self, entry: PomodoroRecord):
+        self.counts[entry.task_id] = self.counts.get(entry.task_id, 0) + 1
+        self.minutes[entry.task_id] = self.minutes.get(entry.task_id, 0.0) + entry.minutes
+        self.quality_sum[entry.task_id] = self.quality_sum.get(entry.task_id, 0) + entry.quality
+
+    def load(self):
+        """Rebuild the running totals from the file, one line at a time"""
+        self.counts.clear()
+        self.minutes.clear()
+        self.quality_sum.clear()
+        for entry in self:
+            self._account(entry)
+
+    def __iter__(self) -> Iterator[PomodoroRecord]:
+        if not self.log_file or not os.path.exists(self.log_file):
+            return
+        try:
+            with open(self.log_file, 'rb') as f:
+                for line in f:
+                    if line.strip():
+                        yield PomodoroRecord.from_dict(json_codec.loads(line))
+        except Exception as e:
+            print(f"Error reading pomodoro log: {e}")
+
+    def append(self, entry: PomodoroRecord):
+        """Record a finished pomodoro (one appended line, no rewrite)"""
+        self._account(entry)
+        if not self.log_file:
+            return
+        try:
+            with open(self.log_file, 'ab') as f:
+                f.write(json_codec.dumps(entry.to_dict(), pretty=False) + b'\n')
+        except Exception as e:
+            print(f"Error saving pomodoro: {e}")
+
+    def for_task(self, task_id: str) -> List[PomodoroRecord]:
+        """Full history for one task (reads the file)"""
+        return [entry for entry in self if entry.task_id == task_id]
+
+    def average_quality(self, task_id: str) -> Optional[float]:
+        count = self.counts.get(task_id)
+        return self.quality_sum[task_id] / count if count else None
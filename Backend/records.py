@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Compact record types
+Slotted, optionally frozen dataclasses for tasks, events, blocks and sessions
+"""
+
+import sys
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Type
+
+def record(cls=None, *, frozen: bool = False):
+    """Dataclass without a per-instance __dict__ (slots need Python 3.10+)"""
+    def wrap(c):
+        if sys.version_info >= (3, 10):
+            return dataclass(c, slots=True, frozen=frozen)
+        return dataclass(c, frozen=frozen)
+    return wrap if cls is None else wrap(cls)
+
+def enum_lookup(enum_cls: Type[Enum]) -> Dict[object, Enum]:
+    """Value -> member table; a dict hit is cheaper than calling the Enum constructor"""
+    return {member.value: member for member in enum_cls}
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Lazy recurrence expansion
+A recurring event is stored once, as a master with an RRULE-like rule (frequency,
+interval, until, count) and exception dates; occurrences are generated on demand and the
+generated start times are cached per master until it changes
+"""
+
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+OCCURRENCE_SEPARATOR = '@'
+_STAMP_FORMAT = '%Y%m%dT%H%M%S'
+
+def occurrence_id(master_id: str, start: datetime) -> str:
+    """Stable id of one occurrence: '<master id>@<original start>'"""
+    return f"{master_id}{OCCURRENCE_SEPARATOR}{start.strftime(_STAMP_FORMAT)}"
+
+def parse_occurrence_id(event_id: str) -> Optional[Tuple[str, datetime]]:
+    """(master id, original start) for an occurrence id, else None"""
+    master_id, sep, stamp = event_id.rpartition(OCCURRENCE_SEPARATOR)
+    if not sep:
+        return None
+    try:
+        return master_id, datetime.strptime(stamp, _STAMP_FORMAT)
+    except ValueError:
+        return None
+
+def _add_months(moment: datetime, months: int) -> Optional[datetime]:
+    """Same day and time `months` later, or None when that month has no such day"""
+    month_index = moment.month - 1 + months
+    try:
+        return moment.replace(year=moment.year + month_index // 12, month=month_index % 12 + 1)
+    except ValueError:
+        return None
+
+def iter_starts(master) -> Iterator[datetime]:
+    """Every occurrence start of a master, in order (unbounded without until/count)
+
+    Like RRULE, the master's own start is the first occurrence, COUNT includes excluded
+    dates, and monthly rules skip months that lack the day (e.g. the 31st).
+    """
+    frequency = master.recurrence.value
+    interval = max(1, master.recurrence_interval or 1)
+    until, count = master.recurrence_end, master.recurrence_count
+    step = {'daily': timedelta(days=interval), 'weekly': timedelta(weeks=interval)}.get(frequency)
+    if step is None and frequency != 'monthly':
+        return
+
+    produced = 0
+    n = 0
+    misses = 0
+    while count is None or produced < count:
+        if step is not None:
+            start = master.start_time + step * n
+        else:
+            start = _add_months(master.start_time, interval * n)
+        n += 1
+        if start is None:
+            misses += 1
+            if misses > 48:  # e.g. the 30th every 12 months from February: never valid
+                return
+            continue
+        misses = 0
+        if until is not None and start > until:
+            return
+        produced += 1
+        yield start
+
+class RecurrenceCache:
+    """Occurrence starts per master, expanded only as far as queries have reached
+
+    Safe to share between threads: the reminder thread and the UI may expand the same
+    master's generator.
+    """
+
+    def __init__(self):
+        self._expansions: Dict[str, list] = {}  # master id -> [starts, generator or None]
+        self._lock = threading.Lock()
+
+    def invalidate(self, master_id: Optional[str] = None):
+        with self._lock:
+            if master_id is None:
+                self._expansions.clear()
+            else:
+                self._expansions.pop(master_id, None)
+
+    def _expand_to(self, master, end: datetime) -> List[datetime]:
+        """The master's cached starts, extended past `end` (call with the lock held)"""
+        entry = self._expansions.get(master.id)
+        if entry is None:
+            entry = self._expansions[master.id] = [[], iter_starts(master)]
+        starts, generator = entry
+        if generator is not None and (not starts or starts[-1] <= end):
+            excluded = set(master.recurrence_exceptions or ())
+            for start in generator:
+                if start not in excluded:
+                    starts.append(start)
+                if start > end:
+                    break
+            else:
+                entry[1] = None  # rule exhausted
+        return starts
+
+    def starts_between(self, master, start: Optional[datetime], end: datetime,
+                       inclusive_end: bool = True) -> List[datetime]:
+        """Occurrence starts with start <= s <= end (or < end), exception dates removed"""
+        with self._lock:
+            starts = self._expand_to(master, end)
+            lo = bisect_left(starts, start) if start else 0
+            hi = bisect_right(starts, end) if inclusive_end else bisect_left(starts, end)
+            return starts[lo:hi]
+
+    def is_occurrence(self, master, start: datetime) -> bool:
+        return bool(self.starts_between(master, start, start))
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Event reminder scheduling
+A min-heap of pending reminders over a rolling time window; the notification thread sleeps
+until the earliest one is due. Each entry remembers the stored event it came from (the
+master, for a generated occurrence), so a change re-arms just that event. Fired reminders
+are recorded on disk so each fires once, even across restarts.
+"""
+
+import heapq
+import os
+from datetime import datetime, timedelta
+from typing import Collection, Dict, Iterable, List, Optional, Tuple
+
+import json_codec
+from records import record
+
+@record(frozen=True)
+class Reminder:
+    fire_at: datetime
+    event: object  # CalendarEvent or generated occurrence
+    minutes_before: Optional[int]  # None for the alarm at the start time
+
+    @property
+    def key(self) -> str:
+        """Identity across restarts: event, its start and which reminder"""
+        which = 'start' if self.minutes_before is None else str(self.minutes_before)
+        return f"{self.event.id}|{self.event.start_time.isoformat()}|{which}"
+
+class ReminderScheduler:
+    """Pending reminders for events starting inside the window, earliest first"""
+
+    def __init__(self, state_file: Optional[str] = None, horizon: timedelta = timedelta(days=1),
+                 start_grace: timedelta = timedelta(minutes=1),
+                 max_lead: timedelta = timedelta(days=7)):
+        self.state_file = state_file
+        self.horizon = horizon
+        self.start_grace = start_grace  # how late a start alarm may still fire
+        self.max_lead = max_lead  # longest reminder lead time looked ahead for
+        # (fire_at, sequence, source id, reminder)
+        self.heap: List[Tuple[datetime, int, str, Reminder]] = []
+        self._seq = 0
+        self.window_end: Optional[datetime] = None
+        self.fired: Dict[str, str] = {}  # reminder key -> when it fired
+        self._load_state()
+
+    def lookahead(self, now: datetime) -> Tuple[datetime, datetime]:
+        """Start-time range of the events rebuild() needs for a window opening at `now`"""
+        return now - self.start_grace, now + self.horizon + self.max_lead
+
+    def rebuild(self, events: Iterable[Tuple[str, object]], now: datetime):
+        """Replace the heap with the unfired, relevant reminders of (source id, event) pairs"""
+        self.window_end = now + self.horizon
+        self.heap = []
+        self._push(events, now)
+
+    def rearm(self, sources: Collection[str], events: Iterable[Tuple[str, object]],
+              now: datetime):
+        """Swap the reminders of the changed source ids for those of their current events
+
+        Only the heap (one window of reminders) is filtered; the calendar isn't rescanned.
+        """
+        if self.window_end is None:
+            self.rebuild(events, now)
+            return
+        self.heap = [entry for entry in self.heap if entry[2] not in sources]
+        self._push(events, now)
+
+    def _push(self, events: Iterable[Tuple[str, object]], now: datetime):
+        for source, event in events:
+            for reminder in self._reminders_for(event):
+                if reminder.fire_at <= self.window_end and self._relevant(reminder, now):
+                    self.heap.append((reminder.fire_at, self._seq, source, reminder))
+                    self._seq += 1
+        heapq.heapify(self.heap)
+
+    @staticmethod
+    def _reminders_for(event) -> Iterable[Reminder]:
+        for minutes in set(event.reminder_minutes or ()):
+            yield Reminder(event.start_time - timedelta(minutes=minutes), event, minutes)
+        yield Reminder(event.start_time, event, None)
+
+    def _relevant(self, reminder: Reminder, now: datetime) -> bool:
+        """Not yet fired, and late only as far as still makes sense"""
+        if reminder.key in self.fired:
+            return False
+        start = reminder.event.start_time
+        if reminder.minutes_before is None:
+            return start >= now - self.start_grace
+        return start > now  # a missed 'starts in N minutes' is still useful until the start
+
+    def next_wakeup(self) -> Optional[datetime]:
+        """Earliest pending reminder, or the end of the window when the heap needs refilling"""
+        if self.heap:
+            return min(self.heap[0][0], self.window_end)
+        return self.window_end
+
+    def needs_refill(self, now: datetime) -> bool:
+        return self.window_end is None or now >= self.window_end
+
+    def pop_due(self, now: datetime) -> List[Reminder]:
+        """Reminders due at `now`, each recorded as fired before it is returned"""
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            reminder = heapq.heappop(self.heap)[3]
+            if self._relevant(reminder, now):
+                self.fired[reminder.key] = now.isoformat()
+                due.append(reminder)
+        if due:
+            self._prune(now)
+            self._save_state()
+        return due
+
+    # Persistence
+
+    def _prune(self, now: datetime):
+        """Forget fired reminders for events that can no longer come back into the window"""
+        cutoff = (now - self.start_grace - timedelta(days=1)).isoformat()
+        stale = [key for key in self.fired if key.split('|')[1] < cutoff]
+        for key in stale:
+            del self.fired[key]
+
+    def _load_state(self):
+        if self.state_file and os.path.exists(self.state_file):
+            try:
+                self.fired = dict(json_codec.load_file(self.state_file).get('fired', {}))
+            except Exception as e:
+                print(f"Error loading reminder state: {e}")
+
+    def _save_state(self):
+        if not self.state_file:
+            return
+        try:
+            json_codec.dump_file(self.state_file, {'fired': self.fired})
+        except Exception as e:
+            print(f"Error saving reminder state: {e}")
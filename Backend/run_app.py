@@ -3,34 +3,31 @@
 Main runner script for the Flow State Study Companion
 """
 
+import argparse
 import sys
 import os
 
 # Add current directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+# Imported first so startup timings are measured from launch
+from startup_profiler import profiler, import_time_report
+from lazy_imports import is_available
+
 def check_dependencies():
-    """Check if required dependencies are available"""
+    """Check if required dependencies are available (without importing them)"""
     missing_deps = []
     
-    try:
-        import tkinter
-    except ImportError:
+    if not is_available("tkinter"):
         missing_deps.append("tkinter")
     
-    try:
-        import cv2
-    except ImportError:
+    if not is_available("cv2"):
         print("Warning: OpenCV (cv2) not found. Camera features will be disabled.")
     
-    try:
-        import PIL
-    except ImportError:
+    if not is_available("PIL"):
         print("Warning: PIL/Pillow not found. Image display may not work properly.")
     
-    try:
-        import numpy
-    except ImportError:
+    if not is_available("numpy"):
         missing_deps.append("numpy")
     
     if missing_deps:
@@ -43,6 +40,15 @@ def check_dependencies():
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="Flow State Study Companion")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="print startup phase timings and an import-time report")
+    parser.add_argument('--budget-ms', type=float, default=profiler.budget_ms,
+                        help="first-paint budget for the startup report")
+    args = parser.parse_args()
+    profiler.enabled = args.profile_startup
+    profiler.budget_ms = args.budget_ms
+    
     print("Flow State Study Companion")
     print("=" * 40)
     
@@ -59,10 +65,9 @@ def main():
         print("- Task Management with Priority Scheduling")
         print("- Calendar Integration")
         
-        try:
-            import cv2
+        if is_available("cv2"):
             print("- Camera-based Focus Tracking")
-        except ImportError:
+        else:
             print("- Camera features disabled (OpenCV not available)")
         
         print("\nPress Ctrl+C to exit the application.")
@@ -70,6 +75,10 @@ def main():
         
         app_main()
         
+        # After the window closes: the child interpreter must not count towards first paint
+        if args.profile_startup:
+            print(import_time_report("flow_study_app"))
+        
     except ImportError as e:
         print(f"Error importing application modules: {e}")
         print("Please ensure all Python files are in the same directory.")
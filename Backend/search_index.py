@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+In-process full-text search for tasks and calendar events
+An inverted index over title, description, notes and tags with prefix matching and tag
+filters, built in memory when the data file is loaded
+"""
+
+import re
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lower-cased word tokens"""
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+def parse_query(query: str):
+    """Split a query into word terms and '#tag' filters"""
+    terms, tags = [], []
+    for part in (query or "").split():
+        if part.startswith('#') and len(part) > 1:
+            tags.append(part[1:].lower())
+        else:
+            terms.extend(tokenize(part))
+    return terms, tags
+
+class SearchIndex:
+    """Token and tag postings for one kind of record, keyed by record id"""
+
+    FIELDS = ('title', 'description', 'notes')
+
+    def __init__(self):
+        self.postings: Dict[str, Set[str]] = {}
+        self.vocabulary: List[str] = []  # sorted tokens, for prefix ranges
+        self.tag_postings: Dict[str, Set[str]] = {}
+        self.doc_tokens: Dict[str, List[str]] = {}  # forward index, needed to remove a record
+        self.doc_tags: Dict[str, List[str]] = {}
+
+    def _tokens_for(self, record) -> List[str]:
+        tokens = set()
+        for field in self.FIELDS:
+            tokens.update(tokenize(getattr(record, field, "")))
+        for tag in record.tags or ():
+            tokens.update(tokenize(tag))
+        return sorted(tokens)
+
+    def _insert(self, doc_id: str, tokens: Iterable[str], tags: Iterable[str],
+                keep_sorted: bool = True):
+        self.doc_tokens[doc_id] = list(tokens)
+        self.doc_tags[doc_id] = list(tags)
+        for token in self.doc_tokens[doc_id]:
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = set()
+                if keep_sorted:
+                    insort(self.vocabulary, token)
+            posting.add(doc_id)
+        for tag in self.doc_tags[doc_id]:
+            self.tag_postings.setdefault(tag, set()).add(doc_id)
+
+    def add(self, record):
+        """Index a record (replacing any previous entry for its id)"""
+        self.remove(record.id)
+        self._insert(record.id, self._tokens_for(record), {t.lower() for t in record.tags or ()})
+
+    def remove(self, doc_id: str):
+        for token in self.doc_tokens.pop(doc_id, ()):
+            posting = self.postings.get(token)
+            if posting is None:
+                continue
+            posting.discard(doc_id)
+            if not posting:
+                del self.postings[token]
+                i = bisect_left(self.vocabulary, token)
+                if i < len(self.vocabulary) and self.vocabulary[i] == token:
+                    del self.vocabulary[i]
+        for tag in self.doc_tags.pop(doc_id, ()):
+            posting = self.tag_postings.get(tag)
+            if posting is not None:
+                posting.discard(doc_id)
+                if not posting:
+                    del self.tag_postings[tag]
+
+    def clear(self):
+        self.postings.clear()
+        self.vocabulary.clear()
+        self.tag_postings.clear()
+        self.doc_tokens.clear()
+        self.doc_tags.clear()
+
+    def rebuild(self, records: Iterable):
+        """Index records from scratch, sorting the vocabulary once at the end"""
+        self.clear()
+        for record in records:
+            self._insert(record.id, self._tokens_for(record),
+                         {t.lower() for t in record.tags or ()}, keep_sorted=False)
+        self.vocabulary = sorted(self.postings)
+
+    def _matching(self, term: str, prefix: bool) -> Set[str]:
+        if not prefix:
+            return self.postings.get(term, set())
+        start = bisect_left(self.vocabulary, term)
+        end = bisect_left(self.vocabulary, term + '\uffff')
+        if end - start == 1:
+            return self.postings[self.vocabulary[start]]
+        matches = set()
+        for token in self.vocabulary[start:end]:
+            matches |= self.postings[token]
+        return matches
+
+    def search(self, query: str = "", tags: Iterable[str] = (), prefix: bool = True) -> Set[str]:
+        """Ids matching every query term (as a prefix by default) and every tag
+
+        '#tag' words in the query act as tag filters. An empty query with no tags
+        matches nothing; callers show everything in that case.
+        """
+        terms, query_tags = parse_query(query)
+        tag_filters = [t.lower() for t in tags] + query_tags
+        candidates = [self._matching(term, prefix) for term in terms]
+        candidates += [self.tag_postings.get(tag, set()) for tag in tag_filters]
+        if not candidates:
+            return set()
+        candidates.sort(key=len)
+        result = set(candidates[0])
+        for other in candidates[1:]:
+            result &= other
+            if not result:
+                break
+        return result
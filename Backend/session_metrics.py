@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Incremental study session analytics
+Totals, streaks and per-day/week/hour rollups kept up to date on every added session
+"""
+
+from datetime import datetime, date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from dataclasses import dataclass
+from collections import deque
+
+@dataclass
+class Rollup:
+    """Aggregated session figures for one bucket (day, ISO week or hour of day)"""
+    focus_sessions: int = 0
+    break_sessions: int = 0
+    focus_minutes: int = 0
+    break_minutes: int = 0
+    quality_sum: int = 0
+    rated_sessions: int = 0
+
+    def add(self, session_type: str, minutes: int, quality: int):
+        if session_type == 'focus':
+            self.focus_sessions += 1
+            self.focus_minutes += minutes
+            if quality > 0:
+                self.quality_sum += quality
+                self.rated_sessions += 1
+        else:
+            self.break_sessions += 1
+            self.break_minutes += minutes
+
+    @property
+    def average_quality(self) -> float:
+        return self.quality_sum / self.rated_sessions if self.rated_sessions else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            'focus_sessions': self.focus_sessions,
+            'break_sessions': self.break_sessions,
+            'focus_minutes': self.focus_minutes,
+            'break_minutes': self.break_minutes,
+            'average_quality': round(self.average_quality, 2),
+        }
+
+class SessionMetrics:
+    """Maintains session aggregates incrementally; every read is O(1)"""
+
+    def __init__(self, recent_window: int = 20):
+        self.totals = Rollup()
+        self.by_day: Dict[date, Rollup] = {}
+        self.by_week: Dict[Tuple[int, int], Rollup] = {}  # (ISO year, ISO week)
+        self.by_hour: List[Rollup] = [Rollup() for _ in range(24)]
+
+        # Focus-day streaks
+        self.streak_end: Optional[date] = None
+        self.streak_length = 0
+        self.longest_streak = 0
+
+        # Quality of the most recent focus sessions, for trend reporting
+        self.recent_quality = deque(maxlen=recent_window)
+        self._recent_sum = 0
+
+    @classmethod
+    def from_sessions(cls, sessions: Iterable[dict]) -> 'SessionMetrics':
+        """Build metrics from stored sessions (one pass at load time)"""
+        metrics = cls()
+        for session in sorted(sessions, key=lambda s: str(s.get('start_time', ''))):
+            metrics.add_session(session)
+        return metrics
+
+    def add_session(self, session: dict):
+        """Fold one session (stored dict form) into every rollup"""
+        start = session.get('start_time')
+        if not start:
+            return
+        if isinstance(start, str):
+            start = datetime.fromisoformat(start)
+        session_type = session.get('session_type', 'focus')
+        minutes = int(session.get('duration') or 0)
+        quality = int(session.get('quality_rating') or 0)
+
+        day = start.date()
+        self.totals.add(session_type, minutes, quality)
+        self._bucket(self.by_day, day).add(session_type, minutes, quality)
+        self._bucket(self.by_week, day.isocalendar()[:2]).add(session_type, minutes, quality)
+        self._add_to_hours(start, session_type, minutes, quality)
+
+        if session_type == 'focus':
+            self._extend_streak(day)
+            if quality > 0:
+                if len(self.recent_quality) == self.recent_quality.maxlen:
+                    self._recent_sum -= self.recent_quality[0]
+                self.recent_quality.append(quality)
+                self._recent_sum += quality
+
+    @staticmethod
+    def _bucket(rollups: dict, key) -> Rollup:
+        rollup = rollups.get(key)
+        if rollup is None:
+            rollup = rollups[key] = Rollup()
+        return rollup
+
+    def _add_to_hours(self, start: datetime, session_type: str, minutes: int, quality: int):
+        """Count the session in its start hour and spread its minutes over the hours it spans"""
+        self.by_hour[start.hour].add(session_type, 0, quality)
+        cursor = start
+        remaining = minutes
+        while remaining > 0:
+            in_this_hour = min(remaining, 60 - cursor.minute)
+            hour = self.by_hour[cursor.hour]
+            if session_type == 'focus':
+                hour.focus_minutes += in_this_hour
+            else:
+                hour.break_minutes += in_this_hour
+            remaining -= in_this_hour
+            cursor = (cursor + timedelta(minutes=in_this_hour)).replace(second=0, microsecond=0)
+
+    def _extend_streak(self, day: date):
+        if self.streak_end is None:
+            self.streak_length = 1
+            self.streak_end = day
+        elif day == self.streak_end + timedelta(days=1):
+            self.streak_length += 1
+            self.streak_end = day
+        elif day > self.streak_end:
+            self.streak_length = 1
+            self.streak_end = day
+        elif day < self.streak_end and self.by_day[day].focus_sessions == 1:
+            # A new focus day back-filled into history can join runs; recount
+            self._recount_streaks()
+        self.longest_streak = max(self.longest_streak, self.streak_length)
+
+    def _recount_streaks(self):
+        focus_days = sorted(d for d, r in self.by_day.items() if r.focus_sessions)
+        self.longest_streak = 0
+        length = 0
+        previous = None
+        for day in focus_days:
+            length = length + 1 if previous and day == previous + timedelta(days=1) else 1
+            self.longest_streak = max(self.longest_streak, length)
+            previous = day
+        self.streak_end = previous
+        self.streak_length = length
+
+    def current_streak(self, today: Optional[date] = None) -> int:
+        """Consecutive focus days ending today (or yesterday, if today has none yet)"""
+        today = today or date.today()
+        if self.streak_end is None or self.streak_end < today - timedelta(days=1):
+            return 0
+        return self.streak_length
+
+    def quality_trend(self) -> float:
+        """Recent average focus quality minus the all-time average (positive = improving)"""
+        if not self.recent_quality:
+            return 0.0
+        return self._recent_sum / len(self.recent_quality) - self.totals.average_quality
+
+    def day(self, target_date: date) -> Rollup:
+        return self.by_day.get(target_date) or Rollup()
+
+    def week(self, target_date: date) -> Rollup:
+        return self.by_week.get(target_date.isocalendar()[:2]) or Rollup()
+
+    def hour_profile(self) -> List[dict]:
+        """Per-hour-of-day focus minutes, session counts and quality"""
+        return [dict(hour=h, **r.to_dict()) for h, r in enumerate(self.by_hour)]
+
+    def summary(self, today: Optional[date] = None) -> dict:
+        """Dashboard figures read straight from the rollups"""
+        today = today or date.today()
+        return {
+            'total_focus_minutes': self.totals.focus_minutes,
+            'total_break_minutes': self.totals.break_minutes,
+            'focus_sessions': self.totals.focus_sessions,
+            'break_sessions': self.totals.break_sessions,
+            'average_quality': round(self.totals.average_quality, 2),
+            'quality_trend': round(self.quality_trend(), 2),
+            'current_streak': self.current_streak(today),
+            'longest_streak': self.longest_streak,
+            'today': self.day(today).to_dict(),
+            'this_week': self.week(today).to_dict(),
+        }
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Startup profiler for the Flow State Study Companion
+Records named phases from launch to first paint and summarises import costs
+"""
+
+import os
+import subprocess
+import sys
+import time
+from typing import List, Optional, Tuple
+
+import lazy_imports
+
+# Reference point for all marks; import this module as early as possible
+_PROCESS_START = time.perf_counter()
+
+FIRST_PAINT_BUDGET_MS = 500.0
+
+class StartupProfiler:
+    """Collects startup phase timings and renders a report"""
+
+    def __init__(self, budget_ms: float = FIRST_PAINT_BUDGET_MS):
+        self.start = _PROCESS_START
+        self.budget_ms = budget_ms
+        self.enabled = False
+        self.marks: List[Tuple[str, float]] = []  # (label, seconds since start)
+
+    def mark(self, label: str):
+        """Record that a startup phase finished now"""
+        self.marks.append((label, time.perf_counter() - self.start))
+
+    def elapsed_ms(self, label: str) -> Optional[float]:
+        """Milliseconds from launch to the first mark with this label"""
+        for name, seconds in self.marks:
+            if name == label:
+                return seconds * 1000
+        return None
+
+    def report(self) -> str:
+        """Phase timings, lazily loaded modules and the first-paint verdict"""
+        lines = ["Startup profile", "-" * 40]
+        previous = 0.0
+        for label, seconds in self.marks:
+            lines.append(f"{label:<24} {seconds * 1000:8.1f} ms  (+{(seconds - previous) * 1000:.1f})")
+            previous = seconds
+
+        if lazy_imports.load_times:
+            lines.append("Deferred imports (loaded on demand):")
+            for name, seconds in sorted(lazy_imports.load_times.items(), key=lambda x: -x[1]):
+                lines.append(f"  {name:<22} {seconds * 1000:8.1f} ms")
+
+        first_paint = self.elapsed_ms('first_paint')
+        if first_paint is not None:
+            verdict = "OK" if first_paint <= self.budget_ms else "OVER BUDGET"
+            lines.append(f"First paint {first_paint:.1f} ms / budget {self.budget_ms:.0f} ms: {verdict}")
+        return "\n".join(lines)
+
+def import_time_report(module: str, top: int = 10) -> str:
+    """Top modules by cumulative import time, measured in a fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header line
+        entries.append((int(parts[1]), int(parts[0]), parts[2].rstrip()))
+
+    entries.sort(reverse=True)
+    lines = [f"Import time for {module} (cumulative / self, top {top})", "-" * 40]
+    for cumulative, self_us, name in entries[:top]:
+        lines.append(f"{cumulative / 1000:8.1f} ms {self_us / 1000:8.1f} ms  {name}")
+    if result.returncode != 0:
+        lines.append(f"(import failed: {result.stderr.strip().splitlines()[-1]})")
+    return "\n".join(lines)
+
+# Shared instance used by run_app and flow_study_app
+profiler = StartupProfiler()
@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+Command line interface for the headless study engine
+Manage tasks and events, run timer cycles, or start the engine as a daemon
+"""
+
+import argparse
+import os
+import signal
+import sys
+import threading
+from datetime import datetime, timedelta
+from queue import Queue, Empty
+
+# Add current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from study_core import StudyEngine
+from todo_manager import Priority, TaskStatus, TaskCategory
+from calendar_manager import EventType
+from free_busy import WorkingHours
+from notifications import WebSocketBroadcaster, WebSocketSink
+
+def _parse_datetime(value: str) -> datetime:
+    """Parse 'YYYY-MM-DD' or 'YYYY-MM-DD HH:MM'"""
+    for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"invalid date/time: {value!r}")
+
+def _find_task(engine: StudyEngine, task_id: str):
+    """Resolve a full task id or a unique prefix"""
+    task = engine.task_manager.get_task(task_id)
+    if task:
+        return task
+    matches = [t for t in engine.task_manager.tasks.values() if t.id.startswith(task_id)]
+    return matches[0] if len(matches) == 1 else None
+
+def cmd_tasks(engine: StudyEngine, args) -> int:
+    status = TaskStatus(args.status) if args.status else None
+    tasks = engine.task_manager.get_tasks(status=status)
+    for task in tasks:
+        due = task.due_date.strftime('%Y-%m-%d %H:%M') if task.due_date else '-'
+        print(f"{task.id[:8]}  {task.priority.name:<6}  {task.status.value:<11}  "
+              f"{task.estimated_time:>4} min  due {due:<16}  {task.title}")
+    print(f"{len(tasks)} task(s)")
+    return 0
+
+def cmd_add_task(engine: StudyEngine, args) -> int:
+    task = engine.task_manager.create_task(
+        args.title,
+        description=args.description,
+        priority=Priority[args.priority.upper()],
+        category=TaskCategory[args.category.upper()],
+        estimated_time=args.minutes,
+        due_date=args.due,
+        tags=args.tag or []
+    )
+    print(f"Created task {task.id}")
+    return 0
+
+def cmd_complete_task(engine: StudyEngine, args) -> int:
+    task = _find_task(engine, args.task_id)
+    if not task:
+        print(f"Error: no unique task matches {args.task_id!r}")
+        return 1
+    engine.task_manager.complete_task(task.id, args.actual)
+    print(f"Completed task {task.id}: {task.title}")
+    return 0
+
+def cmd_suggest(engine: StudyEngine, args) -> int:
+    suggestion = engine.task_manager.suggest_next_task(args.energy, args.focus, args.time)
+    if not suggestion:
+        print("No suitable task found")
+        return 0
+    task, score = suggestion
+    print(f"Suggested task: {task.title} (Score: {score:.2f}, id {task.id[:8]})")
+    return 0
+
+def cmd_search(engine: StudyEngine, args) -> int:
+    query = " ".join(args.query)
+    tasks = engine.task_manager.search_tasks(query, args.tag or [])
+    events = engine.calendar_manager.search_events(query, args.tag or [])
+    for task in tasks:
+        print(f"task   {task.id[:8]}  {task.status.value:<11}  {task.title}")
+    for event in events:
+        print(f"event  {event.id[:8]}  {event.start_time.strftime('%Y-%m-%d %H:%M')}  {event.title}")
+    print(f"{len(tasks)} task(s), {len(events)} event(s)")
+    return 0
+
+def cmd_plan(engine: StudyEngine, args) -> int:
+    start = (args.start or datetime.now()).date()
+    plan = engine.plan_study(start, start + timedelta(days=args.days - 1), args.budget_ms)
+    for session in plan.sessions:
+        print(f"{session.start_time.strftime('%Y-%m-%d %H:%M')}-{session.end_time.strftime('%H:%M')}  "
+              f"E{session.energy_level} F{session.focus_level}  {session.task_id[:8]}  {session.title}")
+    for task_id, minutes in plan.unscheduled.items():
+        print(f"unscheduled: {task_id[:8]} ({minutes} min)")
+    print(f"{len(plan.sessions)} session(s) planned in {plan.elapsed_ms:.1f} ms")
+    if args.commit:
+        engine.calendar_manager.add_events(plan.to_events())
+        print("Plan added to the calendar")
+    return 0
+
+def _progress(count: int):
+    print(f"  {count} task(s)...", end="\r", flush=True)
+
+def cmd_import_tasks(engine: StudyEngine, args) -> int:
+    try:
+        count = engine.task_manager.import_tasks(args.file, args.format, not args.skip_existing,
+                                                 progress=_progress)
+    except ValueError as e:
+        print(e)
+        return 1
+    print(f"Imported {count} task(s) from {args.file}")
+    return 0
+
+def cmd_export_tasks(engine: StudyEngine, args) -> int:
+    try:
+        count = engine.task_manager.export_tasks(args.file, args.format, progress=_progress)
+    except ValueError as e:
+        print(e)
+        return 1
+    print(f"Exported {count} task(s) to {args.file}")
+    return 0
+
+def _event_progress(count: int):
+    print(f"  {count} event(s)...", end="\r", flush=True)
+
+def cmd_import_events(engine: StudyEngine, args) -> int:
+    count = engine.calendar_manager.import_calendar(args.file, not args.skip_existing,
+                                                    progress=_event_progress)
+    print(f"Imported {count} event(s) from {args.file}")
+    return 0
+
+def cmd_export_events(engine: StudyEngine, args) -> int:
+    start = args.start.date() if args.start else None
+    end = args.end.date() if args.end else None
+    if not engine.calendar_manager.export_calendar(args.file, start, end, progress=_event_progress):
+        return 1
+    print(f"Exported events to {args.file}")
+    return 0
+
+def cmd_events(engine: StudyEngine, args) -> int:
+    events = engine.calendar_manager.get_upcoming_events(days=args.days)
+    for event in events:
+        print(f"{event.start_time.strftime('%Y-%m-%d %H:%M')}-{event.end_time.strftime('%H:%M')}  "
+              f"{event.event_type.value:<14}  {event.title}")
+    print(f"{len(events)} event(s) in the next {args.days} day(s)")
+    return 0
+
+def cmd_free(engine: StudyEngine, args) -> int:
+    start = args.start or datetime.now()
+    hours = WorkingHours.daily(args.hours[0], args.hours[1], range(5) if args.weekdays else range(7))
+    found = engine.calendar_manager.find_free_slots(args.minutes, start, start + timedelta(days=args.days),
+                                                    count=args.count, working_hours=hours)
+    for slot_start, slot_end in found:
+        print(f"{slot_start.strftime('%a %Y-%m-%d %H:%M')}-{slot_end.strftime('%H:%M')}")
+    print(f"{len(found)} free slot(s) of {args.minutes} min")
+    return 0
+
+def cmd_add_event(engine: StudyEngine, args) -> int:
+    event = engine.calendar_manager.create_event(
+        title=args.title,
+        start_time=args.start,
+        end_time=args.start + timedelta(minutes=args.minutes),
+        event_type=EventType(args.type),
+        description=args.description
+    )
+    print(f"Created event {event.id}")
+    return 0
+
+def cmd_stats(engine: StudyEngine, args) -> int:
+    print("Tasks:")
+    for key, value in engine.task_manager.get_task_statistics().items():
+        print(f"  {key}: {value:.2f}" if isinstance(value, float) else f"  {key}: {value}")
+    print("Calendar:")
+    for key, value in engine.calendar_manager.get_calendar_statistics().items():
+        print(f"  {key}: {value}")
+    print("Sessions:")
+    for key, value in engine.data_manager.metrics.summary().items():
+        print(f"  {key}: {value}")
+    if args.weeks:
+        today = datetime.now().date()
+        print("Weekly trend:")
+        for row in engine.calendar_manager.get_weekly_trend(today - timedelta(weeks=args.weeks - 1), today):
+            print(f"  {row['year']}-W{row['week']:02d}: {row['count']} event(s), {row['hours']:.1f} h, "
+                  f"{row['completed']} completed")
+    if args.diagnostics:
+        print("Diagnostics:")
+        for key, value in engine.calendar_manager.get_diagnostics().items():
+            print(f"  {key}: {value}")
+    return 0
+
+def cmd_patterns(engine: StudyEngine, args) -> int:
+    patterns = engine.patterns
+    print(f"Learned from {patterns.sessions} focus session(s)")
+    for row in patterns.hour_curve():
+        if row['observed_hours'] or row['hour'] in patterns.prior:
+            print(f"  {row['hour']:02d}:00  energy {row['energy']:.1f}  focus {row['focus']:.1f}"
+                  f"  ({row['observed_hours']:.1f} h observed)")
+    return 0
+
+def _run_cycles(engine: StudyEngine, cycles: int, stop_event: threading.Event,
+                task_id=None, verbose: bool = False):
+    """Run focus/break phases back to back until `cycles` focus phases complete"""
+    completions = Queue()
+
+    def on_timer_event(event_type, data):
+        if event_type == 'complete':
+            completions.put(data)
+        elif verbose and event_type == 'tick' and data % 60 == 0:
+            print(f"  {engine.timer.get_formatted_time()} left")
+
+    def on_engine_event(event_type, data):
+        if event_type == 'session_started':
+            print(f"[{datetime.now():%H:%M:%S}] {data.session_type} session started ({data.id})")
+        elif event_type == 'session_ended':
+            print(f"[{datetime.now():%H:%M:%S}] {data.session_type} session ended "
+                  f"({data.duration} min)")
+        elif event_type == 'focus_lost':
+            print(f"[{datetime.now():%H:%M:%S}] focus lost - timer paused")
+
+    engine.timer.add_callback(on_timer_event)
+    engine.add_listener(on_engine_event)
+    engine.start_timer(task_id)
+
+    while not stop_event.is_set():
+        try:
+            completions.get(timeout=0.5)
+        except Empty:
+            continue
+        # Let the timer thread finish switching modes before the next phase
+        if engine.timer.timer_thread:
+            engine.timer.timer_thread.join()
+        if cycles and engine.timer.completed_cycles >= cycles:
+            break
+        engine.start_timer(task_id)
+
+def cmd_timer(engine: StudyEngine, args) -> int:
+    stop_event = threading.Event()
+    try:
+        _run_cycles(engine, args.cycles, stop_event, args.task, verbose=True)
+    except KeyboardInterrupt:
+        print("\nTimer stopped by user.")
+    return 0
+
+def cmd_daemon(engine: StudyEngine, args) -> int:
+    stop_event = threading.Event()
+
+    def handle_signal(signum, frame):
+        print(f"Received signal {signum}, shutting down...")
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    if args.pidfile:
+        with open(args.pidfile, 'w') as f:
+            f.write(str(os.getpid()))
+
+    broadcaster = None
+    if args.ws_port:
+        broadcaster = WebSocketBroadcaster(port=args.ws_port)
+        if broadcaster.start():
+            dispatcher = engine.calendar_manager.notification_system.dispatcher
+            dispatcher.add_sink(WebSocketSink(broadcaster.broadcast))
+            print(f"Notifications broadcast on ws://localhost:{args.ws_port}")
+
+    print(f"Study engine daemon running (pid {os.getpid()}), data dir: {engine.data_dir or '.'}")
+    try:
+        _run_cycles(engine, args.cycles, stop_event, args.task)
+    finally:
+        if broadcaster is not None:
+            broadcaster.stop()
+        if args.pidfile and os.path.exists(args.pidfile):
+            os.remove(args.pidfile)
+    return 0
+
+def cmd_bench(engine: StudyEngine, args) -> int:
+    import benchmarks
+    return benchmarks.main(args.names)
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Flow State Study Companion (headless)")
+    parser.add_argument('--data-dir', default='', help="directory holding tasks/calendar/session files")
+    parser.add_argument('--work', type=int, default=25, help="focus duration in minutes")
+    parser.add_argument('--break', dest='break_', type=int, default=5, help="break duration in minutes")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('tasks', help="list tasks")
+    p.add_argument('--status', choices=[s.value for s in TaskStatus])
+    p.set_defaults(func=cmd_tasks)
+
+    p = sub.add_parser('add-task', help="create a task")
+    p.add_argument('title')
+    p.add_argument('--description', default="")
+    p.add_argument('--priority', default='MEDIUM', choices=[p.name.lower() for p in Priority] + [p.name for p in Priority])
+    p.add_argument('--category', default='STUDY', choices=[c.name.lower() for c in TaskCategory] + [c.name for c in TaskCategory])
+    p.add_argument('--minutes', type=int, default=25, help="estimated time")
+    p.add_argument('--due', type=_parse_datetime)
+    p.add_argument('--tag', action='append')
+    p.set_defaults(func=cmd_add_task)
+
+    p = sub.add_parser('complete-task', help="mark a task as completed")
+    p.add_argument('task_id', help="task id or unique prefix")
+    p.add_argument('--actual', type=int, help="actual minutes spent")
+    p.set_defaults(func=cmd_complete_task)
+
+    p = sub.add_parser('suggest', help="suggest the next task")
+    p.add_argument('--energy', type=int, help="1-5 (default: learned level for this hour)")
+    p.add_argument('--focus', type=int, help="1-5 (default: learned level for this hour)")
+    p.add_argument('--time', type=int, default=25, help="available minutes")
+    p.set_defaults(func=cmd_suggest)
+
+    p = sub.add_parser('search', help="search tasks and events by words, prefixes and tags")
+    p.add_argument('query', nargs='*', help="words to match; '#tag' filters by tag")
+    p.add_argument('--tag', action='append')
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser('plan', help="plan pending tasks into free study blocks")
+    p.add_argument('--start', type=_parse_datetime, help="first day (default: today)")
+    p.add_argument('--days', type=int, default=7)
+    p.add_argument('--budget-ms', type=float, default=250.0, help="latency budget for the planner")
+    p.add_argument('--commit', action='store_true', help="add the planned sessions to the calendar")
+    p.set_defaults(func=cmd_plan)
+
+    p = sub.add_parser('import-tasks', help="import tasks from a .jsonl, .csv or .ics file")
+    p.add_argument('file')
+    p.add_argument('--format', choices=['jsonl', 'csv', 'ics'], help="default: from the extension")
+    p.add_argument('--skip-existing', action='store_true', help="keep tasks whose id already exists")
+    p.set_defaults(func=cmd_import_tasks)
+
+    p = sub.add_parser('export-tasks', help="export tasks to a .json, .jsonl, .csv or .ics file")
+    p.add_argument('file')
+    p.add_argument('--format', help="default: from the extension")
+    p.set_defaults(func=cmd_export_tasks)
+
+    p = sub.add_parser('import-events', help="import calendar events from an .ics file")
+    p.add_argument('file')
+    p.add_argument('--skip-existing', action='store_true', help="keep events whose UID already exists")
+    p.set_defaults(func=cmd_import_events)
+
+    p = sub.add_parser('export-events', help="export calendar events to an .ics file")
+    p.add_argument('file')
+    p.add_argument('--start', type=_parse_datetime, help="first day (default: everything)")
+    p.add_argument('--end', type=_parse_datetime, help="last day")
+    p.set_defaults(func=cmd_export_events)
+
+    p = sub.add_parser('events', help="list upcoming events")
+    p.add_argument('--days', type=int, default=7)
+    p.set_defaults(func=cmd_events)
+
+    p = sub.add_parser('patterns', help="show the learned hourly energy and focus curve")
+    p.set_defaults(func=cmd_patterns)
+
+    p = sub.add_parser('free', help="find the first free slots of a given length")
+    p.add_argument('--minutes', type=int, default=60)
+    p.add_argument('--count', type=int, default=5)
+    p.add_argument('--start', type=_parse_datetime, help="default: now")
+    p.add_argument('--days', type=int, default=90, help="how far ahead to look")
+    p.add_argument('--hours', type=int, nargs=2, default=(8, 20), metavar=('FROM', 'TO'),
+                   help="working hours (default: 8 20)")
+    p.add_argument('--weekdays', action='store_true', help="Monday to Friday only")
+    p.set_defaults(func=cmd_free)
+
+    p = sub.add_parser('add-event', help="create a calendar event")
+    p.add_argument('title')
+    p.add_argument('--start', type=_parse_datetime, required=True, help="YYYY-MM-DD HH:MM")
+    p.add_argument('--minutes', type=int, default=60)
+    p.add_argument('--type', default=EventType.STUDY_SESSION.value, choices=[t.value for t in EventType])
+    p.add_argument('--description', default="")
+    p.set_defaults(func=cmd_add_event)
+
+    p = sub.add_parser('stats', help="show task, calendar and session statistics")
+    p.add_argument('--diagnostics', action='store_true', help="also show cache and notification counters")
+    p.add_argument('--weeks', type=int, default=0, help="also show per-week totals for the last N weeks")
+    p.set_defaults(func=cmd_stats)
+
+    for name, func, help_text in (('timer', cmd_timer, "run pomodoro cycles in the foreground"),
+                                  ('daemon', cmd_daemon, "run the engine with reminders until signalled")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument('--cycles', type=int, default=1 if name == 'timer' else 0,
+                       help="stop after N focus cycles (0 = run forever)")
+        p.add_argument('--task', help="task id to attach sessions to")
+        if name == 'daemon':
+            p.add_argument('--pidfile')
+            p.add_argument('--ws-port', type=int, default=0,
+                           help="also broadcast notifications over WebSocket on this port")
+        p.set_defaults(func=func)
+
+    p = sub.add_parser('bench', help="run engine benchmarks")
+    p.add_argument('names', nargs='*', help="benchmark names (default: all)")
+    p.set_defaults(func=cmd_bench)
+
+    return parser
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == 'bench':
+        return args.func(None, args)
+
+    long_running = args.command in ('timer', 'daemon')
+    engine = StudyEngine(
+        data_dir=args.data_dir,
+        work_duration=args.work,
+        break_duration=args.break_,
+        enable_notifications=args.command == 'daemon',
+        auto_sessions=long_running,
+        headless=True
+    )
+    try:
+        return args.func(engine, args)
+    finally:
+        engine.shutdown()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Headless core for the Flow State Study Companion
+Timer, sessions, tasks, calendar and focus tracking without Tk, OpenCV or Windows modules
+"""
+
+import os
+from datetime import date, datetime
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+from records import record
+import json_codec
+from todo_manager import TaskManager
+from calendar_manager import CalendarManager
+from session_metrics import SessionMetrics
+from flow_patterns import FlowPatternModel
+
+@record
+class StudySession:
+    id: str
+    task_id: Optional[str]
+    start_time: datetime
+    end_time: Optional[datetime]
+    duration: int  # in minutes
+    session_type: str  # 'focus' or 'break'
+    quality_rating: int  # 1-5
+    notes: str = ""
+    snapshots: List[str] = None
+    focus_score: Optional[float] = None  # mean camera focus score (0-1), if tracked
+
+    def __post_init__(self):
+        if self.snapshots is None:
+            self.snapshots = []
+
+def session_to_dict(session: StudySession) -> dict:
+    """Convert session to dictionary for JSON serialization (lists are shared, not copied)"""
+    return {
+        'id': session.id,
+        'task_id': session.task_id,
+        'start_time': session.start_time.isoformat(),
+        'end_time': session.end_time.isoformat() if session.end_time else None,
+        'duration': session.duration,
+        'session_type': session.session_type,
+        'quality_rating': session.quality_rating,
+        'notes': session.notes,
+        'snapshots': session.snapshots,
+        'focus_score': session.focus_score,
+    }
+
+def session_from_dict(data: dict) -> StudySession:
+    """Convert dictionary to session object"""
+    end_time = data.get('end_time')
+    return StudySession(
+        id=data['id'],
+        task_id=data.get('task_id'),
+        start_time=datetime.fromisoformat(data['start_time']),
+        end_time=datetime.fromisoformat(end_time) if end_time else None,
+        duration=data.get('duration', 0),
+        session_type=data.get('session_type', 'focus'),
+        quality_rating=data.get('quality_rating', 0),
+        notes=data.get('notes', ""),
+        snapshots=data.get('snapshots'),
+        focus_score=data.get('focus_score'),
+    )
+
+class FlowStateTimer:
+    """Pomodoro timer with flow state optimization"""
+
+    def __init__(self, work_duration=25, break_duration=5):
+        self.work_duration = work_duration * 60  # Convert to seconds
+        self.break_duration = break_duration * 60
+        self.current_duration = self.work_duration
+        self.time_left = self.current_duration
+        self.is_running = False
+        self.is_break = False
+        self.completed_cycles = 0
+        self.timer_thread = None
+        self.callbacks = []
+
+    def add_callback(self, callback):
+        """Add callback function to be called on timer events"""
+        self.callbacks.append(callback)
+
+    def start(self):
+        """Start the timer"""
+        if not self.is_running:
+            self.is_running = True
+            self.timer_thread = threading.Thread(target=self._run_timer)
+            self.timer_thread.daemon = True
+            self.timer_thread.start()
+
+    def pause(self):
+        """Pause the timer"""
+        self.is_running = False
+
+    def reset(self):
+        """Reset the timer"""
+        self.is_running = False
+        self.time_left = self.current_duration
+
+    def switch_mode(self):
+        """Switch between work and break mode"""
+        self.is_break = not self.is_break
+        self.current_duration = self.break_duration if self.is_break else self.work_duration
+        self.time_left = self.current_duration
+        self.is_running = False
+
+    def _run_timer(self):
+        """Internal timer loop"""
+        while self.is_running and self.time_left > 0:
+            time.sleep(1)
+            if self.is_running:
+                self.time_left -= 1
+                for callback in self.callbacks:
+                    try:
+                        callback('tick', self.time_left)
+                    except Exception as e:
+                        print(f"Error in timer callback: {e}")
+
+        if self.time_left <= 0:
+            if not self.is_break:
+                self.completed_cycles += 1
+
+            for callback in self.callbacks:
+                try:
+                    callback('complete', self.is_break)
+                except Exception as e:
+                    print(f"Error in timer callback: {e}")
+
+            # Auto-switch mode
+            self.switch_mode()
+
+    def get_formatted_time(self):
+        """Get formatted time string"""
+        minutes = self.time_left // 60
+        seconds = self.time_left % 60
+        return f"{minutes:02d}:{seconds:02d}"
+
+    def get_progress(self):
+        """Get progress percentage"""
+        elapsed = self.current_duration - self.time_left
+        return (elapsed / self.current_duration) * 100
+
+class DataManager:
+    """Manages data persistence"""
+
+    def __init__(self, data_file="study_data.json"):
+        self.data_file = data_file
+        self.data = {
+            'sessions': [],
+            'settings': {}
+        }
+        self.load_data()
+        # Rollups are built once here and then updated per added session
+        self.metrics = SessionMetrics.from_sessions(self.data['sessions'])
+
+    def load_data(self):
+        """Load data from file"""
+        try:
+            if os.path.exists(self.data_file):
+                self.data.update(json_codec.load_file(self.data_file))
+        except Exception as e:
+            print(f"Error loading data: {e}")
+
+    def save_data(self, pretty: Optional[bool] = None):
+        """Save data to file (the codec encodes any datetimes left in the dicts)"""
+        try:
+            json_codec.dump_file(self.data_file, self.data, pretty)
+        except Exception as e:
+            print(f"Error saving data: {e}")
+
+    def add_session(self, session: StudySession):
+        """Add a new session"""
+        session_dict = session_to_dict(session)
+        self.data['sessions'].append(session_dict)
+        self.metrics.add_session(session_dict)
+        self.save_data()
+
+class FocusTracker:
+    """Tracks focus scores over a sliding window and reports sustained focus loss"""
+
+    def __init__(self, attention_threshold: float = 0.7, unfocused_threshold: int = 60,
+                 history_size: int = 30):
+        self.focus_history = []
+        self.history_size = history_size  # Keep last N frames for faster response
+        self.attention_threshold = attention_threshold
+
+        # Focus monitoring for timer control
+        self.unfocused_frames = 0
+        self.unfocused_threshold = unfocused_threshold  # frames before considering user unfocused
+        self.focus_callbacks = []  # callbacks for focus state changes
+
+    def add_focus_callback(self, callback):
+        """Add callback for focus state changes"""
+        self.focus_callbacks.append(callback)
+
+    def update(self, focus_score: float) -> Tuple[float, bool]:
+        """Record a focus score and return (average focus, is_focused)"""
+        self.focus_history.append(focus_score)
+        if len(self.focus_history) > self.history_size:
+            self.focus_history.pop(0)
+
+        avg_focus = sum(self.focus_history) / len(self.focus_history)
+        is_focused = avg_focus > self.attention_threshold
+        return avg_focus, is_focused
+
+    def check_focus_status(self, is_focused: bool):
+        """Check focus status and trigger callbacks if needed"""
+        if not is_focused:
+            self.unfocused_frames += 1
+            # Print debug info to help troubleshoot
+            if self.unfocused_frames % 10 == 0:  # Print every 10 unfocused frames
+                print(f"User unfocused for {self.unfocused_frames} frames (threshold: {self.unfocused_threshold})")
+
+            if self.unfocused_frames >= self.unfocused_threshold:
+                # User has been unfocused for too long
+                print("Focus lost threshold reached - triggering callbacks")
+                for callback in self.focus_callbacks:
+                    try:
+                        callback('focus_lost')
+                    except Exception as e:
+                        print(f"Error in focus callback: {e}")
+                self.unfocused_frames = 0  # Reset counter
+        else:
+            if self.unfocused_frames > 0:
+                print(f"User refocused after {self.unfocused_frames} unfocused frames")
+            self.unfocused_frames = 0  # Reset if user is focused
+
+class StudyEngine:
+    """Headless study engine tying timer, sessions, tasks, calendar and focus together"""
+
+    def __init__(self, data_dir: Optional[str] = None, work_duration: int = 25,
+                 break_duration: int = 5, enable_notifications: bool = True,
+                 auto_sessions: bool = False, headless: bool = False):
+        data_dir = data_dir or ""
+        self.data_dir = data_dir
+        self.timer = FlowStateTimer(work_duration, break_duration)
+        self.data_manager = DataManager(os.path.join(data_dir, "study_data.json"))
+        self.task_manager = TaskManager(os.path.join(data_dir, "tasks.json"))
+        self.calendar_manager = CalendarManager(os.path.join(data_dir, "calendar.json"),
+                                                enable_notifications=enable_notifications,
+                                                headless=headless)
+        self.focus_tracker = FocusTracker()
+        self.current_session: Optional[StudySession] = None
+        self.listeners: List[Callable] = []
+        self._focus_sum = 0.0  # focus scores seen during the current session
+        self._focus_samples = 0
+
+        # Energy/focus curves learned from past sessions, read by both optimizers
+        self.patterns = FlowPatternModel.from_sessions(
+            self.data_manager.data['sessions'], self.calendar_manager.optimizer.daily_patterns,
+            work_duration)
+        self.task_manager.optimizer.pattern_model = self.patterns
+        self.calendar_manager.optimizer.pattern_model = self.patterns
+
+        # With auto_sessions the engine opens/closes sessions from timer and focus
+        # events itself; a GUI that drives sessions explicitly leaves it off
+        self.auto_sessions = auto_sessions
+        if auto_sessions:
+            self.timer.add_callback(self._on_timer_event)
+            self.focus_tracker.add_focus_callback(self._on_focus_event)
+
+    def add_listener(self, callback: Callable):
+        """Add callback(event_type, data) for session, timer and focus events"""
+        self.listeners.append(callback)
+
+    def _emit(self, event_type: str, data=None):
+        for callback in self.listeners:
+            try:
+                callback(event_type, data)
+            except Exception as e:
+                print(f"Error in engine listener: {e}")
+
+    def start_session(self, task_id: Optional[str] = None) -> StudySession:
+        """Start a new study session for the current timer mode"""
+        if self.current_session:
+            self.end_session()
+
+        now = datetime.now()
+        self.current_session = StudySession(
+            id=f"session_{now.strftime('%Y%m%d_%H%M%S')}",
+            task_id=task_id,
+            start_time=now,
+            end_time=None,
+            duration=0,
+            session_type='focus' if not self.timer.is_break else 'break',
+            quality_rating=0
+        )
+        self._focus_sum = 0.0
+        self._focus_samples = 0
+        self._emit('session_started', self.current_session)
+        return self.current_session
+
+    def end_session(self, quality_rating: Optional[int] = None) -> Optional[StudySession]:
+        """End and persist the current study session"""
+        session = self.current_session
+        if not session:
+            return None
+
+        session.end_time = datetime.now()
+        duration_seconds = (session.end_time - session.start_time).total_seconds()
+        session.duration = int(duration_seconds / 60)
+
+        # Simple quality rating (could be enhanced with user input)
+        if quality_rating is None:
+            quality_rating = 4 if session.session_type == 'focus' else 3
+        session.quality_rating = quality_rating
+        if self._focus_samples:
+            session.focus_score = round(self._focus_sum / self._focus_samples, 3)
+
+        self.data_manager.add_session(session)
+        self.patterns.add_session(session_to_dict(session))
+        self.current_session = None
+        self._emit('session_ended', session)
+        return session
+
+    def start_timer(self, task_id: Optional[str] = None):
+        """Start the timer, opening a session when auto_sessions is on"""
+        if self.timer.is_running:
+            return
+        self.timer.start()
+        if self.auto_sessions:
+            self.start_session(task_id)
+
+    def pause_timer(self):
+        """Pause the timer, closing any open session"""
+        self.timer.pause()
+        if self.current_session:
+            self.end_session()
+
+    def reset_timer(self):
+        """Reset the timer, closing any open session"""
+        self.timer.reset()
+        if self.current_session:
+            self.end_session()
+
+    def add_focus_sample(self, focus_score: float):
+        """Count a focus score towards the current session's average"""
+        if self.current_session:
+            self._focus_sum += focus_score
+            self._focus_samples += 1
+
+    def record_focus(self, focus_score: float) -> bool:
+        """Feed an externally measured focus score; returns whether the user is focused"""
+        self.add_focus_sample(focus_score)
+        _, is_focused = self.focus_tracker.update(focus_score)
+        self.focus_tracker.check_focus_status(is_focused)
+        return is_focused
+
+    def _on_timer_event(self, event_type, data):
+        if event_type == 'complete':
+            if self.current_session:
+                self.end_session()
+            self._emit('timer_complete', data)
+
+    def _on_focus_event(self, event_type):
+        if event_type == 'focus_lost' and self.timer.is_running and not self.timer.is_break:
+            self.pause_timer()
+            self._emit('focus_lost', None)
+
+    def plan_study(self, start_date: date, end_date: date, time_budget_ms: float = 250.0):
+        """Plan pending tasks into free study blocks between two dates"""
+        from study_planner import StudyPlanner
+        planner = StudyPlanner(self.task_manager, self.calendar_manager,
+                               time_budget_ms=time_budget_ms)
+        return planner.plan(start_date, end_date)
+
+    def status(self) -> dict:
+        """Snapshot of the engine state"""
+        return {
+            'mode': 'break' if self.timer.is_break else 'focus',
+            'running': self.timer.is_running,
+            'time_left': self.timer.get_formatted_time(),
+            'completed_cycles': self.timer.completed_cycles,
+            'current_session': self.current_session.id if self.current_session else None,
+            'sessions_recorded': len(self.data_manager.data['sessions']),
+            'tasks': len(self.task_manager.tasks),
+            'events': len(self.calendar_manager.events),
+        }
+
+    def shutdown(self):
+        """Stop the timer and background monitoring"""
+        self.timer.pause()
+        if self.current_session:
+            self.end_session()
+        self.calendar_manager.notification_system.stop_monitoring()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Task-aware study planner
+Assigns pending tasks to free calendar study blocks across a date range: earliest-deadline
+greedy placement on the best energy/focus fit, then swap-based local search within a budget
+"""
+
+import random
+import time
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from records import record
+from todo_manager import Task, TaskManager, TaskStatus
+from calendar_manager import CalendarManager, CalendarEvent, EventType, Priority, StudyBlock
+
+@record
+class PlannedSession:
+    """One scheduled chunk of work on a task"""
+    task_id: str
+    title: str
+    start_time: datetime
+    end_time: datetime
+    energy_level: int
+    focus_level: int
+    fit: float  # energy + focus match, 0-0.4 like calculate_task_score
+
+@record
+class StudyPlan:
+    sessions: List[PlannedSession]
+    unscheduled: Dict[str, int]  # task id -> minutes that found no block
+    elapsed_ms: float
+
+    def to_events(self) -> List[CalendarEvent]:
+        """Calendar events for the planned sessions (not saved)"""
+        return [CalendarEvent(
+            id=f"plan_{s.task_id[:8]}_{s.start_time.strftime('%Y%m%d%H%M')}",
+            title=s.title,
+            description=f"Planned study - Energy: {s.energy_level}/5, Focus: {s.focus_level}/5",
+            start_time=s.start_time,
+            end_time=s.end_time,
+            event_type=EventType.STUDY_SESSION,
+            priority=Priority.MEDIUM,
+            task_id=s.task_id,
+            color="#10B981"
+        ) for s in self.sessions]
+
+class _CapacityTree:
+    """Max segment tree over block capacities: leftmost block with capacity >= need in O(log n)"""
+
+    def __init__(self, capacities: List[int]):
+        self.size = 1
+        while self.size < max(1, len(capacities)):
+            self.size *= 2
+        self.tree = [0] * (2 * self.size)
+        self.tree[self.size:self.size + len(capacities)] = capacities
+        for i in range(self.size - 1, 0, -1):
+            self.tree[i] = max(self.tree[2 * i], self.tree[2 * i + 1])
+
+    def get(self, i: int) -> int:
+        return self.tree[self.size + i]
+
+    def set(self, i: int, value: int):
+        i += self.size
+        self.tree[i] = value
+        i //= 2
+        while i:
+            self.tree[i] = max(self.tree[2 * i], self.tree[2 * i + 1])
+            i //= 2
+
+    def first_at_least(self, need: int, limit: int) -> Optional[int]:
+        """Leftmost index < limit whose capacity is at least need"""
+        if self.tree[1] < need:
+            return None
+        node = 1
+        while node < self.size:
+            node = 2 * node if self.tree[2 * node] >= need else 2 * node + 1
+        index = node - self.size
+        return index if index < limit else None
+
+class _BlockGroup:
+    """Study blocks sharing one (energy, focus) level, in time order"""
+
+    def __init__(self, energy: int, focus: int, blocks: List[StudyBlock]):
+        self.energy = energy
+        self.focus = focus
+        self.blocks = blocks
+        self.ends = [b.end_time for b in blocks]
+        self.capacity = _CapacityTree([b.duration_minutes for b in blocks])
+
+class StudyPlanner:
+    """Plans pending tasks into free study blocks between two dates"""
+
+    def __init__(self, task_manager: TaskManager, calendar_manager: CalendarManager,
+                 min_chunk: int = 25, time_budget_ms: float = 250.0, seed: int = 0):
+        self.task_manager = task_manager
+        self.calendar_manager = calendar_manager
+        self.min_chunk = min_chunk
+        self.time_budget_ms = time_budget_ms
+        self.seed = seed
+
+    def study_blocks(self, start_date: date, end_date: date) -> List[StudyBlock]:
+        """Free study blocks for every day in the range, from FlowCalendarOptimizer"""
+        optimizer = self.calendar_manager.optimizer
+        blocks = []
+        for day, events in self.calendar_manager.get_events_between(start_date, end_date).items():
+            blocks.extend(optimizer.get_optimal_study_blocks(day, events, self.min_chunk))
+        return blocks
+
+    @staticmethod
+    def fit(task: Task, energy: int, focus: int) -> float:
+        """Energy and focus match, weighted as in FlowStateOptimizer.calculate_task_score"""
+        return ((1 - abs(task.energy_required - energy) / 4.0) * 0.2
+                + (1 - abs(task.focus_required - focus) / 4.0) * 0.2)
+
+    def plan(self, start_date: date, end_date: date,
+             tasks: Optional[List[Task]] = None, now: Optional[datetime] = None) -> StudyPlan:
+        """Assign tasks (default: all pending) to study blocks between the two dates"""
+        started = time.perf_counter()
+        deadline = started + self.time_budget_ms / 1000.0
+        now = now or datetime.now()
+        if tasks is None:
+            tasks = self.task_manager.get_tasks(status=TaskStatus.PENDING)
+
+        blocks = [b for b in self.study_blocks(start_date, end_date) if b.start_time >= now]
+        by_level: Dict[Tuple[int, int], List[StudyBlock]] = {}
+        for block in sorted(blocks, key=lambda b: b.start_time):
+            by_level.setdefault((block.energy_level, block.focus_level), []).append(block)
+        groups = [_BlockGroup(e, f, bl) for (e, f), bl in by_level.items()]
+
+        # Earliest deadline first; higher priority, then longer tasks break ties
+        order = sorted(tasks, key=lambda t: (t.due_date or datetime.max, -t.priority.value,
+                                             -t.estimated_time))
+        chunks: List[list] = []  # [task, group, block index, minutes]
+        unscheduled: Dict[str, int] = {}
+        for task in order:
+            remaining = task.estimated_time - task.actual_time
+            if remaining <= 0:
+                remaining = min(task.estimated_time, self.min_chunk)  # overrun: one more session
+            overdue = bool(task.due_date and task.due_date <= now)
+            while remaining > 0:
+                placed = self._place(task, groups, remaining, overdue)
+                if placed is None and remaining > self.min_chunk:
+                    placed = self._place(task, groups, self.min_chunk, overdue)
+                if placed is None:
+                    unscheduled[task.id] = remaining
+                    break
+                group, index = placed
+                minutes = min(remaining, group.capacity.get(index))
+                group.capacity.set(index, group.capacity.get(index) - minutes)
+                chunks.append([task, group, index, minutes])
+                remaining -= minutes
+
+        self._improve(chunks, deadline, now)
+        sessions = self._layout(chunks)
+        return StudyPlan(sessions=sessions, unscheduled=unscheduled,
+                         elapsed_ms=(time.perf_counter() - started) * 1000)
+
+    def _place(self, task: Task, groups: List[_BlockGroup], need: int, overdue: bool = False):
+        """Best-fitting group with room before the due date; earliest block within it
+
+        Overdue tasks have no deadline left to respect and simply take the earliest block.
+        """
+        best = None
+        best_key = None
+        for group in groups:
+            if task.due_date and not overdue:
+                limit = bisect_right(group.ends, task.due_date)
+            else:
+                limit = len(group.blocks)
+            index = group.capacity.first_at_least(need, limit)
+            if index is None:
+                continue
+            fit = 0.0 if overdue else round(self.fit(task, group.energy, group.focus), 6)
+            key = (fit, -group.blocks[index].start_time.timestamp())
+            if best_key is None or key > best_key:
+                best, best_key = (group, index), key
+        return best
+
+    def _improve(self, chunks: List[list], deadline: float, now: datetime):
+        """Swap chunks between blocks while it raises total fit and the budget allows
+
+        For each chunk, candidates are drawn from the groups that suit its task better than
+        its current group; a swap must keep both deadlines and both block capacities.
+        """
+        if len(chunks) < 2:
+            return
+        rng = random.Random(self.seed)
+        fit = self.fit
+        while time.perf_counter() < deadline:
+            by_group: Dict[int, list] = {}
+            for chunk in chunks:
+                by_group.setdefault(id(chunk[1]), []).append(chunk)
+            groups = {id(chunk[1]): chunk[1] for chunk in chunks}.values()
+
+            improved = False
+            for a in chunks:
+                if time.perf_counter() >= deadline:
+                    return
+                task_a, group_a = a[0], a[1]
+                if task_a.due_date and task_a.due_date <= now:
+                    continue  # overdue tasks keep their earliest slot
+                current = fit(task_a, group_a.energy, group_a.focus)
+                better = [g for g in groups if fit(task_a, g.energy, g.focus) > current + 1e-9]
+                for group_b in sorted(better, key=lambda g: -fit(task_a, g.energy, g.focus)):
+                    members = by_group[id(group_b)]
+                    for b in rng.sample(members, min(8, len(members))):
+                        if b[1] is group_b and self._try_swap(a, b, now):
+                            improved = True
+                            break
+                    if a[1] is not group_a:
+                        break
+            if not improved:
+                break
+
+    def _try_swap(self, a: list, b: list, now: datetime) -> bool:
+        """Exchange the blocks of two chunks if that raises total fit and stays feasible"""
+        fit = self.fit
+        task_a, group_a, index_a, minutes_a = a
+        task_b, group_b, index_b, minutes_b = b
+        if group_a is group_b and index_a == index_b:
+            return False
+        delta = (fit(task_a, group_b.energy, group_b.focus) + fit(task_b, group_a.energy, group_a.focus)
+                 - fit(task_a, group_a.energy, group_a.focus) - fit(task_b, group_b.energy, group_b.focus))
+        if delta <= 1e-9:
+            return False
+        # Deadlines must still hold; overdue tasks keep their earliest slot
+        if task_a.due_date and group_b.blocks[index_b].end_time > task_a.due_date:
+            return False
+        if task_b.due_date and (task_b.due_date <= now
+                                or group_a.blocks[index_a].end_time > task_b.due_date):
+            return False
+        free_a = group_a.capacity.get(index_a) + minutes_a
+        free_b = group_b.capacity.get(index_b) + minutes_b
+        if minutes_b > free_a or minutes_a > free_b:
+            return False
+        group_a.capacity.set(index_a, free_a - minutes_b)
+        group_b.capacity.set(index_b, free_b - minutes_a)
+        a[1], a[2], b[1], b[2] = group_b, index_b, group_a, index_a
+        return True
+
+    def _layout(self, chunks: List[list]) -> List[PlannedSession]:
+        """Lay chunks out back to back inside each block, earliest deadline first"""
+        by_block: Dict[Tuple[int, int], list] = {}
+        for chunk in chunks:
+            by_block.setdefault((id(chunk[1]), chunk[2]), []).append(chunk)
+
+        sessions = []
+        for block_chunks in by_block.values():
+            block_chunks.sort(key=lambda c: (c[0].due_date or datetime.max, -c[0].priority.value))
+            group, index = block_chunks[0][1], block_chunks[0][2]
+            block = group.blocks[index]
+            cursor = block.start_time
+            for task, _, _, minutes in block_chunks:
+                end = cursor + timedelta(minutes=minutes)
+                sessions.append(PlannedSession(
+                    task_id=task.id, title=task.title, start_time=cursor, end_time=end,
+                    energy_level=group.energy, focus_level=group.focus,
+                    fit=round(self.fit(task, group.energy, group.focus), 3)))
+                cursor = end
+        sessions.sort(key=lambda s: s.start_time)
+        return sessions
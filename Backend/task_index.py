@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Secondary indexes for the task manager
+Per-status, per-category and per-priority buckets, a sorted due-date index,
+running time totals for completed tasks and subtree rollups for task hierarchies
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+@dataclass
+class TimeTotals:
+    """Running estimated/actual minute sums; only positive values are counted, as in the stats"""
+    estimated_sum: int = 0
+    estimated_count: int = 0
+    actual_sum: int = 0
+    actual_count: int = 0
+    error_sum: int = 0  # sum of |estimated - actual| over tasks with both recorded
+    error_count: int = 0
+    paired_estimated_sum: int = 0  # estimated/actual sums over those same tasks
+    paired_actual_sum: int = 0
+
+    def add(self, estimated: int, actual: int, sign: int = 1):
+        if estimated > 0:
+            self.estimated_sum += sign * estimated
+            self.estimated_count += sign
+        if actual > 0:
+            self.actual_sum += sign * actual
+            self.actual_count += sign
+        if estimated > 0 and actual > 0:
+            self.error_sum += sign * abs(estimated - actual)
+            self.error_count += sign
+            self.paired_estimated_sum += sign * estimated
+            self.paired_actual_sum += sign * actual
+
+    def remove(self, estimated: int, actual: int):
+        self.add(estimated, actual, -1)
+
+    def actual_to_estimated(self, min_count: int = 1) -> Optional[float]:
+        """Historical actual/estimated time ratio, or None with fewer than min_count tasks"""
+        if self.error_count < max(1, min_count) or self.paired_estimated_sum <= 0:
+            return None
+        return self.paired_actual_sum / self.paired_estimated_sum
+
+class TaskIndex:
+    """Maintained lookups over tasks; call add() after and remove() before any indexed change
+
+    Buckets are dicts used as insertion-ordered sets so filtered results come back in a
+    stable order. The due-date index only holds open (not completed) tasks, which is what
+    every due-date query asks for.
+    """
+
+    def __init__(self):
+        self.by_status: Dict[object, Dict[str, None]] = {}
+        self.by_category: Dict[object, Dict[str, None]] = {}
+        self.by_priority: Dict[object, Dict[str, None]] = {}
+        self.due: List[Tuple[datetime, str]] = []  # sorted (due_date, task_id)
+        self.completed_times = TimeTotals()
+
+    @staticmethod
+    def _is_open(task) -> bool:
+        return task.status.value != 'completed'
+
+    def add(self, task):
+        """Index a task under its current field values"""
+        self.by_status.setdefault(task.status, {})[task.id] = None
+        self.by_category.setdefault(task.category, {})[task.id] = None
+        self.by_priority.setdefault(task.priority, {})[task.id] = None
+        if not self._is_open(task):
+            self.completed_times.add(task.estimated_time, task.actual_time)
+        elif task.due_date:
+            insort(self.due, (task.due_date, task.id))
+
+    def remove(self, task):
+        """Drop a task using its current (pre-change) field values"""
+        self.by_status.get(task.status, {}).pop(task.id, None)
+        self.by_category.get(task.category, {}).pop(task.id, None)
+        self.by_priority.get(task.priority, {}).pop(task.id, None)
+        if not self._is_open(task):
+            self.completed_times.remove(task.estimated_time, task.actual_time)
+        elif task.due_date:
+            key = (task.due_date, task.id)
+            i = bisect_left(self.due, key)
+            if i < len(self.due) and self.due[i] == key:
+                del self.due[i]
+
+    def clear(self):
+        self.by_status.clear()
+        self.by_category.clear()
+        self.by_priority.clear()
+        self.due.clear()
+        self.completed_times = TimeTotals()
+
+    def ids(self, status=None, category=None, priority=None) -> Iterator[str]:
+        """Ids matching every given filter, scanning only the smallest bucket"""
+        buckets = [index.get(key, {}) for index, key in
+                   ((self.by_status, status), (self.by_category, category), (self.by_priority, priority))
+                   if key is not None]
+        if not buckets:
+            return iter(())
+        if len(buckets) == 1:
+            return iter(buckets[0])
+        buckets.sort(key=len)
+        result = iter(buckets[0])
+        for bucket in buckets[1:]:
+            result = filter(bucket.__contains__, result)
+        return result
+
+    def count(self, status=None, category=None, priority=None) -> int:
+        if (category, priority) == (None, None) and status is not None:
+            return len(self.by_status.get(status, ()))
+        return sum(1 for _ in self.ids(status, category, priority))
+
+    def count_due_before(self, moment: datetime) -> int:
+        """Number of open tasks due strictly before `moment` (the overdue count at that time)"""
+        return bisect_left(self.due, (moment,))
+
+    def due_between(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                    inclusive_end: bool = True) -> List[str]:
+        """Open task ids with start <= due_date <= end (or < end), earliest first"""
+        lo = bisect_left(self.due, (start,)) if start else 0
+        if end is None:
+            hi = len(self.due)
+        elif inclusive_end:
+            # '\uffff' sorts after any task id, so tasks due exactly at `end` are included
+            hi = bisect_right(self.due, (end, '\uffff'))
+        else:
+            hi = bisect_left(self.due, (end,))
+        return [task_id for _, task_id in self.due[lo:hi]]
+
+@dataclass
+class SubtreeRollup:
+    """Totals for a task and all of its descendants"""
+    estimated_time: int = 0
+    actual_time: int = 0
+    tasks: int = 0
+    completed: int = 0
+
+    def add(self, other: 'SubtreeRollup', sign: int = 1):
+        self.estimated_time += sign * other.estimated_time
+        self.actual_time += sign * other.actual_time
+        self.tasks += sign * other.tasks
+        self.completed += sign * other.completed
+
+    @property
+    def percent_complete(self) -> float:
+        return self.completed / self.tasks * 100 if self.tasks else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            'estimated_time': self.estimated_time,
+            'actual_time': self.actual_time,
+            'tasks': self.tasks,
+            'completed': self.completed,
+            'percent_complete': round(self.percent_complete, 1),
+        }
+
+class TaskTree:
+    """Parent/child links with per-subtree rollups kept current along the ancestor path
+
+    Like TaskIndex, call add() after and discard() before any change to a task; both cost
+    O(depth) plus, for add(), the number of direct children.
+    """
+
+    def __init__(self):
+        self.parent: Dict[str, Optional[str]] = {}
+        self.children: Dict[str, Set[str]] = {}  # by parent id, even before the parent loads
+        self.rollups: Dict[str, SubtreeRollup] = {}
+
+    @staticmethod
+    def _own(task) -> SubtreeRollup:
+        return SubtreeRollup(task.estimated_time, task.actual_time, 1,
+                             1 if task.status.value == 'completed' else 0)
+
+    def _propagate(self, parent_id: Optional[str], delta: SubtreeRollup, sign: int):
+        seen = set()
+        while parent_id is not None and parent_id in self.rollups and parent_id not in seen:
+            seen.add(parent_id)  # guards against cycles in hand-edited data
+            self.rollups[parent_id].add(delta, sign)
+            parent_id = self.parent.get(parent_id)
+
+    def add(self, task):
+        """Attach a task and fold its whole subtree into its ancestors"""
+        rollup = self._own(task)
+        for child_id in self.children.get(task.id, ()):
+            child = self.rollups.get(child_id)
+            if child is not None:
+                rollup.add(child)
+        self.rollups[task.id] = rollup
+        self.parent[task.id] = task.parent_task
+        if task.parent_task:
+            self.children.setdefault(task.parent_task, set()).add(task.id)
+        self._propagate(task.parent_task, rollup, 1)
+
+    def discard(self, task):
+        """Detach a task (children stay linked and are re-summed if it is added back)"""
+        rollup = self.rollups.pop(task.id, None)
+        if rollup is None:
+            return
+        parent_id = self.parent.pop(task.id, None)
+        self._propagate(parent_id, rollup, -1)
+        if parent_id:
+            siblings = self.children.get(parent_id)
+            if siblings is not None:
+                siblings.discard(task.id)
+                if not siblings:
+                    del self.children[parent_id]
+
+    def rollup(self, task_id: str) -> Optional[SubtreeRollup]:
+        return self.rollups.get(task_id)
+
+    def clear(self):
+        self.parent.clear()
+        self.children.clear()
+        self.rollups.clear()
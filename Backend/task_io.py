@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Streaming bulk import and export for tasks
+JSON Lines, CSV and iCalendar VTODO files are read and written one record at a time
+"""
+
+import csv
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import Callable, Iterable, Iterator, Optional
+
+import ics
+import json_codec
+from todo_manager import Priority, Task, TaskStatus, task_from_dict, task_to_dict
+
+FORMATS = ('jsonl', 'csv', 'ics')
+ProgressCallback = Callable[[int], None]
+
+# The spreadsheet layout exports have always used; priorities are written by name
+CSV_HEADER = ['ID', 'Title', 'Description', 'Priority', 'Status', 'Category',
+              'Estimated Time', 'Due Date', 'Created At']
+_CSV_INTS = ('priority', 'estimated_time', 'actual_time', 'difficulty_level',
+             'energy_required', 'focus_required')
+_CSV_LISTS = ('tags', 'subtasks')
+
+# Our 1-4 priorities onto iCalendar's 1 (highest) - 9 (lowest)
+_ICS_PRIORITY = {4: 1, 3: 3, 2: 5, 1: 9}
+_ICS_STATUS = {
+    TaskStatus.PENDING: 'NEEDS-ACTION',
+    TaskStatus.IN_PROGRESS: 'IN-PROCESS',
+    TaskStatus.COMPLETED: 'COMPLETED',
+    TaskStatus.CANCELLED: 'CANCELLED',
+}
+_STATUS_FROM_ICS = {v: k.value for k, v in _ICS_STATUS.items()}
+
+def detect_format(filename: str, format: Optional[str] = None) -> str:
+    """Explicit format, else the file extension (.jsonl/.ndjson, .csv, .ics)"""
+    if format:
+        format = format.lower()
+    else:
+        ext = os.path.splitext(filename)[1].lower().lstrip('.')
+        format = {'ndjson': 'jsonl', 'ical': 'ics'}.get(ext, ext)
+    if format not in FORMATS:
+        raise ValueError(f"unsupported task file format: {format!r} (use one of {', '.join(FORMATS)})")
+    return format
+
+def _report(progress: Optional[ProgressCallback], count: int, every: int):
+    if progress and count % every == 0:
+        progress(count)
+
+# Export
+
+def _write_jsonl(f, tasks, progress, every) -> int:
+    count = 0
+    for task in tasks:
+        f.write(json_codec.dumps(task_to_dict(task), pretty=False))
+        f.write(b'\n')
+        count += 1
+        _report(progress, count, every)
+    return count
+
+def _csv_row(task: Task) -> list:
+    return [task.id, task.title, task.description, task.priority.name, task.status.value,
+            task.category.value, task.estimated_time,
+            task.due_date.isoformat() if task.due_date else '', task.created_at.isoformat()]
+
+def _write_csv(f, tasks, progress, every) -> int:
+    writer = csv.writer(f)
+    writer.writerow(CSV_HEADER)
+    count = 0
+    for task in tasks:
+        writer.writerow(_csv_row(task))
+        count += 1
+        _report(progress, count, every)
+    return count
+
+def _vtodo_properties(task: Task):
+    yield 'UID', task.id
+    yield 'SUMMARY', ics.escape(task.title)
+    if task.description:
+        yield 'DESCRIPTION', ics.escape(task.description)
+    yield 'PRIORITY', str(_ICS_PRIORITY.get(task.priority.value, 5))
+    yield 'STATUS', _ICS_STATUS[task.status]
+    yield 'CREATED', ics.format_datetime(task.created_at)
+    if task.due_date:
+        yield 'DUE', ics.format_datetime(task.due_date)
+    if task.completed_at:
+        yield 'COMPLETED', ics.format_datetime(task.completed_at)
+    if task.tags:
+        yield 'CATEGORIES', ','.join(ics.escape(tag) for tag in task.tags)
+    if task.parent_task:
+        yield 'RELATED-TO', task.parent_task
+    # Fields without an iCalendar equivalent
+    yield 'X-FLOW-CATEGORY', task.category.value
+    yield 'X-FLOW-ESTIMATED-TIME', str(task.estimated_time)
+    yield 'X-FLOW-ACTUAL-TIME', str(task.actual_time)
+    yield 'X-FLOW-DIFFICULTY', str(task.difficulty_level)
+    yield 'X-FLOW-ENERGY', str(task.energy_required)
+    yield 'X-FLOW-FOCUS', str(task.focus_required)
+    if task.subtasks:
+        yield 'X-FLOW-SUBTASKS', ','.join(task.subtasks)
+    if task.notes:
+        yield 'X-FLOW-NOTES', ics.escape(task.notes)
+
+def _write_ics(f, tasks, progress, every) -> int:
+    ics.write_header(f)
+    count = 0
+    for task in tasks:
+        ics.write_component(f, 'VTODO', _vtodo_properties(task))
+        count += 1
+        _report(progress, count, every)
+    ics.write_footer(f)
+    return count
+
+def export_tasks(tasks: Iterable[Task], filename: str, format: Optional[str] = None,
+                 progress: Optional[ProgressCallback] = None, progress_every: int = 1000) -> int:
+    """Stream tasks to a file; returns the number written"""
+    format = detect_format(filename, format)
+    if format == 'jsonl':
+        with open(filename, 'wb') as f:
+            count = _write_jsonl(f, tasks, progress, progress_every)
+    elif format == 'csv':
+        with open(filename, 'w', newline='', encoding='utf-8') as f:
+            count = _write_csv(f, tasks, progress, progress_every)
+    else:
+        with open(filename, 'w', newline='', encoding='utf-8') as f:
+            count = _write_ics(f, tasks, progress, progress_every)
+    if progress:
+        progress(count)
+    return count
+
+# Import
+
+def _read_jsonl(filename: str) -> Iterator[Task]:
+    with open(filename, 'rb') as f:
+        for line in f:
+            if line.strip():
+                yield task_from_dict(json_codec.loads(line))
+
+def _csv_list(value: str) -> list:
+    """A list cell: a JSON list, or for hand-made sheets ';'-separated items"""
+    if value.startswith('['):
+        return [str(item) for item in json.loads(value)]
+    return [item.strip() for item in value.split(';') if item.strip()]
+
+def _csv_to_dict(row: dict) -> dict:
+    # 'Estimated Time' -> estimated_time, so exported headers and field names both work
+    data = {key.strip().lower().replace(' ', '_'): value for key, value in row.items()
+            if key and value not in (None, '')}
+    priority = data.get('priority')
+    if priority and not priority.isdigit():
+        data['priority'] = Priority[priority.upper()].value
+    for key in _CSV_INTS:
+        if key in data:
+            data[key] = int(data[key])
+    for key in _CSV_LISTS:
+        data[key] = _csv_list(data[key]) if key in data else []
+    data.setdefault('id', str(uuid.uuid4()))
+    data.setdefault('title', '(untitled)')
+    data.setdefault('description', '')
+    data.setdefault('created_at', datetime.now().isoformat())
+    data.setdefault('estimated_time', 25)
+    data.setdefault('priority', 2)
+    data.setdefault('status', TaskStatus.PENDING.value)
+    data.setdefault('category', 'study')
+    return data
+
+def _read_csv(filename: str) -> Iterator[Task]:
+    with open(filename, 'r', newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            yield task_from_dict(_csv_to_dict(row))
+
+def _vtodo_to_dict(properties) -> dict:
+    data = {
+        'description': '', 'priority': 2, 'status': TaskStatus.PENDING.value,
+        'category': 'study', 'estimated_time': 25,
+    }
+    for name, params, value in properties:
+        if name == 'UID':
+            data['id'] = value
+        elif name == 'SUMMARY':
+            data['title'] = ics.unescape(value)
+        elif name == 'DESCRIPTION':
+            data['description'] = ics.unescape(value)
+        elif name == 'PRIORITY':
+            level = int(value or 0)  # 0 means undefined
+            data['priority'] = 2 if level == 0 else 4 if level <= 2 else 3 if level <= 4 else 2 if level <= 6 else 1
+        elif name == 'STATUS':
+            data['status'] = _STATUS_FROM_ICS.get(value.upper(), TaskStatus.PENDING.value)
+        elif name in ('CREATED', 'DUE', 'COMPLETED'):
+            key = {'CREATED': 'created_at', 'DUE': 'due_date', 'COMPLETED': 'completed_at'}[name]
+            data[key] = ics.parse_datetime(value, params.get('TZID')).isoformat()
+        elif name == 'CATEGORIES':
+            data.setdefault('tags', []).extend(ics.unescape(tag) for tag in ics.split_list(value))
+        elif name == 'RELATED-TO':
+            data['parent_task'] = value
+        elif name == 'X-FLOW-CATEGORY':
+            data['category'] = value
+        elif name == 'X-FLOW-ESTIMATED-TIME':
+            data['estimated_time'] = int(value)
+        elif name == 'X-FLOW-ACTUAL-TIME':
+            data['actual_time'] = int(value)
+        elif name == 'X-FLOW-DIFFICULTY':
+            data['difficulty_level'] = int(value)
+        elif name == 'X-FLOW-ENERGY':
+            data['energy_required'] = int(value)
+        elif name == 'X-FLOW-FOCUS':
+            data['focus_required'] = int(value)
+        elif name == 'X-FLOW-SUBTASKS':
+            data['subtasks'] = [item for item in value.split(',') if item]
+        elif name == 'X-FLOW-NOTES':
+            data['notes'] = ics.unescape(value)
+    data.setdefault('created_at', datetime.now().isoformat())
+    return data
+
+def _read_ics(filename: str) -> Iterator[Task]:
+    with open(filename, 'r', newline='', encoding='utf-8') as f:
+        for properties in ics.iter_components(f, 'VTODO'):
+            data = _vtodo_to_dict(properties)
+            data.setdefault('id', str(uuid.uuid4()))
+            data.setdefault('title', '(untitled)')
+            yield task_from_dict(data)
+
+def iter_tasks(filename: str, format: Optional[str] = None) -> Iterator[Task]:
+    """Stream tasks out of a file, one record in memory at a time"""
+    format = detect_format(filename, format)
+    if format == 'jsonl':
+        return _read_jsonl(filename)
+    if format == 'csv':
+        return _read_csv(filename)
+    return _read_ics(filename)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Virtualised task list
+A Treeview that only holds the rows currently on screen, keyed by task id and updated
+from a row-level diff; filtering and sorting are answered by the TaskManager indexes
+"""
+
+import tkinter as tk
+from tkinter import ttk
+from typing import Dict, List, Optional
+
+from todo_manager import TaskManager, Task, TaskStatus, TaskCategory
+
+class VirtualTaskList:
+    """Scrollable task list whose Treeview holds one screenful of rows"""
+
+    COLUMNS = ('Title', 'Priority', 'Status', 'Est. Time', 'Category')
+    SORT_KEYS = {
+        'Title': 'title',
+        'Priority': 'priority',
+        'Status': 'status',
+        'Est. Time': 'estimated_time',
+        'Category': 'category',
+    }
+    WHEEL_ROWS = 3
+
+    def __init__(self, parent, task_manager: TaskManager, height: int = 15):
+        self.task_manager = task_manager
+        self.page_size = height
+        self.ids: List[str] = []  # the whole filtered, sorted list
+        self.offset = 0
+        self.order: List[str] = []  # ids of the rows in the tree, top to bottom
+        self.shown: Dict[str, tuple] = {}  # id -> values currently displayed
+
+        self.query = ""
+        self.status: Optional[TaskStatus] = None
+        self.category: Optional[TaskCategory] = None
+        self.sort_by = 'created'
+        self.descending = False
+
+        self.tree = ttk.Treeview(parent, columns=self.COLUMNS, show='headings', height=height)
+        for col in self.COLUMNS:
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort_by_column(c))
+            self.tree.column(col, width=120)
+        self.scrollbar = ttk.Scrollbar(parent, orient='vertical', command=self.on_scroll)
+
+        self.tree.bind('<MouseWheel>', self._on_wheel)
+        self.tree.bind('<Button-4>', lambda e: self.scroll_rows(-self.WHEEL_ROWS))
+        self.tree.bind('<Button-5>', lambda e: self.scroll_rows(self.WHEEL_ROWS))
+        self.tree.bind('<Prior>', lambda e: self.scroll_rows(-self.page_size))
+        self.tree.bind('<Next>', lambda e: self.scroll_rows(self.page_size))
+        self.tree.bind('<Configure>', self._on_resize)
+
+    def pack(self):
+        self.tree.pack(side='left', fill='both', expand=True)
+        self.scrollbar.pack(side='right', fill='y')
+
+    # Data
+
+    def set_filter(self, query: Optional[str] = None, status=False, category=False):
+        """Change the query and/or filters (None clears a filter) and refresh"""
+        if query is not None:
+            self.query = query
+        if status is not False:
+            self.status = status
+        if category is not False:
+            self.category = category
+        self.offset = 0
+        self.refresh()
+
+    def sort_by_column(self, column: str):
+        """Sort by a column; a second click on the same column reverses the order"""
+        key = self.SORT_KEYS.get(column, 'created')
+        self.descending = not self.descending if key == self.sort_by else False
+        self.sort_by = key
+        self.refresh()
+
+    def refresh(self):
+        """Re-query the ids and redraw the visible rows that changed"""
+        self.ids = self.task_manager.list_task_ids(self.query, self.status, self.category,
+                                                   self.sort_by, self.descending)
+        self.render()
+
+    def selected_ids(self) -> List[str]:
+        return list(self.tree.selection())
+
+    @staticmethod
+    def row_values(task: Task) -> tuple:
+        return (
+            task.title,
+            task.priority.name,
+            task.status.value.replace('_', ' ').title(),
+            f"{task.estimated_time} min",
+            task.category.value.replace('_', ' ').title()
+        )
+
+    # Rendering
+
+    def render(self):
+        """Bring the Treeview in line with the current window of ids"""
+        self.offset = max(0, min(self.offset, len(self.ids) - self.page_size))
+        window = self.ids[self.offset:self.offset + self.page_size]
+        tasks = self.task_manager.tasks
+        wanted = {task_id: self.row_values(tasks[task_id]) for task_id in window if task_id in tasks}
+        window = [task_id for task_id in window if task_id in wanted]
+
+        stale = [task_id for task_id in self.order if task_id not in wanted]
+        if stale:
+            self.tree.delete(*stale)
+        current = [task_id for task_id in self.order if task_id in wanted]
+
+        for position, task_id in enumerate(window):
+            values = wanted[task_id]
+            if task_id not in self.shown:
+                self.tree.insert('', position, iid=task_id, values=values)
+                current.insert(position, task_id)
+                continue
+            if current[position] != task_id:
+                self.tree.move(task_id, '', position)
+                current.remove(task_id)
+                current.insert(position, task_id)
+            if self.shown[task_id] != values:
+                self.tree.item(task_id, values=values)
+
+        self.order = window
+        self.shown = wanted
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        total = len(self.ids)
+        if total <= self.page_size:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.offset / total, (self.offset + self.page_size) / total)
+
+    # Scrolling
+
+    def scroll_rows(self, rows: int):
+        offset = max(0, min(self.offset + rows, len(self.ids) - self.page_size))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+        return 'break'
+
+    def on_scroll(self, action, amount, unit=None):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units'|'pages')"""
+        if action == 'moveto':
+            self.offset = int(float(amount) * len(self.ids))
+            self.render()
+        elif action == 'scroll':
+            step = self.page_size if unit == 'pages' else 1
+            self.scroll_rows(int(amount) * step)
+
+    def _on_wheel(self, event):
+        return self.scroll_rows(-self.WHEEL_ROWS if event.delta > 0 else self.WHEEL_ROWS)
+
+    def _on_resize(self, event):
+        """Show as many rows as now fit (one row's height goes to the headings)"""
+        try:
+            row_height = int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+        except (tk.TclError, ValueError):
+            row_height = 20
+        page_size = max(1, event.height // row_height - 1)
+        if page_size != self.page_size:
+            self.page_size = page_size
+            self.render()
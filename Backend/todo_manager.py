@@ -3,13 +3,18 @@
 Advanced todo list manager with flow state optimization
 """
 
-import json
 import os
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass, asdict
+from typing import Iterable, List, Dict, Optional, Tuple
 from enum import Enum
 import uuid
+import heapq
+
+from records import record, enum_lookup
+from task_index import TaskIndex, TaskTree
+from search_index import SearchIndex, parse_query
+from pomodoro_log import PomodoroLog, PomodoroRecord
+import json_codec
 
 class Priority(Enum):
     LOW = 1
@@ -33,7 +38,7 @@ class TaskCategory(Enum):
     PRACTICE = "practice"
     OTHER = "other"
 
-@dataclass
+@record
 class Task:
     id: str
     title: str
@@ -62,78 +67,179 @@ class Task:
         if self.subtasks is None:
             self.subtasks = []
 
+_PRIORITIES = enum_lookup(Priority)
+_STATUSES = enum_lookup(TaskStatus)
+_CATEGORIES = enum_lookup(TaskCategory)
+
+def task_to_dict(task: Task) -> dict:
+    """Convert task to dictionary for JSON serialization (lists are shared, not copied)"""
+    return {
+        'id': task.id,
+        'title': task.title,
+        'description': task.description,
+        'priority': task.priority.value,
+        'status': task.status.value,
+        'category': task.category.value,
+        'estimated_time': task.estimated_time,
+        'actual_time': task.actual_time,
+        'created_at': task.created_at.isoformat(),
+        'due_date': task.due_date.isoformat() if task.due_date else None,
+        'completed_at': task.completed_at.isoformat() if task.completed_at else None,
+        'tags': task.tags,
+        'subtasks': task.subtasks,
+        'parent_task': task.parent_task,
+        'difficulty_level': task.difficulty_level,
+        'energy_required': task.energy_required,
+        'focus_required': task.focus_required,
+        'notes': task.notes,
+    }
+
+def task_from_dict(data: dict) -> Task:
+    """Convert dictionary to task object"""
+    due_date = data.get('due_date')
+    completed_at = data.get('completed_at')
+    return Task(
+        id=data['id'],
+        title=data['title'],
+        description=data.get('description', ""),
+        priority=_PRIORITIES[data['priority']],
+        status=_STATUSES[data['status']],
+        category=_CATEGORIES[data['category']],
+        estimated_time=data['estimated_time'],
+        actual_time=data.get('actual_time', 0),
+        created_at=datetime.fromisoformat(data['created_at']),
+        due_date=datetime.fromisoformat(due_date) if due_date else None,
+        completed_at=datetime.fromisoformat(completed_at) if completed_at else None,
+        tags=data.get('tags'),
+        subtasks=data.get('subtasks'),
+        parent_task=data.get('parent_task'),
+        difficulty_level=data.get('difficulty_level', 3),
+        energy_required=data.get('energy_required', 3),
+        focus_required=data.get('focus_required', 3),
+        notes=data.get('notes', ""),
+    )
+
 class FlowStateOptimizer:
     """Optimizes task scheduling based on flow state principles"""
     
+    # Largest possible urgency (25%) plus energy and focus match (20% each)
+    DYNAMIC_MAX = 0.25 + 0.2 + 0.2
+    
     def __init__(self):
         self.flow_patterns = {
             'morning': {'energy': 4, 'focus': 5, 'creativity': 4},
             'afternoon': {'energy': 3, 'focus': 4, 'creativity': 3},
             'evening': {'energy': 2, 'focus': 3, 'creativity': 4}
         }
+        # Learned curves (flow_patterns.FlowPatternModel) take over from the table when set
+        self.pattern_model = None
+        # task id -> priority and time-fit part of the score
+        self._static_scores: Dict[str, float] = {}
+    
+    def current_levels(self, moment: datetime) -> Tuple[int, int]:
+        """Expected (energy, focus) of the user at a point in time"""
+        if self.pattern_model is not None:
+            return self.pattern_model.levels(moment)
+        period = 'morning' if moment.hour < 12 else 'afternoon' if moment.hour < 17 else 'evening'
+        return self.flow_patterns[period]['energy'], self.flow_patterns[period]['focus']
+    
+    def invalidate(self, task_id: Optional[str] = None):
+        """Forget cached score parts for one task (or all) after it changes"""
+        if task_id is None:
+            self._static_scores.clear()
+        else:
+            self._static_scores.pop(task_id, None)
+    
+    def static_score(self, task: Task) -> float:
+        """Time-independent part of the score: priority (30%) and time fit (5%)"""
+        static = self._static_scores.get(task.id)
+        if static is None:
+            if task.estimated_time <= 25:  # Pomodoro-sized
+                time_bonus = 0.05
+            elif task.estimated_time <= 50:  # Double pomodoro
+                time_bonus = 0.03
+            else:
+                time_bonus = 0.01
+            static = self._static_scores[task.id] = task.priority.value / 4.0 * 0.3 + time_bonus
+        return static
+    
+    @classmethod
+    def priority_bound(cls, priority: Priority) -> float:
+        """Highest score any task of this priority can reach"""
+        return priority.value / 4.0 * 0.3 + 0.05 + cls.DYNAMIC_MAX
+    
+    @staticmethod
+    def _urgency(task: Task, current_time: datetime) -> float:
+        """Due date urgency (25%)"""
+        if not task.due_date:
+            return 0.1  # Small penalty for no due date
+        days_until_due = (task.due_date - current_time).days
+        if days_until_due <= 0:
+            urgency_weight = 1.0  # Overdue
+        elif days_until_due <= 1:
+            urgency_weight = 0.9  # Due today/tomorrow
+        elif days_until_due <= 7:
+            urgency_weight = 0.7  # Due this week
+        else:
+            urgency_weight = 0.3  # Due later
+        return urgency_weight * 0.25
     
     def calculate_task_score(self, task: Task, current_time: datetime, 
                            user_energy: int, user_focus: int) -> float:
         """Calculate how well a task fits current conditions"""
-        score = 0.0
-        
-        # Priority weight (30%)
-        priority_weight = task.priority.value / 4.0
-        score += priority_weight * 0.3
-        
-        # Due date urgency (25%)
-        if task.due_date:
-            days_until_due = (task.due_date - current_time).days
-            if days_until_due <= 0:
-                urgency_weight = 1.0  # Overdue
-            elif days_until_due <= 1:
-                urgency_weight = 0.9  # Due today/tomorrow
-            elif days_until_due <= 7:
-                urgency_weight = 0.7  # Due this week
-            else:
-                urgency_weight = 0.3  # Due later
-            score += urgency_weight * 0.25
-        else:
-            score += 0.1  # Small penalty for no due date
-        
-        # Energy match (20%)
+        # Energy and focus match (20% each)
         energy_match = 1 - abs(task.energy_required - user_energy) / 4.0
-        score += energy_match * 0.2
-        
-        # Focus match (20%)
         focus_match = 1 - abs(task.focus_required - user_focus) / 4.0
-        score += focus_match * 0.2
-        
-        # Time fit (5%)
-        if task.estimated_time <= 25:  # Pomodoro-sized
-            time_bonus = 0.05
-        elif task.estimated_time <= 50:  # Double pomodoro
-            time_bonus = 0.03
-        else:
-            time_bonus = 0.01
-        score += time_bonus
-        
+        score = (self.static_score(task) + self._urgency(task, current_time)
+                 + energy_match * 0.2 + focus_match * 0.2)
         return min(score, 1.0)
     
+    def top_tasks(self, groups: Iterable[Tuple[float, Iterable[Task]]], current_time: datetime,
+                  user_energy: int = 3, user_focus: int = 3, available_time: int = 25,
+                  limit: int = 5) -> List[Tuple[Task, float]]:
+        """Top `limit` pending tasks from (upper bound, tasks) groups in descending bound order
+        
+        Keeps a bounded min-heap of the best scores so far; a group whose bound cannot beat
+        the heap ends the search, and a task whose bound cannot beat it skips the urgency part.
+        """
+        heap = []  # (score, -sequence, task); earlier tasks win ties like a stable sort
+        sequence = 0
+        static_scores = self._static_scores
+        # Match parts depend only on the 1-5 requirement, so compute them once per query
+        energy_match = {level: (1 - abs(level - user_energy) / 4.0) * 0.2 for level in range(1, 6)}
+        focus_match = {level: (1 - abs(level - user_focus) / 4.0) * 0.2 for level in range(1, 6)}
+        for group_bound, tasks in groups:
+            if len(heap) == limit and group_bound <= heap[0][0]:
+                break
+            for task in tasks:
+                if task.estimated_time > available_time or task.status != TaskStatus.PENDING:
+                    continue
+                static = static_scores.get(task.id)
+                if static is None:
+                    static = self.static_score(task)
+                energy = energy_match.get(task.energy_required)
+                if energy is None:
+                    energy = (1 - abs(task.energy_required - user_energy) / 4.0) * 0.2
+                focus = focus_match.get(task.focus_required)
+                if focus is None:
+                    focus = (1 - abs(task.focus_required - user_focus) / 4.0) * 0.2
+                partial = static + energy + focus
+                if len(heap) == limit and partial + 0.25 <= heap[0][0]:
+                    continue
+                score = min(partial + self._urgency(task, current_time), 1.0)
+                sequence += 1
+                if len(heap) < limit:
+                    heapq.heappush(heap, (score, -sequence, task))
+                elif score > heap[0][0]:
+                    heapq.heapreplace(heap, (score, -sequence, task))
+        return [(task, score) for score, _, task in sorted(heap, reverse=True)]
+    
     def suggest_optimal_tasks(self, tasks: List[Task], current_time: datetime,
                             user_energy: int = 3, user_focus: int = 3,
-                            available_time: int = 25) -> List[Tuple[Task, float]]:
+                            available_time: int = 25, limit: int = 5) -> List[Tuple[Task, float]]:
         """Suggest optimal tasks for current conditions"""
-        pending_tasks = [t for t in tasks if t.status == TaskStatus.PENDING]
-        
-        # Filter by available time
-        suitable_tasks = [t for t in pending_tasks if t.estimated_time <= available_time]
-        
-        # Calculate scores
-        scored_tasks = []
-        for task in suitable_tasks:
-            score = self.calculate_task_score(task, current_time, user_energy, user_focus)
-            scored_tasks.append((task, score))
-        
-        # Sort by score (descending)
-        scored_tasks.sort(key=lambda x: x[1], reverse=True)
-        
-        return scored_tasks[:5]  # Return top 5 suggestions
+        return self.top_tasks([(1.0, tasks)], current_time, user_energy, user_focus,
+                              available_time, limit)
 
 class TaskManager:
     """Advanced task management with flow state optimization"""
@@ -141,65 +247,57 @@ class TaskManager:
     def __init__(self, data_file: str = "tasks.json"):
         self.data_file = data_file
         self.tasks: Dict[str, Task] = {}
+        self.index = TaskIndex()
+        self.tree = TaskTree()
+        self.search_index = SearchIndex()
         self.optimizer = FlowStateOptimizer()
+        self._batch_scorer: Optional['BatchScorer'] = None  # rebuilt after any change
         self.load_tasks()
+        self.search_index.rebuild(self.tasks.values())
     
     def load_tasks(self):
         """Load tasks from file"""
         if os.path.exists(self.data_file):
             try:
-                with open(self.data_file, 'r') as f:
-                    data = json.load(f)
-                    for task_data in data.get('tasks', []):
-                        task = self._dict_to_task(task_data)
-                        self.tasks[task.id] = task
+                for task in json_codec.load_records(self.data_file, 'tasks', task_from_dict):
+                    self.tasks[task.id] = task
+                    self.index.add(task)
+                    self.tree.add(task)
             except Exception as e:
                 print(f"Error loading tasks: {e}")
     
-    def save_tasks(self):
-        """Save tasks to file"""
+    def _unindex(self, task: Task):
+        """Take a task out of the indexes before it changes or is removed"""
+        self.index.remove(task)
+        self.tree.discard(task)
+        self.search_index.remove(task.id)
+    
+    def _reindex(self, task: Task):
+        """Put a new or changed task back into the indexes and drop stale scores"""
+        self.index.add(task)
+        self.tree.add(task)
+        self.search_index.add(task)
+        self.optimizer.invalidate(task.id)
+        self._batch_scorer = None
+    
+    def save_tasks(self, pretty: Optional[bool] = None):
+        """Save tasks to file (compact unless pretty)"""
         try:
             data = {
-                'tasks': [self._task_to_dict(task) for task in self.tasks.values()],
+                'tasks': [task_to_dict(task) for task in self.tasks.values()],
                 'last_updated': datetime.now().isoformat()
             }
-            with open(self.data_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            json_codec.dump_file(self.data_file, data, pretty)
         except Exception as e:
             print(f"Error saving tasks: {e}")
     
-    def _task_to_dict(self, task: Task) -> dict:
-        """Convert task to dictionary for JSON serialization"""
-        task_dict = asdict(task)
-        task_dict['priority'] = task.priority.value
-        task_dict['status'] = task.status.value
-        task_dict['category'] = task.category.value
-        task_dict['created_at'] = task.created_at.isoformat()
-        if task.due_date:
-            task_dict['due_date'] = task.due_date.isoformat()
-        if task.completed_at:
-            task_dict['completed_at'] = task.completed_at.isoformat()
-        return task_dict
-    
-    def _dict_to_task(self, task_dict: dict) -> Task:
-        """Convert dictionary to task object"""
-        task_dict = task_dict.copy()
-        task_dict['priority'] = Priority(task_dict['priority'])
-        task_dict['status'] = TaskStatus(task_dict['status'])
-        task_dict['category'] = TaskCategory(task_dict['category'])
-        task_dict['created_at'] = datetime.fromisoformat(task_dict['created_at'])
-        if task_dict.get('due_date'):
-            task_dict['due_date'] = datetime.fromisoformat(task_dict['due_date'])
-        if task_dict.get('completed_at'):
-            task_dict['completed_at'] = datetime.fromisoformat(task_dict['completed_at'])
-        return Task(**task_dict)
-    
     def create_task(self, title: str, description: str = "", 
                    priority: Priority = Priority.MEDIUM,
                    category: TaskCategory = TaskCategory.STUDY,
                    estimated_time: int = 25, due_date: Optional[datetime] = None,
                    tags: List[str] = None, difficulty_level: int = 3,
-                   energy_required: int = 3, focus_required: int = 3) -> Task:
+                   energy_required: int = 3, focus_required: int = 3,
+                   parent_task: Optional[str] = None) -> Task:
         """Create a new task"""
         task = Task(
             id=str(uuid.uuid4()),
@@ -213,10 +311,14 @@ class TaskManager:
             tags=tags or [],
             difficulty_level=difficulty_level,
             energy_required=energy_required,
-            focus_required=focus_required
+            focus_required=focus_required,
+            parent_task=parent_task
         )
         
+        if parent_task in self.tasks:
+            self.tasks[parent_task].subtasks.append(task.id)
         self.tasks[task.id] = task
+        self._reindex(task)
         self.save_tasks()
         return task
     
@@ -226,9 +328,11 @@ class TaskManager:
             return False
         
         task = self.tasks[task_id]
+        self._unindex(task)
         for key, value in kwargs.items():
             if hasattr(task, key):
                 setattr(task, key, value)
+        self._reindex(task)
         
         self.save_tasks()
         return True
@@ -239,10 +343,12 @@ class TaskManager:
             return False
         
         task = self.tasks[task_id]
+        self._unindex(task)
         task.status = TaskStatus.COMPLETED
         task.completed_at = datetime.now()
         if actual_time:
             task.actual_time = actual_time
+        self._reindex(task)
         
         self.save_tasks()
         return True
@@ -250,7 +356,9 @@ class TaskManager:
     def delete_task(self, task_id: str) -> bool:
         """Delete a task"""
         if task_id in self.tasks:
-            del self.tasks[task_id]
+            self._unindex(self.tasks.pop(task_id))
+            self.optimizer.invalidate(task_id)
+            self._batch_scorer = None
             self.save_tasks()
             return True
         return False
@@ -263,70 +371,135 @@ class TaskManager:
                   category: Optional[TaskCategory] = None,
                   priority: Optional[Priority] = None) -> List[Task]:
         """Get tasks with optional filtering"""
-        tasks = list(self.tasks.values())
-        
+        if not (status or category or priority):
+            return list(self.tasks.values())
+        return list(map(self.tasks.__getitem__, self.index.ids(status, category, priority)))
+    
+    def search_tasks(self, query: str = "", tags: List[str] = (),
+                     status: Optional[TaskStatus] = None) -> List[Task]:
+        """Tasks whose text matches every query word (prefix) and every tag; all tasks if both are empty"""
+        terms, query_tags = parse_query(query)
+        if not terms and not query_tags and not tags:
+            return self.get_tasks(status=status)
+        hits = self.search_index.search(query, tags)
+        tasks = [self.tasks[task_id] for task_id in hits if task_id in self.tasks]
         if status:
             tasks = [t for t in tasks if t.status == status]
-        if category:
-            tasks = [t for t in tasks if t.category == category]
-        if priority:
-            tasks = [t for t in tasks if t.priority == priority]
-        
-        return tasks
-    
+        return sorted(tasks, key=lambda t: t.created_at)
+
+    SORT_KEYS = ('created', 'title', 'priority', 'status', 'category', 'estimated_time', 'due_date')
+
+    def list_task_ids(self, query: str = "", status: Optional[TaskStatus] = None,
+                      category: Optional[TaskCategory] = None, sort_by: str = 'created',
+                      descending: bool = False) -> List[str]:
+        """Filtered, sorted task ids for list views, answered from the indexes
+
+        Priority, status and category orders come from walking the index buckets and the
+        due-date order from the sorted due index, so only the other keys need a sort.
+        """
+        terms, query_tags = parse_query(query)
+        if terms or query_tags:
+            matches = self.search_index.search(query)
+            for key, buckets in ((status, self.index.by_status), (category, self.index.by_category)):
+                if key is not None:
+                    matches = matches.intersection(buckets.get(key, ()))
+        elif status is not None or category is not None:
+            matches = dict.fromkeys(self.index.ids(status=status, category=category))
+        else:
+            matches = self.tasks
+
+        if sort_by in ('priority', 'status', 'category'):
+            buckets, order = {
+                'priority': (self.index.by_priority, Priority),
+                'status': (self.index.by_status, TaskStatus),
+                'category': (self.index.by_category, TaskCategory),
+            }[sort_by]
+            ids = [task_id for key in order for task_id in buckets.get(key, ()) if task_id in matches]
+        elif sort_by == 'due_date':
+            ids = [task_id for _, task_id in self.index.due if task_id in matches]
+            listed = set(ids)
+            # Completed tasks and tasks without a due date follow the open dated ones
+            ids += sorted((task_id for task_id in matches if task_id not in listed),
+                          key=lambda i: (self.tasks[i].due_date or datetime.max, self.tasks[i].created_at))
+        elif sort_by == 'title':
+            ids = sorted(matches, key=lambda i: (self.tasks[i].title.lower(), self.tasks[i].created_at))
+        elif sort_by == 'estimated_time':
+            ids = sorted(matches, key=lambda i: (self.tasks[i].estimated_time, self.tasks[i].created_at))
+        else:
+            ids = sorted(matches, key=lambda i: self.tasks[i].created_at)
+        if descending:
+            ids.reverse()
+        return ids
+
     def get_overdue_tasks(self) -> List[Task]:
         """Get overdue tasks"""
-        now = datetime.now()
-        return [t for t in self.tasks.values() 
-                if t.due_date and t.due_date < now and t.status != TaskStatus.COMPLETED]
+        return [self.tasks[task_id]
+                for task_id in self.index.due_between(end=datetime.now(), inclusive_end=False)]
     
     def get_due_today(self) -> List[Task]:
         """Get tasks due today"""
-        today = datetime.now().date()
-        return [t for t in self.tasks.values()
-                if t.due_date and t.due_date.date() == today and t.status != TaskStatus.COMPLETED]
+        start = datetime.combine(datetime.now().date(), datetime.min.time())
+        return [self.tasks[task_id]
+                for task_id in self.index.due_between(start, start + timedelta(days=1), inclusive_end=False)]
     
     def get_upcoming_tasks(self, days: int = 7) -> List[Task]:
         """Get tasks due in the next N days"""
         now = datetime.now()
-        future = now + timedelta(days=days)
-        return [t for t in self.tasks.values()
-                if t.due_date and now <= t.due_date <= future and t.status != TaskStatus.COMPLETED]
+        return [self.tasks[task_id]
+                for task_id in self.index.due_between(now, now + timedelta(days=days))]
     
-    def suggest_next_task(self, user_energy: int = 3, user_focus: int = 3,
+    def suggest_next_task(self, user_energy: Optional[int] = None, user_focus: Optional[int] = None,
                          available_time: int = 25) -> Optional[Tuple[Task, float]]:
-        """Suggest the next best task to work on"""
-        suggestions = self.optimizer.suggest_optimal_tasks(
-            list(self.tasks.values()), datetime.now(), 
-            user_energy, user_focus, available_time
-        )
+        """Suggest the next best task to work on (energy/focus default to the expected levels now)"""
+        now = datetime.now()
+        if user_energy is None or user_focus is None:
+            energy, focus = self.optimizer.current_levels(now)
+            user_energy = energy if user_energy is None else user_energy
+            user_focus = focus if user_focus is None else user_focus
+        # Pending tasks grouped by priority, highest first, so low-priority groups
+        # are skipped once their best possible score can't win
+        groups = [
+            (self.optimizer.priority_bound(priority),
+             map(self.tasks.__getitem__, self.index.ids(TaskStatus.PENDING, priority=priority)))
+            for priority in sorted(Priority, key=lambda p: p.value, reverse=True)
+        ]
+        suggestions = self.optimizer.top_tasks(groups, now, user_energy, user_focus,
+                                               available_time, limit=1)
         return suggestions[0] if suggestions else None
     
+    def suggest_for_scenarios(self, scenarios: List[Tuple[datetime, int, int, int]],
+                              limit: int = 5) -> List[List[Tuple[Task, float]]]:
+        """Top tasks for each (time, energy, focus, available_time) scenario in one pass"""
+        from batch_scorer import BatchScorer, NUMPY_AVAILABLE  # numpy only loads here
+        if not NUMPY_AVAILABLE:
+            pending = self.get_tasks(status=TaskStatus.PENDING)
+            return [self.optimizer.suggest_optimal_tasks(pending, *scenario, limit=limit)
+                    for scenario in scenarios]
+        if self._batch_scorer is None:
+            self._batch_scorer = BatchScorer(self.get_tasks(status=TaskStatus.PENDING))
+        return self._batch_scorer.suggest(scenarios, limit)
+    
     def get_task_statistics(self) -> dict:
-        """Get task statistics"""
-        all_tasks = list(self.tasks.values())
-        completed_tasks = [t for t in all_tasks if t.status == TaskStatus.COMPLETED]
+        """Get task statistics (read from the maintained index counters)"""
+        total = len(self.tasks)
+        completed = self.index.count(TaskStatus.COMPLETED)
         
         stats = {
-            'total_tasks': len(all_tasks),
-            'completed_tasks': len(completed_tasks),
-            'pending_tasks': len([t for t in all_tasks if t.status == TaskStatus.PENDING]),
-            'in_progress_tasks': len([t for t in all_tasks if t.status == TaskStatus.IN_PROGRESS]),
-            'overdue_tasks': len(self.get_overdue_tasks()),
-            'completion_rate': len(completed_tasks) / len(all_tasks) * 100 if all_tasks else 0
+            'total_tasks': total,
+            'completed_tasks': completed,
+            'pending_tasks': self.index.count(TaskStatus.PENDING),
+            'in_progress_tasks': self.index.count(TaskStatus.IN_PROGRESS),
+            'overdue_tasks': self.index.count_due_before(datetime.now()),
+            'completion_rate': completed / total * 100 if total else 0
         }
         
-        if completed_tasks:
-            estimated_times = [t.estimated_time for t in completed_tasks if t.estimated_time > 0]
-            actual_times = [t.actual_time for t in completed_tasks if t.actual_time > 0]
-            
-            if estimated_times:
-                stats['avg_estimated_time'] = sum(estimated_times) / len(estimated_times)
-            if actual_times:
-                stats['avg_actual_time'] = sum(actual_times) / len(actual_times)
-                if estimated_times and len(actual_times) == len(estimated_times):
-                    accuracy = sum(abs(e - a) for e, a in zip(estimated_times, actual_times))
-                    stats['time_estimation_accuracy'] = max(0, 100 - (accuracy / len(actual_times)))
+        times = self.index.completed_times
+        if times.estimated_count:
+            stats['avg_estimated_time'] = times.estimated_sum / times.estimated_count
+        if times.actual_count:
+            stats['avg_actual_time'] = times.actual_sum / times.actual_count
+            if times.estimated_count and times.error_count == times.actual_count == times.estimated_count:
+                stats['time_estimation_accuracy'] = max(0, 100 - (times.error_sum / times.error_count))
         
         return stats
     
@@ -335,15 +508,8 @@ class TaskManager:
         if parent_task_id not in self.tasks:
             return None
         
-        subtask = self.create_task(title, **kwargs)
-        subtask.parent_task = parent_task_id
-        
-        # Add to parent's subtasks list
-        parent_task = self.tasks[parent_task_id]
-        parent_task.subtasks.append(subtask.id)
-        
-        self.save_tasks()
-        return subtask
+        # create_task links it into the parent's subtasks list and saves once
+        return self.create_task(title, parent_task=parent_task_id, **kwargs)
     
     def get_subtasks(self, parent_task_id: str) -> List[Task]:
         """Get all subtasks of a parent task"""
@@ -354,43 +520,75 @@ class TaskManager:
         return [self.tasks[subtask_id] for subtask_id in parent_task.subtasks 
                 if subtask_id in self.tasks]
     
-    def export_tasks(self, filename: str, format: str = 'json'):
-        """Export tasks to file"""
-        if format.lower() == 'json':
-            with open(filename, 'w') as f:
-                json.dump([self._task_to_dict(task) for task in self.tasks.values()], 
-                         f, indent=2)
-        elif format.lower() == 'csv':
-            import csv
-            with open(filename, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(['ID', 'Title', 'Description', 'Priority', 'Status', 
-                               'Category', 'Estimated Time', 'Due Date', 'Created At'])
-                for task in self.tasks.values():
-                    writer.writerow([
-                        task.id, task.title, task.description, task.priority.name,
-                        task.status.value, task.category.value, task.estimated_time,
-                        task.due_date.isoformat() if task.due_date else '',
-                        task.created_at.isoformat()
-                    ])
+    def get_task_progress(self, task_id: str) -> Optional[dict]:
+        """Estimated/actual time and completion for a task and all its subtasks"""
+        rollup = self.tree.rollup(task_id)
+        return rollup.to_dict() if rollup else None
+    
+    def export_tasks(self, filename: str, format: Optional[str] = 'json', progress=None) -> int:
+        """Export tasks to file (json, or streamed jsonl/csv/ics; None picks by extension)"""
+        if (format or os.path.splitext(filename)[1].lstrip('.')).lower() == 'json':
+            json_codec.dump_file(filename, [task_to_dict(task) for task in self.tasks.values()],
+                                 pretty=True)
+            return len(self.tasks)
+        import task_io
+        return task_io.export_tasks(self.tasks.values(), filename, format, progress)
+    
+    def import_tasks(self, filename: str, format: Optional[str] = None,
+                     replace_existing: bool = True, progress=None) -> int:
+        """Stream tasks in from a jsonl/csv/ics file and save once at the end
+        
+        Tasks whose id already exists are replaced, or skipped if replace_existing is False.
+        Returns the number of tasks imported.
+        """
+        import task_io
+        count = 0
+        try:
+            for task in task_io.iter_tasks(filename, format):
+                existing = self.tasks.get(task.id)
+                if existing is not None:
+                    if not replace_existing:
+                        continue
+                    self._unindex(existing)
+                self.tasks[task.id] = task
+                self._reindex(task)
+                count += 1
+                if progress and count % 1000 == 0:
+                    progress(count)
+        except Exception as e:
+            print(f"Error importing tasks: {e}")
+        if count:
+            self.save_tasks()
+        if progress:
+            progress(count)
+        return count
 
 class PomodoroIntegration:
     """Integration between task management and Pomodoro technique"""
     
-    def __init__(self, task_manager: TaskManager):
+    POMODORO_MINUTES = 25
+    MIN_HISTORY = 3  # completed tasks needed before the estimate ratio is trusted
+    RATIO_RANGE = (0.5, 3.0)
+    
+    def __init__(self, task_manager: TaskManager, log_file: Optional[str] = None):
         self.task_manager = task_manager
         self.current_task_id = None
         self.session_start_time = None
-        self.completed_pomodoros = {}  # task_id -> count
+        if log_file is None:
+            log_file = os.path.splitext(task_manager.data_file)[0] + '.pomodoros.jsonl'
+        self.log = PomodoroLog(log_file)
+        self.completed_pomodoros = self.log.counts  # task_id -> count
     
     def start_pomodoro(self, task_id: str):
         """Start a Pomodoro session for a task"""
-        if task_id in self.task_manager.tasks:
+        task = self.task_manager.tasks.get(task_id)
+        if task:
             self.current_task_id = task_id
             self.session_start_time = datetime.now()
             
-            # Update task status
-            self.task_manager.update_task(task_id, status=TaskStatus.IN_PROGRESS)
+            # Saved now so the status survives the app closing mid-pomodoro
+            if task.status != TaskStatus.IN_PROGRESS:
+                self.task_manager.update_task(task_id, status=TaskStatus.IN_PROGRESS)
             
             return True
         return False
@@ -400,19 +598,15 @@ class PomodoroIntegration:
         if not self.current_task_id or not self.session_start_time:
             return False
         
-        # Calculate session duration
-        session_duration = (datetime.now() - self.session_start_time).total_seconds() / 60
+        entry = PomodoroRecord(task_id=self.current_task_id, start_time=self.session_start_time,
+                               end_time=datetime.now(), quality=quality_rating)
         
-        # Update task actual time
+        # One task update (actual time) and one log line per pomodoro
         task = self.task_manager.get_task(self.current_task_id)
         if task:
-            new_actual_time = task.actual_time + int(session_duration)
-            self.task_manager.update_task(self.current_task_id, actual_time=new_actual_time)
-        
-        # Track completed pomodoros
-        if self.current_task_id not in self.completed_pomodoros:
-            self.completed_pomodoros[self.current_task_id] = 0
-        self.completed_pomodoros[self.current_task_id] += 1
+            self.task_manager.update_task(self.current_task_id,
+                                          actual_time=task.actual_time + int(entry.minutes))
+        self.log.append(entry)
         
         # Reset session
         self.current_task_id = None
@@ -424,14 +618,22 @@ class PomodoroIntegration:
         """Get number of completed pomodoros for a task"""
         return self.completed_pomodoros.get(task_id, 0)
     
+    def estimate_ratio(self) -> float:
+        """How long completed tasks really took relative to their estimates (1.0 without history)"""
+        ratio = self.task_manager.index.completed_times.actual_to_estimated(self.MIN_HISTORY)
+        if ratio is None:
+            return 1.0
+        low, high = self.RATIO_RANGE
+        return min(high, max(low, ratio))
+    
     def estimate_remaining_pomodoros(self, task_id: str) -> int:
-        """Estimate remaining pomodoros needed for a task"""
+        """Estimate remaining pomodoros needed for a task, corrected by the user's history"""
         task = self.task_manager.get_task(task_id)
         if not task:
             return 0
         
-        remaining_time = max(0, task.estimated_time - task.actual_time)
-        return max(1, remaining_time // 25)  # 25 minutes per pomodoro
+        remaining_time = max(0, task.estimated_time * self.estimate_ratio() - task.actual_time)
+        return max(1, int(remaining_time // self.POMODORO_MINUTES))
 
 # Example usage and testing
 if __name__ == "__main__":